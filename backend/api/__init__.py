@@ -4,6 +4,10 @@ from backend.api.auth import auth_router, get_current_user
 from backend.api.plants_units import plants_units_router
 from backend.api.unit import unit_router
 from backend.api.document import document_router
+from backend.api.export import export_router
+from backend.api.fleet import fleet_router
+from backend.api.history import history_router
+from backend.api.system import system_router
 
 api_router = APIRouter(prefix="/api")
 
@@ -15,6 +19,10 @@ protected_router = APIRouter(dependencies=[Depends(get_current_user)])
 protected_router.include_router(plants_units_router)
 protected_router.include_router(unit_router)
 protected_router.include_router(document_router)
+protected_router.include_router(export_router)
+protected_router.include_router(fleet_router)
+protected_router.include_router(history_router)
+protected_router.include_router(system_router)
 
 # Include the protected router in the main API router
 api_router.include_router(protected_router)
@@ -11,6 +11,7 @@ from sqlalchemy import select, delete
 
 from backend.config import config
 from backend.db import DbSessionDep
+from backend.metrics import metrics
 from backend.tables.user import UserTable, UserSessionTable
 
 logger = logging.getLogger(__name__)
@@ -291,6 +292,7 @@ auth_service = Auth()
 def get_current_user(request: Request, db: DbSessionDep) -> UserTable:
     """Dependency to get the current authenticated user."""
     user = auth_service.validate_token_and_get_user(request, db)
+    metrics.auth_validations.inc(labels=("failed",) if user is None else ("ok",))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -303,6 +305,19 @@ def get_current_user(request: Request, db: DbSessionDep) -> UserTable:
 CurrentUser = Annotated[UserTable, Depends(get_current_user)]
 
 
+def get_admin_user(user: CurrentUser) -> UserTable:
+    """Dependency to get the current user, who must be an administrator (`auth_admin_usernames`)."""
+    if user.username not in config.auth_admin_usernames:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator rights required",
+        )
+    return user
+
+
+AdminUser = Annotated[UserTable, Depends(get_admin_user)]
+
+
 @auth_router.post("/login", operation_id="login")
 async def login(request: LoginRequest, db: DbSessionDep, response: Response):
     """
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import func, select
+from backend.api.etag import etag_headers, etag_matches, make_etag, not_modified
+from backend.cache import response_cache
 from backend.db import DbSessionDep
+from backend.events import broker
+from backend.metrics import metrics
 from backend.tables import DocumentTable
 import urllib.parse
 from datetime import datetime
@@ -9,11 +14,35 @@ from typing import Optional
 document_router = APIRouter(prefix="/documents", tags=["documents"])
 
 
+def documents_version(db: DbSessionDep) -> str:
+    """
+    Get a cheap change token for the documents list.
+    Documents are only ever uploaded or deleted (never edited) & ids only grow,
+    so count, max & sum of ids change with every write.
+    """
+    stmt = select(
+        func.count(DocumentTable.doc_id),
+        func.max(DocumentTable.doc_id),
+        func.sum(DocumentTable.doc_id),
+    )
+    return "|".join(str(part) for part in db.execute(stmt).one())
+
+
 @document_router.get("/", operation_id="get_all_documents")
-def get_all_documents(db: DbSessionDep):
+def get_all_documents(request: Request, db: DbSessionDep):
     """
     Get the full list of all documents (excluding binary content for performance).
+    Responds with ``304 Not Modified`` if the client's ETag is still current.
     """
+    etag = make_etag("documents", documents_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached.to_response(etag_headers(etag))
+
     documents = db.query(DocumentTable).all()
 
     result = []
@@ -36,14 +65,47 @@ def get_all_documents(db: DbSessionDep):
         }
         result.append(doc_data)
 
-    return result
+    entry = response_cache.put(
+        cache_key, JSONResponse(result).body, tags=["documents"], etag=etag
+    )
+    return entry.to_response(etag_headers(etag))
+
+
+@document_router.get("/events", operation_id="get_documents_events")
+async def documents_events(db: DbSessionDep):
+    """
+    Subscribe to document uploads & deletions as a Server-Sent Events stream
+    (``documents`` events, ``resync`` if the client fell behind).
+    """
+    # Release the connection used for authentication, the stream may stay open for hours
+    db.close()
+
+    return StreamingResponse(
+        broker.subscribe("documents"),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @document_router.get("/{document_id}", operation_id="get_document_by_id")
-def get_document_by_id(document_id: int, db: DbSessionDep):
+def get_document_by_id(document_id: int, request: Request, db: DbSessionDep):
     """
     Get information about a single document by its ID (excluding binary content for performance).
+    Documents are immutable, so the ETag only depends on the ID.
     """
+    etag = make_etag("document", document_id)
+    if etag_matches(request, etag):
+        exists = db.execute(
+            select(DocumentTable.doc_id).where(DocumentTable.doc_id == document_id)
+        ).first()
+        if exists:
+            return not_modified(etag)
+
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached.to_response(etag_headers(etag))
+
     # Find the document by ID
     document = (
         db.query(DocumentTable).filter(DocumentTable.doc_id == document_id).first()
@@ -70,7 +132,10 @@ def get_document_by_id(document_id: int, db: DbSessionDep):
         "status": "active",  # For now, assume all documents are active
     }
 
-    return doc_data
+    entry = response_cache.put(
+        cache_key, JSONResponse(doc_data).body, tags=["documents"], etag=etag
+    )
+    return entry.to_response(etag_headers(etag))
 
 
 @document_router.post("/upload", operation_id="upload_document")
@@ -137,6 +202,8 @@ async def upload_document(
         db.add(new_document)
         db.commit()
         db.refresh(new_document)
+        response_cache.invalidate("documents")
+        broker.publish("documents", "documents", {"id": new_document.doc_id})
 
         # Return the created document info
         doc_data = {
@@ -185,6 +252,8 @@ def delete_document(document_id: int, db: DbSessionDep):
         # Delete the document
         db.delete(document)
         db.commit()
+        response_cache.invalidate("documents")
+        broker.publish("documents", "documents", {"id": document_id})
 
         return {"message": "Document deleted successfully", "id": document_id}
 
@@ -244,6 +313,7 @@ def download_document(document_id: int, db: DbSessionDep):
     # Create a generator to stream the file content
     def iterfile():
         yield document.binary_content
+        metrics.document_bytes.inc(len(document.binary_content))
 
     # Create the streaming response with appropriate headers
     response = StreamingResponse(
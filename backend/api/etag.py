@@ -0,0 +1,40 @@
+import hashlib
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from the given change token parts.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    """
+    Headers attached to every conditional response.
+    Data is user-specific (behind auth) & must be revalidated on each use.
+    """
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check whether the client already has the representation with this ETag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Empty ``304 Not Modified`` response for a matching ETag.
+    """
+    return Response(status_code=304, headers=etag_headers(etag))
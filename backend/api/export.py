@@ -0,0 +1,47 @@
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from backend.api.raw_export import (
+    CSV_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    RAW_FORMATS,
+    iter_raw_export,
+    raw_stmt,
+)
+from backend.api.unit_helpers import unit_vessel_id
+from backend.db import Db, DbSessionDep
+
+export_router = APIRouter(prefix="/export", tags=["Export"])
+
+
+@export_router.get("/{table}", operation_id="export_raw_table")
+def export_raw_table(
+    table: Literal["complects", "container_systems", "loads", "extracts"],
+    db: DbSessionDep,
+    format: Annotated[
+        Literal["csv", "parquet"],
+        Query(description="`parquet` is available when pyarrow is installed"),
+    ] = "csv",
+    unit: Annotated[
+        str | None, Query(description="Only rows of the unit (name_eng)")
+    ] = None,
+):
+    """
+    Export the raw table with the plant, unit & vessel owning each row
+    denormalized in, as CSV or Parquet. Rows are streamed from a server-side
+    cursor as they are fetched, over a connection of the stream's own.
+    """
+    if format not in RAW_FORMATS:
+        raise HTTPException(status_code=400, detail="Parquet export is not available")
+
+    if unit is not None and unit_vessel_id(db, unit) is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
+
+    filename = f"{table}_{unit}.{format}" if unit else f"{table}.{format}"
+    return StreamingResponse(
+        iter_raw_export(Db.engine, raw_stmt(table, unit), format),
+        media_type=PARQUET_MEDIA_TYPE if format == "parquet" else CSV_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,121 @@
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import FileResponse
+from pydantic_core import to_json
+
+from backend.api.etag import etag_headers, etag_matches, make_etag, not_modified
+from backend.api.fleet_report import (
+    REPORT_MEDIA_TYPE,
+    fleet_report,
+    fleet_report_version,
+)
+from backend.api.fleet_stats import PlantStatsModel, load_fleet_stats
+from backend.api.unit_exposure import UnitExposureModel, exposure_cache
+from backend.api.unit_helpers import units_versions, version_tags
+from backend.api.unit_timeline import UnitStateModel, timeline_cache, unit_state
+from backend.cache import response_cache
+from backend.db import DbSessionDep
+
+fleet_router = APIRouter(prefix="/fleet", tags=["Fleet"])
+
+
+@fleet_router.get("/state", operation_id="get_fleet_state")
+def fleet_state(
+    db: DbSessionDep,
+    as_of: Annotated[
+        date | None, Query(description="Date of the state, today by default")
+    ] = None,
+) -> dict[str, UnitStateModel]:
+    """
+    Get the state of every unit's vessel as of the date, as a map by unit
+    name_eng (see `/unit2/{name_eng}/state`).
+    """
+    versions = units_versions(db)
+    timelines = timeline_cache.get(db, versions.values())
+
+    day = (as_of or date.today()).isoformat()
+    return {
+        name_eng: unit_state(timelines.get(version.vessel_id), day)
+        for name_eng, version in versions.items()
+    }
+
+
+@fleet_router.get("/exposure", operation_id="get_fleet_exposure")
+def fleet_exposure(
+    db: DbSessionDep,
+    as_of: Annotated[
+        date | None,
+        Query(description="Count the in-core time up to the date, today by default"),
+    ] = None,
+) -> dict[str, UnitExposureModel]:
+    """
+    Get the cumulative in-core time of every unit's container systems
+    & placements, as a map by unit name_eng (see `/unit2/{name_eng}/exposure`).
+    Only the units changed since the last call are recomputed.
+    """
+    versions = units_versions(db)
+    timelines = timeline_cache.get(db, versions.values())
+
+    day = (as_of or date.today()).isoformat()
+    exposures = exposure_cache.get(db, versions.values(), timelines, day)
+    return {
+        name_eng: exposures.get(version.vessel_id)
+        or UnitExposureModel(as_of=day, container_systems={}, placements={})
+        for name_eng, version in versions.items()
+    }
+
+
+@fleet_router.get("/stats", operation_id="get_fleet_stats")
+def fleet_stats(request: Request, db: DbSessionDep) -> list[PlantStatsModel]:
+    """
+    Get per-plant & per-unit counts of occupied & free placements, loaded &
+    extracted container systems, complects in reserve & the time since the
+    last extraction. Responds with ``304 Not Modified`` if the client's ETag
+    is still current.
+    """
+    versions = units_versions(db)
+    today = date.today()
+
+    etag = make_etag(
+        "fleet-stats", today, *(version.token for version in versions.values())
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached.to_response(etag_headers(etag))
+
+    entry = response_cache.put(
+        cache_key,
+        to_json(load_fleet_stats(db, today)),
+        tags=[tag for version in versions.values() for tag in version_tags(version)],
+        etag=etag,
+    )
+    return entry.to_response(etag_headers(etag))
+
+
+@fleet_router.get("/report", operation_id="get_fleet_report")
+def fleet_report_download(request: Request, db: DbSessionDep):
+    """
+    Download the fleet report: a zip archive with the history workbook of
+    every unit (see `/unit2/{name_eng}/export`). The report is built by
+    a pool of worker processes & kept until the data of any unit changes.
+    Responds with ``304 Not Modified`` if the client's ETag is still current.
+    """
+    versions = units_versions(db).values()
+
+    etag = make_etag(fleet_report_version(versions))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    path = fleet_report.get(db, versions)
+    return FileResponse(
+        path,
+        media_type=REPORT_MEDIA_TYPE,
+        filename=f"fleet_report_{date.today():%Y%m%d}.zip",
+        headers=etag_headers(etag),
+    )
@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import IO
+
+from sqlalchemy.orm import Session
+
+from backend.api.unit_export import unit_sheets, units_stmt
+from backend.api.unit_helpers import UnitVersion
+from backend.cache import single_flight
+from backend.config import config
+from backend.workbook import workbook_bytes
+
+logger = logging.getLogger(__name__)
+
+REPORT_MEDIA_TYPE = "application/zip"
+
+
+def fleet_report_version(versions: Iterable[UnitVersion]) -> str:
+    """Version of the report: changes whenever any unit's data changes."""
+    tokens = "|".join(version.token for version in versions)
+    return hashlib.sha1(f"fleet-report|{tokens}".encode()).hexdigest()
+
+
+def write_fleet_report(db: Session, file: IO[bytes], workers: int) -> int:
+    """
+    Write the fleet report into the file: a zip archive with the history
+    workbook of every unit (see `unit_sheets`), ordered by plant & unit.
+
+    The rows are queried here, the workbooks are written by a pool of worker
+    processes (openpyxl is CPU-bound); at most ``2 * workers`` units are in
+    flight, so memory is bounded by the size of a few units.
+    With a single worker everything runs in this process.
+
+    Returns the number of units written.
+    """
+    units = db.execute(units_stmt()).all()
+
+    def sheets(unit) -> list:
+        # Materialized to be sent to a worker process
+        return [
+            sheet._replace(rows=list(sheet.rows)) for sheet in unit_sheets(db, unit)
+        ]
+
+    with zipfile.ZipFile(file, "w", zipfile.ZIP_STORED) as archive:
+        # Workbooks are zip archives already, stored as is
+
+        def add(name_eng: str, content: bytes) -> None:
+            archive.writestr(f"{name_eng}.xlsx", content)
+
+        if workers <= 1:
+            for unit in units:
+                add(unit.name_eng, workbook_bytes(sheets(unit)))
+            return len(units)
+
+        # Spawned: forked workers would inherit the server's threads & connections
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            pending: deque[tuple[str, Future]] = deque()
+            for unit in units:
+                if len(pending) >= 2 * workers:
+                    name_eng, future = pending.popleft()
+                    add(name_eng, future.result())
+                pending.append(
+                    (unit.name_eng, pool.submit(workbook_bytes, sheets(unit)))
+                )
+
+            while pending:
+                name_eng, future = pending.popleft()
+                add(name_eng, future.result())
+
+    return len(units)
+
+
+class FleetReport:
+    """
+    The fleet report, built on demand & kept in a temporary file until the
+    data of any unit changes. Concurrent requests share a single build.
+
+    A superseded report may still be being downloaded, so its file is only
+    deleted once the next report supersedes it in turn.
+    """
+
+    def __init__(self, workers: int, directory: Path | None = None):
+        self.workers = workers
+        self.directory = Path(directory or tempfile.gettempdir())
+        self._report: tuple[str, Path] | None = None
+        self._superseded: Path | None = None  # previous report, maybe in download
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, versions: Iterable[UnitVersion]) -> Path:
+        """Get the path of the report for the current data, building it if needed."""
+        version = fleet_report_version(versions)
+
+        with self._lock:
+            if self._report is not None and self._report[0] == version:
+                return self._report[1]
+
+        return single_flight.do(
+            f"fleet-report|{version}", lambda: self._build(db, version)
+        )
+
+    def _build(self, db: Session, version: str) -> Path:
+        path = self.directory / f"ksar-fleet-report-{version}.zip"
+
+        start = time.perf_counter()
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, prefix="ksar-fleet-report-", suffix=".tmp", delete=False
+        ) as file:
+            try:
+                units = write_fleet_report(db, file, self.workers)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, path)
+        logger.info(
+            "Fleet report built: %d units in %.1f s (%d workers)",
+            units,
+            time.perf_counter() - start,
+            self.workers,
+        )
+
+        with self._lock:
+            previous, self._report = self._report, (version, path)
+            expired = None
+            if previous is not None and previous[1] != path:
+                expired, self._superseded = self._superseded, previous[1]
+
+        if expired is not None and expired != path:
+            expired.unlink(missing_ok=True)
+        return path
+
+
+fleet_report = FleetReport(config.report_workers)
@@ -0,0 +1,249 @@
+from datetime import date
+
+from pydantic import BaseModel
+from sqlalchemy import and_, case, distinct, exists, func, select
+from sqlalchemy.orm import Session
+
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    NppTable,
+    NppUnitTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+    ReactorVesselTable,
+)
+
+
+class StatsModel(BaseModel):
+    placements: int = 0
+    occupied_placements: int = 0
+    free_placements: int = 0
+    container_systems: int = 0
+    loaded_container_systems: int = 0  # in core now
+    extracted_container_systems: int = 0  # extracted at least once
+    complects: int = 0
+    reserve_complects: int = 0  # none of the container systems ever loaded
+    last_extract_date: str | None = None
+    days_since_last_extract: int | None = None
+
+
+class UnitStatsModel(StatsModel):
+    unit_id: int
+    name: str
+    name_eng: str
+
+
+class PlantStatsModel(StatsModel):
+    plant_id: int
+    name: str
+    name_eng: str
+    units: list[UnitStatsModel]
+
+
+# Figures summed up for the plants
+COUNTS = [
+    "placements",
+    "occupied_placements",
+    "free_placements",
+    "container_systems",
+    "loaded_container_systems",
+    "extracted_container_systems",
+    "complects",
+    "reserve_complects",
+]
+
+
+def _days_since(day: str | None, today: date) -> int | None:
+    try:
+        return (today - date.fromisoformat(day)).days if day else None
+    except ValueError:
+        return None
+
+
+def _by_vessel(db: Session, stmt) -> dict:
+    return dict(db.execute(stmt).all())
+
+
+def load_fleet_stats(db: Session, today: date) -> list[PlantStatsModel]:
+    """
+    Count placements, container systems & complects by state for every unit
+    & plant. All the counting is done by queries grouped by vessel, only the
+    per-plant totals are summed here.
+    """
+    placements = _by_vessel(
+        db,
+        select(
+            ReactorVesselSectorTable.vessel_id, func.count(PlacementTable.placement_id)
+        )
+        .join(
+            PlacementTable,
+            PlacementTable.sector_id == ReactorVesselSectorTable.rpv_sector_id,
+        )
+        .group_by(ReactorVesselSectorTable.vessel_id),
+    )
+
+    # Placements holding a load which is not extracted yet
+    occupied_placements = _by_vessel(
+        db,
+        select(
+            ReactorVesselSectorTable.vessel_id,
+            func.count(distinct(CouponLoadTable.irrad_placement_id)),
+        )
+        .join(
+            PlacementTable,
+            PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+        )
+        .join(
+            ReactorVesselSectorTable,
+            ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+        )
+        .outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        )
+        .where(CouponExtractTable.cpn_extract_id.is_(None))
+        .group_by(ReactorVesselSectorTable.vessel_id),
+    )
+
+    complects = _by_vessel(
+        db,
+        select(
+            CouponComplectTable.vessel_id,
+            func.count(CouponComplectTable.coupon_complect_id),
+        ).group_by(CouponComplectTable.vessel_id),
+    )
+
+    reserve_complects = _by_vessel(
+        db,
+        select(
+            CouponComplectTable.vessel_id,
+            func.count(CouponComplectTable.coupon_complect_id),
+        )
+        .where(
+            ~exists(
+                select(CouponLoadTable.cpn_load_id)
+                .join(
+                    ContainerSysTable,
+                    ContainerSysTable.container_sys_id
+                    == CouponLoadTable.irrad_container_sys_id,
+                )
+                .where(
+                    ContainerSysTable.coupon_complect_id
+                    == CouponComplectTable.coupon_complect_id
+                )
+            )
+        )
+        .group_by(CouponComplectTable.vessel_id),
+    )
+
+    # Container systems of the vessel's complects with their loads & extracts
+    container_systems = {}
+    for vessel_id, *counts in db.execute(
+        select(
+            CouponComplectTable.vessel_id,
+            func.count(distinct(ContainerSysTable.container_sys_id)),
+            func.count(
+                distinct(
+                    case(
+                        (
+                            and_(
+                                CouponLoadTable.cpn_load_id.is_not(None),
+                                CouponExtractTable.cpn_extract_id.is_(None),
+                            ),
+                            ContainerSysTable.container_sys_id,
+                        )
+                    )
+                )
+            ),
+            func.count(
+                distinct(
+                    case(
+                        (
+                            CouponExtractTable.cpn_extract_id.is_not(None),
+                            ContainerSysTable.container_sys_id,
+                        )
+                    )
+                )
+            ),
+            func.max(CouponExtractTable.extract_date),
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.coupon_complect_id
+            == CouponComplectTable.coupon_complect_id,
+        )
+        .outerjoin(
+            CouponLoadTable,
+            CouponLoadTable.irrad_container_sys_id
+            == ContainerSysTable.container_sys_id,
+        )
+        .outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        )
+        .group_by(CouponComplectTable.vessel_id)
+    ):
+        container_systems[vessel_id] = counts
+
+    units = db.execute(
+        select(
+            NppTable.plant_id,
+            NppTable.name.label("plant_name"),
+            NppTable.name_eng.label("plant_name_eng"),
+            NppUnitTable.unit_id,
+            NppUnitTable.name,
+            NppUnitTable.name_eng,
+            ReactorVesselTable.vessel_id,
+        )
+        .join(NppUnitTable, NppUnitTable.plant_id == NppTable.plant_id)
+        .outerjoin(
+            ReactorVesselTable, ReactorVesselTable.unit_id == NppUnitTable.unit_id
+        )
+        .order_by(NppTable.num, NppUnitTable.num)
+    ).all()
+
+    plants: dict[int, PlantStatsModel] = {}
+    for unit in units:
+        vessel_id = unit.vessel_id
+        total, loaded, extracted, last_extract_date = container_systems.get(
+            vessel_id, (0, 0, 0, None)
+        )
+        unit_stats = UnitStatsModel(
+            unit_id=unit.unit_id,
+            name=unit.name,
+            name_eng=unit.name_eng,
+            placements=placements.get(vessel_id, 0),
+            occupied_placements=occupied_placements.get(vessel_id, 0),
+            free_placements=placements.get(vessel_id, 0)
+            - occupied_placements.get(vessel_id, 0),
+            container_systems=total,
+            loaded_container_systems=loaded,
+            extracted_container_systems=extracted,
+            complects=complects.get(vessel_id, 0),
+            reserve_complects=reserve_complects.get(vessel_id, 0),
+            last_extract_date=last_extract_date,
+            days_since_last_extract=_days_since(last_extract_date, today),
+        )
+
+        plant = plants.get(unit.plant_id)
+        if plant is None:
+            plant = plants[unit.plant_id] = PlantStatsModel(
+                plant_id=unit.plant_id,
+                name=unit.plant_name,
+                name_eng=unit.plant_name_eng,
+                units=[],
+            )
+        plant.units.append(unit_stats)
+
+    for plant in plants.values():
+        for name in COUNTS:
+            setattr(plant, name, sum(getattr(u, name) for u in plant.units))
+
+        dates = [u.last_extract_date for u in plant.units if u.last_extract_date]
+        plant.last_extract_date = max(dates, default=None)
+        plant.days_since_last_extract = _days_since(plant.last_extract_date, today)
+
+    return list(plants.values())
@@ -0,0 +1,83 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from pydantic import BaseModel
+
+from backend.api.auth import get_admin_user
+from backend.db import DbSessionDep
+from backend.history_import import HistoryImportError, ImportPlan, import_history
+
+history_router = APIRouter(
+    prefix="/history", tags=["History"], dependencies=[Depends(get_admin_user)]
+)
+
+
+class ImportIssueModel(BaseModel):
+    row: int
+    message: str
+
+
+class ImportLoadModel(BaseModel):
+    row: int
+    container_sys_id: int
+    placement_id: int
+    load_date: str
+    extract_date: str | None
+
+
+class ImportExtractModel(BaseModel):
+    row: int
+    cpn_load_id: int
+    container_sys_id: int
+    extract_date: str
+
+
+class ImportResultModel(BaseModel):
+    committed: bool
+    rows: int
+    unchanged: int
+    loads: list[ImportLoadModel]  # new loads (with their extracts)
+    extracts: list[ImportExtractModel]  # new extracts of stored loads
+    issues: list[ImportIssueModel]
+
+
+def _result(plan: ImportPlan, committed: bool) -> ImportResultModel:
+    return ImportResultModel(
+        committed=committed,
+        rows=plan.rows,
+        unchanged=plan.unchanged,
+        loads=[ImportLoadModel(**load._asdict()) for load in plan.loads],
+        extracts=[ImportExtractModel(**extract._asdict()) for extract in plan.extracts],
+        issues=[ImportIssueModel(**issue._asdict()) for issue in plan.issues],
+    )
+
+
+@history_router.post("/import", operation_id="import_history")
+def import_history_workbook(
+    db: DbSessionDep,
+    file: Annotated[UploadFile, File()],
+    dry_run: Annotated[
+        bool, Query(description="Only report what would be written")
+    ] = False,
+) -> ImportResultModel:
+    """
+    Import load/extract history from an Excel workbook (administrators only).
+
+    The first sheet has a header row naming the columns ``unit``, ``complect``,
+    ``container_sys``, ``placement``, ``load_date`` & optionally
+    ``extract_date`` and ``placement_unit`` (a placement of another unit).
+    Rows already stored are left unchanged, extracts are added to stored loads.
+
+    All the rows are written in a single transaction, or none if any row has
+    an issue (responds with ``400`` & the issues). With ``dry_run`` nothing
+    is written & the diff is returned.
+    """
+    try:
+        plan = import_history(db, file.file, dry_run=dry_run)
+    except HistoryImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = _result(plan, committed=not dry_run and not plan.issues)
+    if plan.issues and not dry_run:
+        raise HTTPException(status_code=400, detail=result.model_dump())
+    return result
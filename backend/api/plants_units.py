@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+import json
+
+from fastapi import APIRouter, Request, Response
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import joinedload
 
+from backend.api.etag import etag_headers, etag_matches, make_etag, not_modified
 from backend.db import DbSessionDep
 from backend.tables import NppTable
 
@@ -8,9 +12,10 @@ plants_units_router = APIRouter()
 
 
 @plants_units_router.get("/plants_units", operation_id="get_plants_units")
-def plants_units(db: DbSessionDep):
+def plants_units(request: Request, response: Response, db: DbSessionDep):
     """
     Get the list of plants and their units.
+    Responds with ``304 Not Modified`` if the client's ETag is still current.
     """
 
     plants = (
@@ -42,4 +47,10 @@ def plants_units(db: DbSessionDep):
         }
         result.append(plant_data)
 
+    # The tree is small, so the ETag is simply a digest of its content
+    etag = make_etag(json.dumps(jsonable_encoder(result), sort_keys=True))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+
     return result
@@ -0,0 +1,267 @@
+import csv
+import io
+from collections.abc import Iterator
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Connection, Engine, Select, select
+from sqlalchemy.orm import aliased
+
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    NppTable,
+    NppUnitTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+    ReactorVesselTable,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, CSV is always available
+    pa = pq = None
+
+YIELD_PER = 5000  # Rows fetched at once & written as one CSV chunk / Parquet row group
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+
+def _owner_columns():
+    """Plant, unit & vessel of the complect owning the rows."""
+    return (
+        NppTable.name_eng.label("plant_name_eng"),
+        NppUnitTable.name_eng.label("unit_name_eng"),
+        CouponComplectTable.vessel_id,
+    )
+
+
+def _join_owner(stmt: Select) -> Select:
+    return (
+        stmt.join(
+            ReactorVesselTable,
+            ReactorVesselTable.vessel_id == CouponComplectTable.vessel_id,
+        )
+        .join(NppUnitTable, NppUnitTable.unit_id == ReactorVesselTable.unit_id)
+        .join(NppTable, NppTable.plant_id == NppUnitTable.plant_id)
+    )
+
+
+def _complects_stmt() -> Select:
+    return _join_owner(
+        select(
+            *_owner_columns(),
+            CouponComplectTable.coupon_complect_id,
+            CouponComplectTable.name,
+            CouponComplectTable.complect_number,
+            CouponComplectTable.is_additional,
+        )
+    ).order_by(CouponComplectTable.coupon_complect_id)
+
+
+def _container_systems_stmt() -> Select:
+    return _join_owner(
+        select(
+            *_owner_columns(),
+            CouponComplectTable.name.label("complect_name"),
+            ContainerSysTable.container_sys_id,
+            ContainerSysTable.coupon_complect_id,
+            ContainerSysTable.name,
+        ).join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+    ).order_by(ContainerSysTable.container_sys_id)
+
+
+def _loads_stmt() -> Select:
+    HostVessel = aliased(ReactorVesselTable)
+    HostUnit = aliased(NppUnitTable)
+    return _join_owner(
+        select(
+            *_owner_columns(),
+            CouponComplectTable.name.label("complect_name"),
+            ContainerSysTable.name.label("container_sys_name"),
+            CouponLoadTable.cpn_load_id,
+            CouponLoadTable.load_date,
+            CouponLoadTable.irrad_container_sys_id,
+            CouponLoadTable.irrad_placement_id,
+            PlacementTable.name.label("placement_name"),
+            ReactorVesselSectorTable.vessel_id.label("host_vessel_id"),
+            HostUnit.name_eng.label("host_unit_name_eng"),
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+        .join(
+            PlacementTable,
+            PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+        )
+        .join(
+            ReactorVesselSectorTable,
+            ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+        )
+        .join(HostVessel, HostVessel.vessel_id == ReactorVesselSectorTable.vessel_id)
+        .join(HostUnit, HostUnit.unit_id == HostVessel.unit_id)
+    ).order_by(CouponLoadTable.cpn_load_id)
+
+
+def _extracts_stmt() -> Select:
+    return _join_owner(
+        select(
+            *_owner_columns(),
+            CouponComplectTable.name.label("complect_name"),
+            ContainerSysTable.name.label("container_sys_name"),
+            CouponExtractTable.cpn_extract_id,
+            CouponExtractTable.cpn_load_id,
+            CouponExtractTable.extract_date,
+            CouponExtractTable.irrad_container_sys_id,
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponExtractTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+    ).order_by(CouponExtractTable.cpn_extract_id)
+
+
+# Exported tables, joined with the plant, unit & vessel owning their rows
+RAW_TABLES = {
+    "complects": _complects_stmt,
+    "container_systems": _container_systems_stmt,
+    "loads": _loads_stmt,
+    "extracts": _extracts_stmt,
+}
+
+RAW_FORMATS = ("csv", "parquet") if pa is not None else ("csv",)
+
+
+def raw_stmt(table: str, unit: str | None = None) -> Select:
+    """Statement of the exported table, optionally limited to a unit (by name_eng)."""
+    stmt = RAW_TABLES[table]()
+    if unit is not None:
+        stmt = stmt.where(NppUnitTable.name_eng == unit)
+    return stmt.execution_options(yield_per=YIELD_PER)
+
+
+def iter_csv(connection: Connection, stmt: Select) -> Iterator[bytes]:
+    """
+    Stream the rows as CSV, a chunk per batch of fetched rows.
+    Plain rows are fetched with a server-side cursor (``yield_per``), so
+    memory stays constant whatever the table size.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    result = connection.execute(stmt)
+    writer.writerow(result.keys())
+    for rows in result.partitions():
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _arrow_schema(stmt: Select):
+    """Arrow schema of the statement's columns, by their Python types."""
+    arrow_types = {
+        int: pa.int64(),
+        float: pa.float64(),
+        Decimal: pa.float64(),
+        bool: pa.bool_(),
+        date: pa.date32(),
+        datetime: pa.timestamp("us"),
+    }
+
+    fields = []
+    for column in stmt.selected_columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = str
+        fields.append(pa.field(column.key, arrow_types.get(python_type, pa.string())))
+    return pa.schema(fields)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only sink collecting what the Parquet writer wrote since the last drain."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_parquet(connection: Connection, stmt: Select) -> Iterator[bytes]:
+    """
+    Stream the rows as a Parquet file, a row group per batch of fetched rows
+    (see `iter_csv`). Requires pyarrow.
+    """
+    schema = _arrow_schema(stmt)
+    sink = _ChunkSink()
+
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for rows in connection.execute(stmt).partitions():
+            columns = list(zip(*rows))
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        pa.array(values, type=field.type)
+                        for values, field in zip(columns, schema)
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+def iter_raw_export(engine: Engine, stmt: Select, format: str) -> Iterator[bytes]:
+    """
+    Stream the rows in the format (one of `RAW_FORMATS`) over a connection of
+    its own, checked out when the streaming starts & returned to the pool when
+    it ends or is aborted: a request's session is closed before its streamed
+    body is sent (depending on the FastAPI version), so it cannot be used.
+    """
+    with engine.connect() as connection:
+        if format == "parquet":
+            yield from iter_parquet(connection, stmt)
+        else:
+            yield from iter_csv(connection, stmt)
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+
+from backend.api.auth import get_admin_user
+from backend.cache import response_cache, single_flight
+from backend.db import DbSessionDep
+from backend.events import broker
+from backend.profiler import profile_ring
+from backend.tables import DataFindingTable
+from backend.validation import run_validation
+
+system_router = APIRouter(prefix="/system", tags=["System"])
+
+
+@system_router.get("/cache", operation_id="get_cache_stats")
+def cache_stats():
+    """
+    Get the response cache statistics (hits, misses, evictions, size)
+    & the coalescing of concurrent response builds.
+    """
+    return {
+        **response_cache.stats(),
+        "single_flight": single_flight.stats(),
+    }
+
+
+@system_router.get("/events", operation_id="get_events_stats")
+def events_stats():
+    """Get the push notifications statistics (subscribers, published & dropped events)."""
+    return broker.stats()
+
+
+@system_router.post(
+    "/validation",
+    operation_id="run_validation",
+    dependencies=[Depends(get_admin_user)],
+)
+def validate(db: DbSessionDep):
+    """
+    Check the load/extract history of the whole fleet & replace the findings
+    of the previous run (administrators only).
+    """
+    return run_validation(db)._asdict()
+
+
+@system_router.get(
+    "/validation",
+    operation_id="get_validation_findings",
+    dependencies=[Depends(get_admin_user)],
+)
+def validation_findings(db: DbSessionDep):
+    """Get the findings of the last history validation run (administrators only)."""
+    findings = db.execute(
+        select(DataFindingTable).order_by(
+            DataFindingTable.vessel_id, DataFindingTable.check_name
+        )
+    ).scalars()
+
+    return [
+        {
+            "check_name": finding.check_name,
+            "vessel_id": finding.vessel_id,
+            "table_name": finding.table_name,
+            "row_id": finding.row_id,
+            "message": finding.message,
+            "found_at": finding.found_at,
+        }
+        for finding in findings
+    ]
+
+
+@system_router.get(
+    "/profiles",
+    operation_id="get_profiles",
+    dependencies=[Depends(get_admin_user)],
+)
+def profiles():
+    """
+    List the stored request profiles, latest first (administrators only).
+    A request is profiled with the ``X-Profile: 1`` header or ``?profile=1``.
+    """
+    return profile_ring.list()
+
+
+@system_router.get(
+    "/profiles/{profile_id}",
+    operation_id="get_profile",
+    dependencies=[Depends(get_admin_user)],
+)
+def profile(profile_id: str):
+    """Download a request profile report (administrators only)."""
+    path = profile_ring.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(
+        path,
+        media_type="text/plain; charset=utf-8",
+        filename=f"profile_{profile_id}.txt",
+    )
@@ -1,13 +1,52 @@
-from typing import Optional
-from fastapi import APIRouter, HTTPException
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import joinedload
+from sqlalchemy import Row, or_, select
+from sqlalchemy.orm import Session, aliased, joinedload
+from backend.cache import CacheEntry, response_cache, single_flight
 from backend.db import DbSessionDep
+from backend.events import broker
+from backend.api.auth import get_admin_user
+from backend.api.etag import etag_headers, etag_matches, make_etag, not_modified
+from backend.api.unit_changes import UnitChangesModel, load_unit_changes
+from backend.api.unit_details import (
+    encode_unit_details,
+    encode_units_details,
+    load_unit_rows,
+    load_units_rows,
+)
+from backend.api.unit_export import export_unit_workbook, iter_file
+from backend.workbook import XLSX_MEDIA_TYPE
+from backend.api.unit_outage import (
+    OutageConflict,
+    OutageModel,
+    OutageResultModel,
+    write_outage,
+)
+from backend.api.unit_exposure import UnitExposureModel, exposure_cache
+from backend.api.unit_timeline import UnitStateModel, timeline_cache, unit_state
+from backend.api.unit_helpers import (
+    UNIT_SUMMARY_FIELDS,
+    load_unit_summary,
+    parse_fields,
+    placements_coords,
+    placement_text_coords,
+    unit_vessel_id,
+    unit_version,
+    version_tags,
+)
 from backend.models import UnitModel, CouponLoadModel
 from backend.tables import (
+    NppTable,
     NppUnitTable,
     PlacementTable,
     CouponLoadTable,
+    CouponExtractTable,
     ContainerSysTable,
     ReactorVesselSectorTable,
     CouponComplectTable,
@@ -17,107 +56,15 @@ from backend.tables import (
 unit_router = APIRouter()
 
 
-placements_coords = {
-    1: {
-        1: (5377, 2432),
-        2: (5313, 2194),
-        3: (5120, 1775),
-        4: (4853, 1399),
-        5: (4678, 1225),
-    },
-    2: {
-        1: (3696, 658),
-        2: (3459, 595),
-        3: (2999, 552),
-        4: (2539, 595),
-        5: (2303, 658)
-    },
-    3: {
-        1: (1320, 1225),
-        2: (1146, 1399),
-        3: (879, 1775),
-        4: (687, 2194),
-        5: (623, 2432),
-    },
-    4: {
-        1: (623, 3566),
-        2: (687, 3805),
-        3: (879, 4223),
-        4: (1146, 4599),
-        5: (1320, 4773),
-    },
-    5: {
-        1: (2303, 5341),
-        2: (2539, 5404),
-        3: (2999, 5448),
-        4: (3459, 5404),
-        5: (3696, 5341),
-    },
-    6: {
-        1: (4678, 4773),
-        2: (4853, 4599),
-        3: (5120, 4223),
-        4: (5313, 3805),
-        5: (5377, 3566),
-    },
-}  # fmt: skip
-
-
-placement_text_coords = {
-    1: {
-        1: (5712, 2376),
-        2: (5642, 2114),
-        3: (5431, 1653),
-        4: (5137, 1240),
-        5: (4946, 1048),
-    },
-    2: {
-        1: (3810, 425),
-        2: (3470, 355),
-        3: (3015, 317),
-        4: (2540, 355),
-        5: (2210, 425)
-    },
-    3: {
-        1: (1103, 1048),
-        2: (912, 1240),
-        3: (618, 1653),
-        4: (407, 2114),
-        5: (337, 2376),
-    },
-    4: {
-        1: (337, 3623),
-        2: (407, 3885),
-        3: (618, 4346),
-        4: (912, 4759),
-        5: (1103, 4951),
-    },
-    5: {
-        1: (2210, 5574),
-        2: (2540, 5646),
-        3: (3015, 5693),
-        4: (3470, 5645),
-        5: (3810, 5574),
-    },
-    6: {
-        1: (4946, 4951),
-        2: (5137, 4759),
-        3: (5431, 4346),
-        4: (5642, 3885),
-        5: (5712, 3623),
-    },
-}  # fmt: skip
-
-
 ###########
 
 
 class PlacementDetailsModel(BaseModel):
     occupied: bool
-    last_sys_name: Optional[str] = None
+    last_sys_name: str | None = None  # of the last loaded container system
     load_ids: list[int]
-    coords: tuple[int, int]
-    text_coords: tuple[int, int]
+    coords: tuple[int, int] | None  # None beyond the drawn placements layout
+    text_coords: tuple[int, int] | None
 
 
 class ContainerSysDetailsModel(BaseModel):
@@ -129,158 +76,352 @@ class UnitDetailsModel(BaseModel):
     loads: dict[int, CouponLoadModel]
     placements_details: dict[int, PlacementDetailsModel]
     container_systems_details: dict[int, ContainerSysDetailsModel]
+    change_seq: int = 0  # cursor for `/unit2/{name_eng}/changes`
+    data_issues: int = 0  # findings of the last history validation run
+
+
+@unit_router.get("/unit2", operation_id="get_units2")
+def units_detail2(
+    db: DbSessionDep,
+    name_eng: Annotated[
+        list[str] | None,
+        Query(description="Units to get (by name_eng), may be repeated"),
+    ] = None,
+    plant: Annotated[
+        str | None,
+        Query(description="Get all units of the plant (by plant name_eng)"),
+    ] = None,
+) -> dict[str, UnitDetailsModel]:
+    """
+    Get many units at once with complete placement and complects data,
+    as a map by unit name_eng. Selects the listed units and/or all units of
+    the plant, or the whole fleet if neither is given.
+
+    The number of queries does not depend on the number of units.
+    """
+
+    criteria = []
+    if name_eng:
+        criteria.append(NppUnitTable.name_eng.in_(name_eng))
+    if plant:
+        criteria.append(NppTable.name_eng == plant)
+
+    rows_by_name = (
+        load_units_rows(db, or_(*criteria)) if criteria else load_units_rows(db)
+    )
+
+    missing = [name for name in name_eng or [] if name not in rows_by_name]
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Units not found: {', '.join(missing)}"
+        )
+
+    return Response(
+        content=encode_units_details(rows_by_name), media_type="application/json"
+    )
 
 
 @unit_router.get("/unit2/{name_eng}", operation_id="get_unit2")
-def unit_detail2(name_eng: str, db: DbSessionDep) -> UnitDetailsModel:
+def unit_detail2(
+    name_eng: str,
+    request: Request,
+    db: DbSessionDep,
+    fields: Annotated[
+        str | None,
+        Query(
+            description="Comma-separated top-level fields to return, e.g. `unit,data_issues`"
+        ),
+    ] = None,
+) -> UnitDetailsModel:
     """
     Get specific unit by name_eng with complete placement and complects data.
+    Responds with ``304 Not Modified`` if the client's ETag is still current.
+
+    With ``fields=`` only the listed top-level fields are returned; the loads
+    are not loaded unless the loads or the details are requested.
     """
 
-    print("loading unit:")
+    field_names = parse_fields(fields, UnitDetailsModel.model_fields)
 
-    unit = (
-        db.query(NppUnitTable)
-        .options(
-            joinedload(NppUnitTable.reactor_vessel)
-            .joinedload(ReactorVesselTable.sectors)
-            .joinedload(ReactorVesselSectorTable.placements),
-            joinedload(NppUnitTable.reactor_vessel)
-            .joinedload(ReactorVesselTable.coupon_complects)
-            .joinedload(CouponComplectTable.container_systems),
-        )
-        .filter(NppUnitTable.name_eng == name_eng)
-        .first()
+    version = unit_version(db, name_eng)
+
+    if version is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
+
+    etag = make_etag("unit2", version.token, field_names)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached.to_response(etag_headers(etag))
+
+    with_loads = field_names is None or not set(field_names).isdisjoint(
+        ("loads", "placements_details", "container_systems_details")
     )
 
+    def build() -> CacheEntry:
+        rows = load_unit_rows(db, name_eng, with_loads=with_loads)
+        if rows is None:
+            raise HTTPException(status_code=404, detail="Unit not found")
+
+        return response_cache.put(
+            cache_key,
+            encode_unit_details(rows, field_names),
+            tags=version_tags(version),
+            etag=etag,
+        )
+
+    # Concurrent requests for the same unit version share a single build
+    entry = single_flight.do(f"{cache_key}|{etag}", build)
+    return entry.to_response(etag_headers(etag))
+
+
+@unit_router.get("/unit2/{name_eng}/changes", operation_id="get_unit2_changes")
+def unit_changes2(
+    name_eng: str,
+    db: DbSessionDep,
+    since: Annotated[
+        int,
+        Query(
+            ge=0, description="Cursor: `change_seq` of the unit or a previous `cursor`"
+        ),
+    ] = 0,
+) -> UnitChangesModel:
+    """
+    Get the loads, extracts, complects & container systems of the unit which
+    were added, changed or removed after the cursor, plus the new cursor.
+    Lets clients holding `/unit2/{name_eng}` stay current without refetching it.
+    """
+
+    unit = unit_vessel_id(db, name_eng)
+
     if unit is None:
         raise HTTPException(status_code=404, detail="Unit not found")
 
-    print("loading loads:")
-
-    loads = (
-        db.query(CouponLoadTable)
-        .options(joinedload(CouponLoadTable.coupon_extract))
-        .join(CouponLoadTable.irrad_container_sys)
-        .join(ContainerSysTable.coupon_complect)
-        .join(CouponComplectTable.vessel)
-        .order_by(
-            CouponLoadTable.load_date, ContainerSysTable.container_sys_id
-        )  # ordering is crucial for correct history calculation
-        .filter(CouponComplectTable.vessel_id == unit.reactor_vessel.vessel_id)
-        .all()
+    if unit.vessel_id is None:
+        return UnitChangesModel(since=since, cursor=since)
+
+    return load_unit_changes(db, unit.vessel_id, since)
+
+
+@unit_router.get("/unit2/{name_eng}/events", operation_id="get_unit2_events")
+async def unit_events2(name_eng: str, db: DbSessionDep):
+    """
+    Subscribe to the unit's changes as a Server-Sent Events stream.
+
+    Emits ``changes`` whenever loads, extracts, complects or container systems
+    of the unit's vessel are written (fetch `/unit2/{name_eng}/changes`), and
+    ``resync`` if the client fell behind & missed events (refetch the unit).
+    """
+
+    unit = await run_in_threadpool(unit_vessel_id, db, name_eng)
+
+    # Release the connection (also used for authentication), the stream may stay open for hours
+    db.close()
+
+    if unit is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
+
+    if unit.vessel_id is None:
+        raise HTTPException(status_code=404, detail="Unit has no reactor vessel")
+
+    return StreamingResponse(
+        broker.subscribe(f"vessel:{unit.vessel_id}"),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    print("collecting data:")
 
-    cs_load_ids: dict[int, list[int]] = {}
-    p_load_ids: dict[int, list[int]] = {}
+@unit_router.get("/unit2/{name_eng}/state", operation_id="get_unit2_state")
+def unit_state2(
+    name_eng: str,
+    db: DbSessionDep,
+    as_of: Annotated[
+        date | None, Query(description="Date of the state, today by default")
+    ] = None,
+) -> UnitStateModel:
+    """
+    Get the state of the unit's vessel as of the date: which load occupies
+    each placement & irradiates each container system of the vessel.
+    """
 
-    for complect in unit.reactor_vessel.coupon_complects:
-        for cs in complect.container_systems:
-            cs_load_ids[cs.container_sys_id] = []
+    version = unit_version(db, name_eng)
 
-    for sector in unit.reactor_vessel.sectors:
-        for placement in sector.placements:
-            p_load_ids[placement.placement_id] = []
+    if version is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
 
-    for load in loads:
-        if load.coupon_extract is not None:
-            assert (
-                load.coupon_extract.irrad_container_sys_id
-                == load.irrad_container_sys_id
-            ), "Coupon load and extract must refer to the same container system"
-
-        assert load.irrad_container_sys_id in cs_load_ids, (
-            f"Container system {load.irrad_container_sys_id} not found in complects for unit {unit.name_eng}"
-        )
+    timelines = timeline_cache.get(db, [version])
+    return unit_state(
+        timelines.get(version.vessel_id), (as_of or date.today()).isoformat()
+    )
 
-        cs_load_ids[load.irrad_container_sys_id].append(load.cpn_load_id)
 
-        assert load.irrad_placement_id in p_load_ids, (
-            f"Placement {load.irrad_placement_id} not found in unit {unit.name_eng}"
-        )
+@unit_router.get("/unit2/{name_eng}/exposure", operation_id="get_unit2_exposure")
+def unit_exposure2(
+    name_eng: str,
+    db: DbSessionDep,
+    as_of: Annotated[
+        date | None,
+        Query(description="Count the in-core time up to the date, today by default"),
+    ] = None,
+) -> UnitExposureModel:
+    """
+    Get the cumulative in-core time of the unit's container systems
+    & placements, plain & weighted by the host unit's power.
+    """
 
-        p_load_ids[load.irrad_placement_id].append(load.cpn_load_id)
+    version = unit_version(db, name_eng)
 
-    # format info
+    if version is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
 
-    unit_info = UnitModel.model_validate(unit, from_attributes=True)
+    day = (as_of or date.today()).isoformat()
+    if version.vessel_id is None:
+        return UnitExposureModel(as_of=day, container_systems={}, placements={})
 
-    ####################
-    # flatten response, send container sys as a separate list, then relate to complects via one-to-many
-    ####################
+    timelines = timeline_cache.get(db, [version])
+    return exposure_cache.get(db, [version], timelines, day)[version.vessel_id]
 
-    loads_info = {
-        load.cpn_load_id: CouponLoadModel.model_validate(load, from_attributes=True)
-        for load in loads
-    }
 
-    container_sys_details = {
-        container_sys.container_sys_id: ContainerSysDetailsModel(
-            load_ids=cs_load_ids[container_sys.container_sys_id]
-        )
-        for complect in unit.reactor_vessel.coupon_complects
-        for container_sys in complect.container_systems
-    }
+@unit_router.post(
+    "/unit2/{name_eng}/outage",
+    operation_id="post_unit2_outage",
+    dependencies=[Depends(get_admin_user)],
+)
+def unit_outage2(
+    name_eng: str, outage: OutageModel, db: DbSessionDep
+) -> OutageResultModel:
+    """
+    Record the extracts & loads of a refueling outage of the unit's vessel
+    in a single transaction (administrators only).
 
-    def process_placement(placement: PlacementTable) -> PlacementDetailsModel:
-        sector_number, num_in_sector = (
-            placement.sector.sector_number,
-            placement.num_in_sector,
-        )
+    The batch is checked against the current vessel state first: responds
+    with ``409 Conflict`` & the list of conflicts (nothing is written) if an
+    extracted load is not in the vessel or already extracted, a container
+    system was already loaded, or a placement is still occupied.
+    """
 
-        load_ids = p_load_ids[placement.placement_id]
-        loads = [loads_info[load_id] for load_id in load_ids]
-        loads.sort(key=lambda load: load.load_date)
+    version = unit_version(db, name_eng)
 
-        occupied = False
-        last_sys_name = None
+    if version is None or version.vessel_id is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
 
-        if loads:
-            occupied = loads[-1].coupon_extract is None
+    try:
+        return write_outage(db, version, outage)
+    except OutageConflict as e:
+        raise HTTPException(status_code=409, detail=e.messages)
 
-        return PlacementDetailsModel(
-            occupied=occupied,
-            last_sys_name=last_sys_name,
-            load_ids=load_ids,
-            coords=placements_coords[sector_number][num_in_sector],
-            text_coords=placement_text_coords[sector_number][num_in_sector],
-        )
 
-    placement_details = {
-        placement.placement_id: process_placement(placement)
-        for sector in unit.reactor_vessel.sectors
-        for placement in sector.placements
-    }
+@unit_router.get("/unit2/{name_eng}/export", operation_id="export_unit2")
+def unit_export(name_eng: str, db: DbSessionDep):
+    """
+    Export the unit's history to an Excel workbook.
+    The workbook is written to a temporary file first, then streamed.
+    """
+    file = export_unit_workbook(db, name_eng)
+    if file is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
 
-    unit_details = UnitDetailsModel(
-        unit=unit_info,
-        loads=loads_info,
-        container_systems_details=container_sys_details,
-        placements_details=placement_details,
+    size = file.seek(0, 2)
+    file.seek(0)
+    filename = f"unit_{name_eng}_{datetime.now():%Y%m%d_%H%M%S}.xlsx"
+    return StreamingResponse(
+        iter_file(file),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(size),
+        },
     )
 
-    return unit_details
-
 
 @unit_router.get("/unit/{name_eng}", operation_id="get_unit")
-def unit_detail(name_eng: str, db: DbSessionDep):
+def unit_detail(
+    name_eng: str,
+    request: Request,
+    db: DbSessionDep,
+    fields: Annotated[
+        str | None,
+        Query(description="Comma-separated top-level fields to return, e.g. `name`"),
+    ] = None,
+):
     """
     Get specific unit by name_eng with complete placement and complects data.
+    Responds with ``304 Not Modified`` if the client's ETag is still current.
+
+    With ``fields=`` only the listed top-level fields are returned; the unit's
+    own fields & ``plant`` are served without loading the vessel or history.
+    """
+
+    field_names = parse_fields(fields, (*UNIT_SUMMARY_FIELDS, "reactor_vessel"))
+
+    if field_names is not None and set(field_names) <= set(UNIT_SUMMARY_FIELDS):
+        summary = load_unit_summary(db, name_eng)
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Unit not found")
+
+        body = JSONResponse(
+            jsonable_encoder({name: summary[name] for name in field_names})
+        ).body
+        etag = make_etag("unit-summary", body.decode())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return Response(body, media_type="application/json", headers=etag_headers(etag))
+
+    version = unit_version(db, name_eng)
+
+    if version is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
+
+    etag = make_etag("unit", version.token, field_names)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key, etag)
+    if cached is not None:
+        return cached.to_response(etag_headers(etag))
+
+    def build() -> CacheEntry:
+        unit = build_unit_detail(name_eng, db)
+        if field_names is not None:
+            unit = {name: unit[name] for name in field_names}
+
+        return response_cache.put(
+            cache_key,
+            JSONResponse(jsonable_encoder(unit)).body,
+            tags=version_tags(version),
+            etag=etag,
+        )
+
+    # Concurrent requests for the same unit version share a single build
+    entry = single_flight.do(f"{cache_key}|{etag}", build)
+    return entry.to_response(etag_headers(etag))
+
+
+def build_unit_detail(name_eng: str, db: Session) -> dict:
+    """
+    Load the unit with its vessel & full loads history (legacy format).
+
+    Served from a fixed number of queries regardless of history size:
+    the unit with its plant & vessel, one query per vessel collection level
+    and a single query for all loads touching the vessel.
     """
 
-    # Get unit by name_eng with eager loading
+    # Get unit by name_eng; collections are fetched level by level (selectin)
+    # to avoid a cartesian product of sectors x complects
     unit = (
         db.query(NppUnitTable)
         .options(
             joinedload(NppUnitTable.plant),
             joinedload(NppUnitTable.reactor_vessel)
-            .joinedload(ReactorVesselTable.sectors)
-            .joinedload(ReactorVesselSectorTable.placements),
+            .selectinload(ReactorVesselTable.sectors)
+            .selectinload(ReactorVesselSectorTable.placements),
             joinedload(NppUnitTable.reactor_vessel)
-            .joinedload(ReactorVesselTable.coupon_complects)
-            .joinedload(CouponComplectTable.container_systems),
+            .selectinload(ReactorVesselTable.coupon_complects)
+            .selectinload(CouponComplectTable.container_systems),
         )
         .filter(NppUnitTable.name_eng == name_eng)
         .first()
@@ -298,86 +439,107 @@ def unit_detail(name_eng: str, db: DbSessionDep):
         raise HTTPException(
             status_code=500, detail="Unit reactor vessel data is missing"
         )
-    # loads = (
-    #     db.query(CouponLoadTable)
-    #     .join(
-    #         PlacementTable,
-    #         PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
-    #     )
-    #     .join(
-    #         ReactorVesselSectorTable,
-    #         ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
-    #     )
-    #     .join(
-    #         ReactorVesselTable,
-    #         ReactorVesselTable.vessel_id == ReactorVesselSectorTable.vessel_id,
-    #     )
-    #     .join(
-    #         ContainerSysTable,
-    #         ContainerSysTable.container_sys_id
-    #         == CouponLoadTable.irrad_container_sys_id,
-    #     )
-    #     .join(
-    #         CouponComplectTable,
-    #         CouponComplectTable.coupon_complect_id
-    #         == ContainerSysTable.coupon_complect_id,
-    #     )
-    #     .join(
-    #         ReactorVesselTableAliased,
-    #         ReactorVesselTableAliased.vessel_id == CouponComplectTable.vessel_id,
-    #     )
-    #     .filter(
-    #         (ReactorVesselTable.vessel_id == unit.reactor_vessel.vessel_id)
-    #         | (ReactorVesselTableAliased.vessel_id == unit.reactor_vessel.vessel_id)
-    #     )
-    #     .options(
-    #         joinedload(CouponLoadTable.irrad_container_sys).joinedload(
-    #             ContainerSysTable.coupon_complect
-    #         ),
-    #         joinedload(CouponLoadTable.irrad_placement).joinedload(
-    #             PlacementTable.sector
-    #         ),
-    #         joinedload(CouponLoadTable.irrad_container_sys).joinedload(
-    #             ContainerSysTable.coupon_extracts
-    #         ),
-    #     )
-    #     .order_by(
-    #         CouponLoadTable.load_date,
-    #         ReactorVesselSectorTable.sector_number,
-    #         PlacementTable.num_in_sector,
-    #         CouponComplectTable.complect_number,
-    #         ContainerSysTable.name,
-    #     )
-    #     .all()
-    # )
-
-    def process_placement(placement: PlacementTable):
+
+    vessel_id = unit.reactor_vessel.vessel_id
+
+    # Owner of the container system & host of the placement may be different
+    # vessels (non-native container systems), so both sides are resolved
+    ContainerSysVessel = aliased(ReactorVesselTable)
+    ContainerSysUnit = aliased(NppUnitTable)
+    PlacementVessel = aliased(ReactorVesselTable)
+    PlacementUnit = aliased(NppUnitTable)
+
+    # All loads touching this vessel: loads into its placements (including
+    # foreign container systems) and loads of its own container systems
+    # (including those irradiated in other vessels)
+    loads = db.execute(
+        select(
+            CouponLoadTable.cpn_load_id,
+            CouponLoadTable.load_date,
+            CouponLoadTable.irrad_container_sys_id,
+            CouponLoadTable.irrad_placement_id,
+            CouponExtractTable.cpn_extract_id,
+            CouponExtractTable.extract_date,
+            ContainerSysTable.name.label("container_sys_name"),
+            CouponComplectTable.vessel_id.label("container_sys_vessel_id"),
+            ContainerSysUnit.name.label("container_sys_unit_name"),
+            PlacementTable.name.label("placement_name"),
+            ReactorVesselSectorTable.vessel_id.label("placement_vessel_id"),
+            PlacementUnit.name.label("placement_unit_name"),
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+        .join(
+            ContainerSysVessel,
+            ContainerSysVessel.vessel_id == CouponComplectTable.vessel_id,
+        )
+        .join(ContainerSysUnit, ContainerSysUnit.unit_id == ContainerSysVessel.unit_id)
+        .join(
+            PlacementTable,
+            PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+        )
+        .join(
+            ReactorVesselSectorTable,
+            ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+        )
+        .join(
+            PlacementVessel,
+            PlacementVessel.vessel_id == ReactorVesselSectorTable.vessel_id,
+        )
+        .join(PlacementUnit, PlacementUnit.unit_id == PlacementVessel.unit_id)
+        .outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        )
+        .where(
+            or_(
+                CouponComplectTable.vessel_id == vessel_id,
+                ReactorVesselSectorTable.vessel_id == vessel_id,
+            )
+        )
+        .order_by(CouponLoadTable.load_date, CouponLoadTable.cpn_load_id)
+    ).all()
+
+    placement_loads: dict[int, list[Row]] = defaultdict(list)
+    container_sys_loads: dict[int, list[Row]] = defaultdict(list)
+    seen_load_ids: set[int] = set()
+
+    # The history is not checked here (see `backend.validation`), dirty data is shown as is
+    for load in loads:
+        if load.cpn_load_id in seen_load_ids:
+            continue  # extracted more than once, the first extract is shown
+        seen_load_ids.add(load.cpn_load_id)
+
+        if load.placement_vessel_id == vessel_id:
+            placement_loads[load.irrad_placement_id].append(load)
+        if load.container_sys_vessel_id == vessel_id:
+            container_sys_loads[load.irrad_container_sys_id].append(load)
+
+    def process_placement(placement: PlacementTable, sector_number: int):
         loads = []
 
         occupied = False
         last_sys_name = None
-        for load in placement.coupon_loads:
-            if occupied:
-                raise ValueError("Placement already occupied")
-            occupied = True
-            last_sys_name = load.irrad_container_sys.name
-            load_date = load.load_date
-            extract_date = None
-
-            extracts = load.irrad_container_sys.coupon_extracts
-            if extracts:
-                if len(extracts) > 1:
-                    raise NotImplementedError(
-                        "Container system cannot be extracted twice, they should be treated as a separate entities (one became another via modernization)"
-                    )
-                extract_date = extracts[0].extract_date
-                occupied = False
+        for load in placement_loads[placement.placement_id]:
+            native = load.container_sys_vessel_id == vessel_id
+            last_sys_name = load.container_sys_name
+            occupied = load.cpn_extract_id is None
 
             loads.append(
                 {
-                    "container_sys_name": load.irrad_container_sys.name,
-                    "load_date": load_date,
-                    "extract_date": extract_date,
+                    "container_sys_name": load.container_sys_name,
+                    "load_date": load.load_date,
+                    "extract_date": load.extract_date,
+                    "native": native,
+                    "unit_name": None if native else load.container_sys_unit_name,
                 }
             )
 
@@ -389,56 +551,38 @@ def unit_detail(name_eng: str, db: DbSessionDep):
             "loads": loads,
             "occupied": occupied,
             "last_sys_name": last_sys_name,
-            "coords": placements_coords.get(placement.sector.sector_number, {}).get(
+            "coords": placements_coords.get(sector_number, {}).get(
+                placement.num_in_sector
+            ),
+            "text_coords": placement_text_coords.get(sector_number, {}).get(
                 placement.num_in_sector
             ),
-            "text_coords": placement_text_coords.get(
-                placement.sector.sector_number, {}
-            ).get(placement.num_in_sector),
         }
 
     def process_container_sys(container_sys: ContainerSysTable):
-        loads = container_sys.coupon_loads
-        if len(loads) > 1:
-            raise NotImplementedError(
-                "Container system cannot be loaded twice, they should be treated as a separate entities (one became another via modernization)"
-            )
-
-        extracts = container_sys.coupon_extracts
-        if len(extracts) > 1:
-            raise NotImplementedError(
-                "Container system cannot be extracted twice, they should be treated as a separate entities (one became another via modernization)"
-            )
-
-        load = loads[0] if loads else None
-        extract = extracts[0] if extracts else None
+        # A reloaded container system shows its last load
+        loads = container_sys_loads[container_sys.container_sys_id]
+        load = loads[-1] if loads else None
 
         if load is not None:
-            if load.irrad_placement.sector.vessel != unit.reactor_vessel:
-                # non-native container systems should probably be shown alongside native
-                raise NotImplementedError(
-                    "Non-native container systems are not implemented yet"
-                )
-
+            native = load.placement_vessel_id == vessel_id
             load_status = {
                 "cpn_load_id": load.cpn_load_id,
                 "load_date": load.load_date,
                 "irrad_placement": {
-                    "placement_id": load.irrad_placement.placement_id,
-                    "name": load.irrad_placement.name,
+                    "placement_id": load.irrad_placement_id,
+                    "name": load.placement_name,
+                    "native": native,
+                    "unit_name": None if native else load.placement_unit_name,
                 },
                 "extract": {
-                    "cpn_extract_id": extract.cpn_extract_id,
-                    "extract_date": extract.extract_date,
+                    "cpn_extract_id": load.cpn_extract_id,
+                    "extract_date": load.extract_date,
                 }
-                if extract
+                if load.cpn_extract_id is not None
                 else None,
             }
         else:
-            if extract is not None:
-                raise NotImplementedError(
-                    "Container system cannot be extracted without being loaded first"
-                )
             load_status = None
 
         return {
@@ -473,7 +617,7 @@ def unit_detail(name_eng: str, db: DbSessionDep):
                     "vessel_id": sector.vessel_id,
                     "sector_number": sector.sector_number,
                     "placements": [
-                        process_placement(placement)
+                        process_placement(placement, sector.sector_number)
                         for placement in sorted(
                             sector.placements, key=lambda p: p.num_in_sector
                         )
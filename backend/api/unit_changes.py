@@ -0,0 +1,211 @@
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.models import (
+    ContainerSysModel,
+    CouponComplectModel,
+    CouponExtractModel,
+    CouponLoadModel,
+)
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    DataChangeTable,
+)
+
+# Oracle limits IN lists to 1000 expressions
+IN_CHUNK_SIZE = 1000
+
+# Tables whose rows are served as deltas, changes of others call for a refetch
+DELTA_TABLES = {
+    CouponLoadTable.__tablename__,
+    CouponExtractTable.__tablename__,
+    CouponComplectTable.__tablename__,
+    ContainerSysTable.__tablename__,
+}
+
+
+class RemovedIdsModel(BaseModel):
+    loads: list[int] = []
+    extracts: list[int] = []
+    complects: list[int] = []
+    container_systems: list[int] = []
+
+
+class UnitChangesModel(BaseModel):
+    since: int
+    cursor: int  # pass as `since` to get the next changes
+    loads: dict[int, CouponLoadModel] = {}  # added or changed, with current extract
+    extracts: dict[int, CouponExtractModel] = {}
+    complects: dict[int, CouponComplectModel] = {}  # without container systems
+    container_systems: dict[int, ContainerSysModel] = {}
+    removed: RemovedIdsModel = RemovedIdsModel()
+    refetch: bool = False  # other rows of the unit changed (placements, findings...)
+
+
+def _chunks(ids: list[int]):
+    for i in range(0, len(ids), IN_CHUNK_SIZE):
+        yield ids[i : i + IN_CHUNK_SIZE]
+
+
+def _fetch(db: Session, stmt, id_column, ids: list[int]) -> list:
+    rows = []
+    for chunk in _chunks(ids):
+        rows.extend(db.execute(stmt.where(id_column.in_(chunk))).all())
+    return rows
+
+
+def load_unit_changes(db: Session, vessel_id: int, since: int) -> UnitChangesModel:
+    """
+    Collect the changes of the vessel's history recorded after ``since``.
+
+    Log entries are collapsed per row (the latest wins), then the current
+    state of every changed row is fetched with one query per table.
+    Rows that are gone by now are reported as removed. Changes of rows not
+    served as deltas (see `DELTA_TABLES`) are reported as ``refetch``.
+    """
+    changes = db.execute(
+        select(
+            DataChangeTable.change_seq,
+            DataChangeTable.table_name,
+            DataChangeTable.row_id,
+            DataChangeTable.deleted,
+        )
+        .where(
+            DataChangeTable.vessel_id == vessel_id,
+            DataChangeTable.change_seq > since,
+        )
+        .order_by(DataChangeTable.change_seq)
+    ).all()
+
+    latest: dict[tuple[str, int], bool] = {}
+    for change in changes:
+        latest[(change.table_name, change.row_id)] = change.deleted
+
+    def ids(table, deleted: bool) -> list[int]:
+        return sorted(
+            row_id
+            for (table_name, row_id), is_deleted in latest.items()
+            if table_name == table.__tablename__ and is_deleted == deleted
+        )
+
+    load_ids = ids(CouponLoadTable, False)
+    loads = _fetch(
+        db,
+        select(
+            CouponLoadTable.cpn_load_id,
+            CouponLoadTable.load_date,
+            CouponLoadTable.irrad_container_sys_id,
+            CouponLoadTable.irrad_placement_id,
+            CouponExtractTable.cpn_extract_id,
+            CouponExtractTable.extract_date,
+            CouponExtractTable.irrad_container_sys_id.label("extract_container_sys_id"),
+        ).outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        ),
+        CouponLoadTable.cpn_load_id,
+        load_ids,
+    )
+
+    extract_ids = ids(CouponExtractTable, False)
+    extracts = _fetch(
+        db,
+        select(
+            CouponExtractTable.cpn_extract_id,
+            CouponExtractTable.cpn_load_id,
+            CouponExtractTable.extract_date,
+            CouponExtractTable.irrad_container_sys_id,
+        ),
+        CouponExtractTable.cpn_extract_id,
+        extract_ids,
+    )
+
+    complect_ids = ids(CouponComplectTable, False)
+    complects = _fetch(
+        db,
+        select(
+            CouponComplectTable.coupon_complect_id,
+            CouponComplectTable.vessel_id,
+            CouponComplectTable.name,
+            CouponComplectTable.complect_number,
+            CouponComplectTable.is_additional,
+        ),
+        CouponComplectTable.coupon_complect_id,
+        complect_ids,
+    )
+
+    container_sys_ids = ids(ContainerSysTable, False)
+    container_systems = _fetch(
+        db,
+        select(
+            ContainerSysTable.container_sys_id,
+            ContainerSysTable.coupon_complect_id,
+            ContainerSysTable.name,
+        ),
+        ContainerSysTable.container_sys_id,
+        container_sys_ids,
+    )
+
+    changed = UnitChangesModel(
+        since=since,
+        cursor=changes[-1].change_seq if changes else since,
+        refetch=any(change.table_name not in DELTA_TABLES for change in changes),
+        loads={
+            load.cpn_load_id: CouponLoadModel(
+                cpn_load_id=load.cpn_load_id,
+                load_date=load.load_date,
+                irrad_container_sys_id=load.irrad_container_sys_id,
+                irrad_placement_id=load.irrad_placement_id,
+                coupon_extract=CouponExtractModel(
+                    cpn_extract_id=load.cpn_extract_id,
+                    cpn_load_id=load.cpn_load_id,
+                    extract_date=load.extract_date,
+                    irrad_container_sys_id=load.extract_container_sys_id,
+                )
+                if load.cpn_extract_id is not None
+                else None,
+            )
+            for load in loads
+        },
+        extracts={
+            extract.cpn_extract_id: CouponExtractModel.model_validate(extract._asdict())
+            for extract in extracts
+        },
+        complects={
+            complect.coupon_complect_id: CouponComplectModel.model_validate(
+                complect._asdict()
+            )
+            for complect in complects
+        },
+        container_systems={
+            cs.container_sys_id: ContainerSysModel.model_validate(cs._asdict())
+            for cs in container_systems
+        },
+    )
+
+    # Deleted rows, plus the changed ones which no longer exist
+    for key, table, changed_ids, found in (
+        ("loads", CouponLoadTable, load_ids, changed.loads),
+        ("extracts", CouponExtractTable, extract_ids, changed.extracts),
+        ("complects", CouponComplectTable, complect_ids, changed.complects),
+        (
+            "container_systems",
+            ContainerSysTable,
+            container_sys_ids,
+            changed.container_systems,
+        ),
+    ):
+        setattr(
+            changed.removed,
+            key,
+            sorted(
+                ids(table, True)
+                + [row_id for row_id in changed_ids if row_id not in found]
+            ),
+        )
+
+    return changed
@@ -0,0 +1,403 @@
+from typing import NamedTuple
+
+from pydantic_core import to_json
+from sqlalchemy import Row, func, or_, select
+from sqlalchemy.orm import Session
+
+from backend.api.unit_helpers import placement_text_coords, placements_coords
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    DataChangeTable,
+    DataFindingTable,
+    NppTable,
+    NppUnitTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+    ReactorVesselTable,
+)
+
+
+class UnitRows(NamedTuple):
+    """Plain rows needed to build `UnitDetailsModel` for a single unit."""
+
+    unit: Row
+    placements: list[Row]  # sectors outer-joined with their placements
+    container_systems: list[Row]  # complects outer-joined with their container systems
+    loads: list[Row]  # loads outer-joined with their extracts, in history order
+    change_seq: int = 0  # last recorded change of the vessel, read before the rows
+    data_issues: int = 0  # findings of the last validation run
+
+
+def load_units_rows(
+    db: Session, *criteria, with_loads: bool = True
+) -> dict[str, UnitRows]:
+    """
+    Load everything for `UnitDetailsModel` of all units matching the criteria
+    (on `NppUnitTable` / `NppTable`) as Core row tuples (no ORM entities).
+
+    The number of queries is fixed regardless of the number of units: one per
+    level (units, change log cursors, sectors & placements, complects &
+    container systems, loads & extracts, validation findings), each filtered
+    by a subquery of the matching vessels.
+
+    Without `with_loads` the loads are not queried (left empty).
+
+    Returns rows by unit ``name_eng``, ordered by plant & unit number.
+    """
+    units = db.execute(
+        select(
+            NppUnitTable.unit_id,
+            NppUnitTable.plant_id,
+            NppUnitTable.num,
+            NppUnitTable.name,
+            NppUnitTable.name_eng,
+            NppUnitTable.design,
+            NppUnitTable.stage,
+            NppUnitTable.power,
+            NppUnitTable.start_date,
+            ReactorVesselTable.vessel_id,
+        )
+        .join(NppTable, NppTable.plant_id == NppUnitTable.plant_id)
+        .outerjoin(
+            ReactorVesselTable, ReactorVesselTable.unit_id == NppUnitTable.unit_id
+        )
+        .where(*criteria)
+        .order_by(NppTable.num, NppUnitTable.num)
+    ).all()
+
+    if not units:
+        return {}
+
+    vessel_ids = (
+        select(ReactorVesselTable.vessel_id)
+        .join(NppUnitTable, NppUnitTable.unit_id == ReactorVesselTable.unit_id)
+        .join(NppTable, NppTable.plant_id == NppUnitTable.plant_id)
+        .where(*criteria)
+    )
+
+    # Read the cursors first: changes made meanwhile are replayed by delta sync
+    change_seqs = dict(
+        db.execute(
+            select(DataChangeTable.vessel_id, func.max(DataChangeTable.change_seq))
+            .where(DataChangeTable.vessel_id.in_(vessel_ids))
+            .group_by(DataChangeTable.vessel_id)
+        ).all()
+    )
+
+    placements = db.execute(
+        select(
+            ReactorVesselSectorTable.rpv_sector_id,
+            ReactorVesselSectorTable.vessel_id,
+            ReactorVesselSectorTable.sector_number,
+            PlacementTable.placement_id,
+            PlacementTable.sector_id,
+            PlacementTable.num_in_sector,
+            PlacementTable.name,
+        )
+        .outerjoin(
+            PlacementTable,
+            PlacementTable.sector_id == ReactorVesselSectorTable.rpv_sector_id,
+        )
+        .where(ReactorVesselSectorTable.vessel_id.in_(vessel_ids))
+        .order_by(ReactorVesselSectorTable.sector_number, PlacementTable.num_in_sector)
+    ).all()
+
+    container_systems = db.execute(
+        select(
+            CouponComplectTable.coupon_complect_id,
+            CouponComplectTable.vessel_id,
+            CouponComplectTable.name.label("complect_name"),
+            CouponComplectTable.complect_number,
+            CouponComplectTable.is_additional,
+            ContainerSysTable.container_sys_id,
+            ContainerSysTable.name,
+        )
+        .outerjoin(
+            ContainerSysTable,
+            ContainerSysTable.coupon_complect_id
+            == CouponComplectTable.coupon_complect_id,
+        )
+        .where(CouponComplectTable.vessel_id.in_(vessel_ids))
+        .order_by(CouponComplectTable.name, ContainerSysTable.name)
+    ).all()
+
+    # Loads touching the vessels: of their container systems or into their placements
+    loads = (
+        []
+        if not with_loads
+        else db.execute(
+            select(
+                CouponComplectTable.vessel_id.label("owner_vessel_id"),
+                ReactorVesselSectorTable.vessel_id.label("host_vessel_id"),
+                CouponLoadTable.cpn_load_id,
+                CouponLoadTable.load_date,
+                CouponLoadTable.irrad_container_sys_id,
+                CouponLoadTable.irrad_placement_id,
+                ContainerSysTable.name.label("container_sys_name"),
+                CouponExtractTable.cpn_extract_id,
+                CouponExtractTable.extract_date,
+                CouponExtractTable.irrad_container_sys_id.label(
+                    "extract_container_sys_id"
+                ),
+            )
+            .join(
+                ContainerSysTable,
+                ContainerSysTable.container_sys_id
+                == CouponLoadTable.irrad_container_sys_id,
+            )
+            .join(
+                CouponComplectTable,
+                CouponComplectTable.coupon_complect_id
+                == ContainerSysTable.coupon_complect_id,
+            )
+            .join(
+                PlacementTable,
+                PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+            )
+            .join(
+                ReactorVesselSectorTable,
+                ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+            )
+            .outerjoin(
+                CouponExtractTable,
+                CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+            )
+            .where(
+                or_(
+                    CouponComplectTable.vessel_id.in_(vessel_ids),
+                    ReactorVesselSectorTable.vessel_id.in_(vessel_ids),
+                )
+            )
+            .order_by(
+                CouponLoadTable.load_date, ContainerSysTable.container_sys_id
+            )  # ordering is crucial for correct history calculation
+        ).all()
+    )
+
+    # Findings of the last validation run (see `backend.validation`)
+    data_issues = dict(
+        db.execute(
+            select(DataFindingTable.vessel_id, func.count(DataFindingTable.finding_id))
+            .where(DataFindingTable.vessel_id.in_(vessel_ids))
+            .group_by(DataFindingTable.vessel_id)
+        ).all()
+    )
+
+    # Split the rows by vessel, keeping their order
+    rows_by_vessel: dict[int, UnitRows] = {
+        unit.vessel_id: UnitRows(
+            unit=unit,
+            placements=[],
+            container_systems=[],
+            loads=[],
+            change_seq=change_seqs.get(unit.vessel_id, 0),
+            data_issues=data_issues.get(unit.vessel_id, 0),
+        )
+        for unit in units
+        if unit.vessel_id is not None
+    }
+    for row in placements:
+        rows_by_vessel[row.vessel_id].placements.append(row)
+    for row in container_systems:
+        rows_by_vessel[row.vessel_id].container_systems.append(row)
+    for row in loads:
+        for vessel_id in {row.owner_vessel_id, row.host_vessel_id}:
+            if vessel_id in rows_by_vessel:
+                rows_by_vessel[vessel_id].loads.append(row)
+
+    return {
+        unit.name_eng: rows_by_vessel.get(unit.vessel_id)
+        or UnitRows(unit=unit, placements=[], container_systems=[], loads=[])
+        for unit in units
+    }
+
+
+def load_unit_rows(
+    db: Session, name_eng: str, with_loads: bool = True
+) -> UnitRows | None:
+    """
+    Load everything for `UnitDetailsModel` of a single unit, see `load_units_rows`.
+
+    Returns None if the unit does not exist.
+    """
+    return load_units_rows(
+        db, NppUnitTable.name_eng == name_eng, with_loads=with_loads
+    ).get(name_eng)
+
+
+def encode_unit_details(rows: UnitRows, fields: list[str] | None = None) -> bytes:
+    """
+    Encode `UnitDetailsModel` JSON straight from the rows
+    (only the given top-level fields, if any).
+
+    Plain dicts are built in the exact shape (and order) the Pydantic models
+    serialize to & encoded by pydantic-core in one pass, skipping model
+    validation & the re-validation of the returned model.
+    """
+    unit = rows.unit
+
+    sectors: dict[int, dict] = {}
+    placement_positions: dict[int, tuple[int, int]] = {}
+    p_load_ids: dict[int, list[int]] = {}
+
+    for row in rows.placements:
+        sector = sectors.get(row.rpv_sector_id)
+        if sector is None:
+            sector = sectors[row.rpv_sector_id] = {
+                "rpv_sector_id": row.rpv_sector_id,
+                "vessel_id": row.vessel_id,
+                "sector_number": row.sector_number,
+                "placements": [],
+            }
+
+        if row.placement_id is None:
+            continue
+
+        sector["placements"].append(
+            {
+                "placement_id": row.placement_id,
+                "sector_id": row.sector_id,
+                "num_in_sector": int(row.num_in_sector),
+                "name": row.name,
+            }
+        )
+        placement_positions[row.placement_id] = (
+            row.sector_number,
+            int(row.num_in_sector),
+        )
+        p_load_ids[row.placement_id] = []
+
+    complects: dict[int, dict] = {}
+    cs_load_ids: dict[int, list[int]] = {}
+
+    for row in rows.container_systems:
+        complect = complects.get(row.coupon_complect_id)
+        if complect is None:
+            complect = complects[row.coupon_complect_id] = {
+                "coupon_complect_id": row.coupon_complect_id,
+                "vessel_id": row.vessel_id,
+                "name": row.complect_name,
+                "complect_number": row.complect_number,
+                "is_additional": bool(row.is_additional),
+                "container_systems": [],
+            }
+
+        if row.container_sys_id is None:
+            continue
+
+        complect["container_systems"].append(
+            {
+                "container_sys_id": row.container_sys_id,
+                "coupon_complect_id": row.coupon_complect_id,
+                "name": row.name,
+            }
+        )
+        cs_load_ids[row.container_sys_id] = []
+
+    loads_info: dict[int, dict] = {}
+    sys_names: dict[int, str] = {}  # container system names, by load
+
+    # Loads of foreign container systems into the vessel's placements & of its
+    # container systems into foreign placements are listed on their own side only.
+    # The history is not checked here, see `backend.validation`.
+    for load in rows.loads:
+        if load.cpn_load_id in loads_info:
+            continue  # extracted more than once, the first extract is shown
+
+        if load.irrad_container_sys_id in cs_load_ids:
+            cs_load_ids[load.irrad_container_sys_id].append(load.cpn_load_id)
+        if load.irrad_placement_id in p_load_ids:
+            p_load_ids[load.irrad_placement_id].append(load.cpn_load_id)
+
+        sys_names[load.cpn_load_id] = load.container_sys_name
+        loads_info[load.cpn_load_id] = {
+            "cpn_load_id": load.cpn_load_id,
+            "load_date": load.load_date,
+            "irrad_container_sys_id": load.irrad_container_sys_id,
+            "irrad_placement_id": load.irrad_placement_id,
+            "coupon_extract": {
+                "cpn_extract_id": load.cpn_extract_id,
+                "cpn_load_id": load.cpn_load_id,
+                "extract_date": load.extract_date,
+                "irrad_container_sys_id": load.extract_container_sys_id,
+            }
+            if load.cpn_extract_id is not None
+            else None,
+        }
+
+    placements_details = {}
+    for placement_id, load_ids in p_load_ids.items():
+        sector_number, num_in_sector = placement_positions[placement_id]
+
+        # Loads are in history order, so the last one tells the current state
+        last_load = loads_info[load_ids[-1]] if load_ids else None
+
+        # Placements beyond the drawn layout have no coordinates
+        placements_details[placement_id] = {
+            "occupied": last_load is not None and last_load["coupon_extract"] is None,
+            "last_sys_name": sys_names[load_ids[-1]] if load_ids else None,
+            "load_ids": load_ids,
+            "coords": placements_coords.get(sector_number, {}).get(num_in_sector),
+            "text_coords": placement_text_coords.get(sector_number, {}).get(
+                num_in_sector
+            ),
+        }
+
+    container_systems_details = {
+        container_sys_id: {"load_ids": load_ids}
+        for container_sys_id, load_ids in cs_load_ids.items()
+    }
+
+    reactor_vessel = None
+    if unit.vessel_id is not None:
+        reactor_vessel = {
+            "vessel_id": unit.vessel_id,
+            "unit_id": unit.unit_id,
+            "sectors": list(sectors.values()),
+            # Same order as `ReactorVesselModel` serializes: stable sort of name-ordered complects
+            "coupon_complects": sorted(
+                complects.values(), key=lambda c: c["complect_number"] or 0
+            ),
+        }
+
+    unit_details = {
+        "unit": {
+            "unit_id": unit.unit_id,
+            "plant_id": unit.plant_id,
+            "num": int(unit.num),
+            "name": unit.name,
+            "name_eng": unit.name_eng,
+            "design": unit.design,
+            "stage": unit.stage,
+            "power": int(unit.power),
+            "start_date": unit.start_date,
+            "reactor_vessel": reactor_vessel,
+        },
+        "loads": loads_info,
+        "placements_details": placements_details,
+        "container_systems_details": container_systems_details,
+        "change_seq": rows.change_seq,
+        "data_issues": rows.data_issues,
+    }
+
+    if fields is not None:
+        unit_details = {name: unit_details[name] for name in fields}
+
+    return to_json(unit_details)
+
+
+def encode_units_details(rows_by_name: dict[str, UnitRows]) -> bytes:
+    """
+    Encode a ``name_eng -> UnitDetailsModel`` JSON map straight from the rows.
+    """
+    return (
+        b"{"
+        + b",".join(
+            to_json(name_eng) + b":" + encode_unit_details(rows)
+            for name_eng, rows in rows_by_name.items()
+        )
+        + b"}"
+    )
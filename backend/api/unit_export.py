@@ -0,0 +1,272 @@
+from collections.abc import Iterator
+from contextlib import ExitStack
+from tempfile import SpooledTemporaryFile
+from typing import IO
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session, aliased
+
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    NppTable,
+    NppUnitTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+    ReactorVesselTable,
+)
+from backend.workbook import SheetData, write_workbook
+
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # Kept in memory up to this size, then on disk
+CHUNK_SIZE = 64 * 1024
+YIELD_PER = 1000  # Rows fetched at once while writing the sheets
+
+IRRADIATED = "опромінюється"  # Extract date of a container system still in core
+DATE_WIDTH = len(IRRADIATED)
+
+
+def units_stmt():
+    """Units with their own fields & vessel, ordered by plant & unit number."""
+    return (
+        select(
+            NppUnitTable.num,
+            NppUnitTable.name,
+            NppUnitTable.name_eng,
+            NppUnitTable.design,
+            NppUnitTable.stage,
+            NppUnitTable.power,
+            NppUnitTable.start_date,
+            ReactorVesselTable.vessel_id,
+        )
+        .join(NppTable, NppTable.plant_id == NppUnitTable.plant_id)
+        .outerjoin(
+            ReactorVesselTable, ReactorVesselTable.unit_id == NppUnitTable.unit_id
+        )
+        .order_by(NppTable.num, NppUnitTable.num)
+    )
+
+
+def _unit_sheet(unit: Row) -> SheetData:
+    rows = [
+        ["Номер блоку", unit.num],
+        ["Найменування блоку", unit.name],
+        ["Найменування блоку (англ.)", unit.name_eng],
+        ["Проект", unit.design],
+        ["Черга", unit.stage or "-"],
+        ["Встановлена потужність, МВ", round(unit.power) if unit.power else "-"],
+        [
+            "Дата початку експлуатації",
+            unit.start_date.strftime("%d.%m.%Y") if unit.start_date else "-",
+        ],
+    ]
+    return SheetData(
+        "Інформація про блок",
+        ["Параметр", "Значення"],
+        [max(len(str(row[i])) for row in rows) for i in (0, 1)],
+        rows,
+    )
+
+
+def _loads_stmt():
+    """Loads with their extracts, container systems & placements (with their vessels)."""
+    HostUnit = aliased(NppUnitTable)
+    return (
+        select(
+            CouponLoadTable.load_date,
+            CouponExtractTable.extract_date,
+            PlacementTable.name.label("placement_name"),
+            ContainerSysTable.name.label("container_sys_name"),
+            CouponComplectTable.name.label("complect_name"),
+            ReactorVesselSectorTable.vessel_id.label("host_vessel_id"),
+            HostUnit.name.label("host_unit_name"),
+        )
+        .join(
+            PlacementTable,
+            PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+        )
+        .join(
+            ReactorVesselSectorTable,
+            ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+        )
+        .join(
+            ReactorVesselTable,
+            ReactorVesselTable.vessel_id == ReactorVesselSectorTable.vessel_id,
+        )
+        .join(HostUnit, HostUnit.unit_id == ReactorVesselTable.unit_id)
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+        .outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        )
+        .execution_options(yield_per=YIELD_PER)
+    )
+
+
+def _placements_sheet(db: Session, vessel_id: int) -> SheetData:
+    """History of the vessel's placements, whatever container system stayed there."""
+    placement_width, complect_width, container_sys_width = db.execute(
+        select(
+            func.max(func.length(PlacementTable.name)),
+            func.max(func.length(CouponComplectTable.name)),
+            func.max(func.length(ContainerSysTable.name)),
+        )
+        .select_from(CouponLoadTable)
+        .join(
+            PlacementTable,
+            PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+        )
+        .join(
+            ReactorVesselSectorTable,
+            ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+        .where(ReactorVesselSectorTable.vessel_id == vessel_id)
+    ).one()
+
+    def rows() -> Iterator[list]:
+        for load in db.execute(
+            _loads_stmt()
+            .where(ReactorVesselSectorTable.vessel_id == vessel_id)
+            .order_by(
+                ReactorVesselSectorTable.sector_number,
+                PlacementTable.num_in_sector,
+                CouponLoadTable.load_date,
+                CouponLoadTable.cpn_load_id,
+            )
+        ):
+            yield [
+                load.placement_name,
+                load.complect_name,
+                load.container_sys_name,
+                load.load_date or "",
+                load.extract_date or IRRADIATED,
+            ]
+
+    return SheetData(
+        "Історія місць",
+        ["Місце", "Комплект", "Збірка", "Завантажено", "Вивантажено"],
+        [placement_width, complect_width, container_sys_width, DATE_WIDTH, DATE_WIDTH],
+        rows(),
+    )
+
+
+def _complect_sheets(db: Session, vessel_id: int) -> list[SheetData]:
+    """History of the container systems of each of the vessel's complects, wherever they stayed."""
+    complects = db.execute(
+        select(
+            CouponComplectTable.coupon_complect_id,
+            CouponComplectTable.name,
+            func.max(func.length(ContainerSysTable.name)),
+        )
+        .outerjoin(
+            ContainerSysTable,
+            ContainerSysTable.coupon_complect_id
+            == CouponComplectTable.coupon_complect_id,
+        )
+        .where(CouponComplectTable.vessel_id == vessel_id)
+        .group_by(
+            CouponComplectTable.coupon_complect_id,
+            CouponComplectTable.name,
+            CouponComplectTable.is_additional,
+        )
+        .order_by(CouponComplectTable.is_additional, CouponComplectTable.name)
+    ).all()
+
+    # Placements of other units are qualified by the unit name
+    placement_width = db.execute(
+        select(func.max(func.length(PlacementTable.name)))
+    ).scalar()
+    unit_width = db.execute(select(func.max(func.length(NppUnitTable.name)))).scalar()
+    placement_width = (placement_width or 0) + (unit_width or 0) + 3
+
+    def rows(complect_id: int) -> Iterator[list]:
+        for load in db.execute(
+            _loads_stmt()
+            .where(CouponComplectTable.coupon_complect_id == complect_id)
+            .order_by(
+                CouponLoadTable.load_date,
+                PlacementTable.name,
+                CouponLoadTable.cpn_load_id,
+            )
+        ):
+            placement_name = load.placement_name
+            if load.host_vessel_id != vessel_id:
+                placement_name = f"{placement_name} ({load.host_unit_name})"
+
+            yield [
+                load.container_sys_name,
+                load.load_date or "",
+                placement_name,
+                load.extract_date or IRRADIATED,
+            ]
+
+    return [
+        SheetData(
+            f"Комплект {name}",
+            ["Збірка", "Завантажено", "Місце", "Вивантажено"],
+            [container_sys_width, DATE_WIDTH, placement_width, DATE_WIDTH],
+            rows(complect_id),
+        )
+        for complect_id, name, container_sys_width in complects
+    ]
+
+
+def unit_sheets(db: Session, unit: Row) -> list[SheetData]:
+    """
+    Sheets of the unit's history workbook (a row of `units_stmt`): the unit's
+    info, the history of its placements & of each of its complects.
+    The rows of the history sheets are queried lazily, as they are written.
+    """
+    sheets = [_unit_sheet(unit)]
+    if unit.vessel_id is not None:
+        sheets.append(_placements_sheet(db, unit.vessel_id))
+        sheets.extend(_complect_sheets(db, unit.vessel_id))
+    return sheets
+
+
+def export_unit_workbook(db: Session, name_eng: str) -> IO[bytes] | None:
+    """
+    Write the unit's history workbook. Returns None if the unit does not exist.
+
+    Rows are streamed from the database into write-only sheets, and the
+    workbook is saved into a spooled temporary file, so memory stays flat
+    whatever the size of the history. The returned file is positioned at
+    its start.
+    """
+    unit = db.execute(units_stmt().where(NppUnitTable.name_eng == name_eng)).first()
+    if unit is None:
+        return None
+
+    with ExitStack() as stack:
+        file = stack.enter_context(SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE))
+        write_workbook(file, unit_sheets(db, unit))
+        file.seek(0)
+        stack.pop_all()  # Written: kept open for the caller
+    return file
+
+
+def iter_file(file: IO[bytes]) -> Iterator[bytes]:
+    """Read the file in chunks, closing it at the end."""
+    with file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
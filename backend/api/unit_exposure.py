@@ -0,0 +1,191 @@
+import threading
+from collections.abc import Iterable
+
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.api.unit_helpers import UnitVersion
+from backend.api.unit_timeline import VesselTimeline
+from backend.tables import NppUnitTable, ReactorVesselTable
+
+
+class ExposureModel(BaseModel):
+    loads: int  # number of stays counted
+    days: int  # in-core time, days
+    power_days: float  # in-core time weighted by the host unit's power, MW·day
+
+
+class UnitExposureModel(BaseModel):
+    as_of: str
+    container_systems: dict[int, ExposureModel]  # of the vessel's complects
+    placements: dict[int, ExposureModel]  # of the vessel
+
+
+def vessel_powers(db: Session) -> dict[int, float]:
+    """Get the nominal power (MW) of the unit of every vessel."""
+    return {
+        vessel_id: float(power or 0)
+        for vessel_id, power in db.execute(
+            select(ReactorVesselTable.vessel_id, NppUnitTable.power).join(
+                NppUnitTable, NppUnitTable.unit_id == ReactorVesselTable.unit_id
+            )
+        )
+    }
+
+
+def _day(value: str) -> np.datetime64 | None:
+    """Parse an ISO date, None if the stored value is not one."""
+    try:
+        day = np.datetime64(value, "D")
+    except ValueError:
+        return None
+    return None if np.isnat(day) else day
+
+
+def _group(
+    ids: np.ndarray,
+    keys: np.ndarray,
+    started: np.ndarray,
+    days: np.ndarray,
+    power_days: np.ndarray,
+) -> dict[int, ExposureModel]:
+    """Sum the stays by key for every id (ids are sorted & contain all keys)."""
+    index = np.searchsorted(ids, keys)
+    counts = np.bincount(index, weights=started, minlength=len(ids))
+    days_sums = np.bincount(index, weights=days, minlength=len(ids))
+    power_sums = np.bincount(index, weights=power_days, minlength=len(ids))
+
+    return {
+        key: ExposureModel(
+            loads=int(count), days=int(day_sum), power_days=float(power_sum)
+        )
+        for key, count, day_sum, power_sum in zip(
+            ids.tolist(), counts.tolist(), days_sums.tolist(), power_sums.tolist()
+        )
+    }
+
+
+def compute_exposure(
+    timeline: VesselTimeline, powers: dict[int, float], day: str
+) -> UnitExposureModel:
+    """
+    Compute the cumulative in-core time of the vessel's container systems
+    (wherever they stayed) & of its placements (whatever stayed there) up to
+    the day, weighted by the power of the unit hosting each stay.
+
+    Stays still in core count up to the day, stays after it do not count.
+    Stays with a date that is not ISO are left out, as their time is unknown.
+    All the stays are processed at once as NumPy arrays.
+    """
+    intervals = []
+    start_days = []
+    end_days = []
+    for interval in timeline.loads.values():
+        start = _day(interval.start)
+        end = _day(interval.end or day)
+        if start is not None and end is not None:
+            intervals.append(interval)
+            start_days.append(start)
+            end_days.append(end)
+    n = len(intervals)
+
+    starts = np.array(start_days, dtype="datetime64[D]")
+    ends = np.array(end_days, dtype="datetime64[D]")
+    container_sys_ids = np.fromiter(
+        (i.container_sys_id for i in intervals), dtype=np.int64, count=n
+    )
+    placement_ids = np.fromiter(
+        (i.placement_id for i in intervals), dtype=np.int64, count=n
+    )
+    host_vessel_ids = np.fromiter(
+        (i.host_vessel_id for i in intervals), dtype=np.int64, count=n
+    )
+    owner_vessel_ids = np.fromiter(
+        (i.owner_vessel_id for i in intervals), dtype=np.int64, count=n
+    )
+    power = np.fromiter(
+        (powers.get(i.host_vessel_id, 0.0) for i in intervals),
+        dtype=np.float64,
+        count=n,
+    )
+
+    end = np.minimum(ends, np.datetime64(day, "D"))
+    started = (starts <= np.datetime64(day, "D")).astype(np.float64)
+    days = np.clip((end - starts).astype(np.int64), 0, None).astype(np.float64)
+    power_days = days * power
+
+    own = owner_vessel_ids == timeline.vessel_id
+    hosted = host_vessel_ids == timeline.vessel_id
+
+    return UnitExposureModel(
+        as_of=day,
+        container_systems=_group(
+            np.array(sorted(timeline.container_systems), dtype=np.int64),
+            container_sys_ids[own],
+            started[own],
+            days[own],
+            power_days[own],
+        ),
+        placements=_group(
+            np.array(sorted(timeline.placements), dtype=np.int64),
+            placement_ids[hosted],
+            started[hosted],
+            days[hosted],
+            power_days[hosted],
+        ),
+    )
+
+
+class ExposureCache:
+    """
+    Computed exposures kept per vessel while the unit's version token & the
+    day stay the same (open stays grow every day).
+    """
+
+    def __init__(self):
+        self._exposures: dict[int, tuple[tuple[str, str], UnitExposureModel]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        db: Session,
+        versions: Iterable[UnitVersion],
+        timelines: dict[int, VesselTimeline],
+        day: str,
+    ) -> dict[int, UnitExposureModel]:
+        """Get the exposures of the units' vessels by vessel id."""
+        keys = {
+            version.vessel_id: (version.token, day)
+            for version in versions
+            if version.vessel_id in timelines
+        }
+
+        with self._lock:
+            result = {
+                vessel_id: entry[1]
+                for vessel_id, entry in self._exposures.items()
+                if keys.get(vessel_id) == entry[0]
+            }
+
+        stale = [vessel_id for vessel_id in keys if vessel_id not in result]
+        if stale:
+            powers = vessel_powers(db)
+            computed = {
+                vessel_id: compute_exposure(timelines[vessel_id], powers, day)
+                for vessel_id in stale
+            }
+            with self._lock:
+                for vessel_id, exposure in computed.items():
+                    self._exposures[vessel_id] = (keys[vessel_id], exposure)
+            result.update(computed)
+
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exposures.clear()
+
+
+exposure_cache = ExposureCache()
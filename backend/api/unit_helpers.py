@@ -1,12 +1,282 @@
-from typing import List, Union
+from typing import List, NamedTuple, Union
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import Session
+
 from backend.tables import (
+    NppTable,
+    NppUnitTable,
+    ReactorVesselTable,
+    ReactorVesselSectorTable,
     PlacementTable,
+    CouponComplectTable,
     ContainerSysTable,
     CouponLoadTable,
     CouponExtractTable,
+    DataChangeTable,
+)
+
+
+# Unit fields served from `T_NPP_UNITS` & `T_NPPS` alone (see `load_unit_summary`)
+UNIT_SUMMARY_FIELDS = (
+    "unit_id",
+    "plant_id",
+    "num",
+    "name",
+    "name_eng",
+    "design",
+    "stage",
+    "power",
+    "start_date",
+    "plant",
 )
 
 
+def parse_fields(fields: str | None, allowed) -> list[str] | None:
+    """
+    Parse a comma-separated ``fields=`` projection.
+    Returns None if no projection is requested (all fields).
+    """
+    if fields is None:
+        return None
+
+    names = list(
+        dict.fromkeys(name.strip() for name in fields.split(",") if name.strip())
+    )
+    unknown = [name for name in names if name not in allowed]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+            if unknown
+            else "No fields requested",
+        )
+    return names
+
+
+def load_unit_summary(db: Session, name_eng: str) -> dict | None:
+    """
+    Load the unit's own fields & its plant (legacy format), without touching
+    the vessel or the history. Returns None if the unit does not exist.
+    """
+    row = db.execute(
+        select(
+            NppUnitTable.unit_id,
+            NppUnitTable.plant_id,
+            NppUnitTable.num,
+            NppUnitTable.name,
+            NppUnitTable.name_eng,
+            NppUnitTable.design,
+            NppUnitTable.stage,
+            NppUnitTable.power,
+            NppUnitTable.start_date,
+            NppTable.name.label("plant_name"),
+            NppTable.name_eng.label("plant_name_eng"),
+            NppTable.sh_name.label("plant_sh_name"),
+        )
+        .join(NppTable, NppTable.plant_id == NppUnitTable.plant_id)
+        .where(NppUnitTable.name_eng == name_eng)
+    ).first()
+
+    if row is None:
+        return None
+
+    return {
+        "unit_id": row.unit_id,
+        "plant_id": row.plant_id,
+        "num": row.num,
+        "name": row.name,
+        "name_eng": row.name_eng,
+        "design": row.design,
+        "stage": row.stage,
+        "power": row.power,
+        "start_date": row.start_date,
+        "plant": {
+            "plant_id": row.plant_id,
+            "name": row.plant_name,
+            "name_eng": row.plant_name_eng,
+            "sh_name": row.plant_sh_name,
+        },
+    }
+
+
+class UnitVersion(NamedTuple):
+    unit_id: int
+    vessel_id: int | None
+    token: str
+
+
+def version_tags(version: UnitVersion) -> list[str]:
+    """Cache tags of the unit's responses, see `ResponseCache`."""
+    if version.vessel_id is None:
+        return [f"unit:{version.unit_id}"]
+    return [f"unit:{version.unit_id}", f"vessel:{version.vessel_id}"]
+
+
+def unit_vessel_id(db: Session, name_eng: str) -> tuple[int, int | None] | None:
+    """
+    Get the unit id & its vessel id (None if the unit has no vessel).
+    Returns None if the unit does not exist.
+    """
+    return db.execute(
+        select(NppUnitTable.unit_id, ReactorVesselTable.vessel_id)
+        .outerjoin(
+            ReactorVesselTable, ReactorVesselTable.unit_id == NppUnitTable.unit_id
+        )
+        .where(NppUnitTable.name_eng == name_eng)
+    ).first()
+
+
+def units_versions(db: Session, *criteria) -> dict[str, UnitVersion]:
+    """
+    Get change tokens for all units matching the criteria (on `NppUnitTable`
+    / `NppTable`) with a single query, without loading their history.
+
+    The token is built from the unit & plant rows (read anyway), the last
+    change recorded for the unit's vessel (see `record_changes`) and
+    aggregates (count, max id & date) over the loads, extracts & container
+    systems of the vessel: rows written without recording a change (e.g.
+    by hand in SQL) move the token as well. Identity ids only grow, so
+    inserts & deletes always change the aggregates.
+
+    Returns versions by unit ``name_eng``, ordered by plant & unit number.
+    """
+    vessel_ids = (
+        select(ReactorVesselTable.vessel_id)
+        .join(NppUnitTable, NppUnitTable.unit_id == ReactorVesselTable.unit_id)
+        .join(NppTable, NppTable.plant_id == NppUnitTable.plant_id)
+        .where(*criteria)
+    )
+
+    change_seq = (
+        select(func.max(DataChangeTable.change_seq))
+        .where(DataChangeTable.vessel_id == ReactorVesselTable.vessel_id)
+        .correlate(ReactorVesselTable)
+        .scalar_subquery()
+    )
+
+    # Loads touching each vessel: into its placements or of its container systems
+    vessel_loads = union(
+        select(ReactorVesselSectorTable.vessel_id, CouponLoadTable.cpn_load_id)
+        .join(
+            PlacementTable,
+            PlacementTable.sector_id == ReactorVesselSectorTable.rpv_sector_id,
+        )
+        .join(
+            CouponLoadTable,
+            CouponLoadTable.irrad_placement_id == PlacementTable.placement_id,
+        )
+        .where(ReactorVesselSectorTable.vessel_id.in_(vessel_ids)),
+        select(CouponComplectTable.vessel_id, CouponLoadTable.cpn_load_id)
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.coupon_complect_id
+            == CouponComplectTable.coupon_complect_id,
+        )
+        .join(
+            CouponLoadTable,
+            CouponLoadTable.irrad_container_sys_id
+            == ContainerSysTable.container_sys_id,
+        )
+        .where(CouponComplectTable.vessel_id.in_(vessel_ids)),
+    ).subquery()
+
+    history = (
+        select(
+            vessel_loads.c.vessel_id,
+            func.count(CouponLoadTable.cpn_load_id).label("loads"),
+            func.max(CouponLoadTable.cpn_load_id).label("max_load_id"),
+            func.max(CouponLoadTable.load_date).label("max_load_date"),
+            func.count(CouponExtractTable.cpn_extract_id).label("extracts"),
+            func.max(CouponExtractTable.cpn_extract_id).label("max_extract_id"),
+            func.max(CouponExtractTable.extract_date).label("max_extract_date"),
+        )
+        .join(
+            CouponLoadTable, CouponLoadTable.cpn_load_id == vessel_loads.c.cpn_load_id
+        )
+        .outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        )
+        .group_by(vessel_loads.c.vessel_id)
+        .subquery()
+    )
+
+    container_systems = (
+        select(
+            CouponComplectTable.vessel_id,
+            func.count(ContainerSysTable.container_sys_id).label("count"),
+            func.max(ContainerSysTable.container_sys_id).label("max_id"),
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.coupon_complect_id
+            == CouponComplectTable.coupon_complect_id,
+        )
+        .where(CouponComplectTable.vessel_id.in_(vessel_ids))
+        .group_by(CouponComplectTable.vessel_id)
+        .subquery()
+    )
+
+    rows = db.execute(
+        select(
+            NppUnitTable.unit_id,
+            NppUnitTable.name_eng,
+            ReactorVesselTable.vessel_id,
+            change_seq,
+            history.c.loads,
+            history.c.max_load_id,
+            history.c.max_load_date,
+            history.c.extracts,
+            history.c.max_extract_id,
+            history.c.max_extract_date,
+            container_systems.c.count,
+            container_systems.c.max_id,
+            NppUnitTable.plant_id,
+            NppUnitTable.num,
+            NppUnitTable.name,
+            NppUnitTable.design,
+            NppUnitTable.stage,
+            NppUnitTable.power,
+            NppUnitTable.start_date,
+            NppTable.num,
+            NppTable.sh_name,
+            NppTable.name,
+            NppTable.sh_name_eng,
+            NppTable.name_eng,
+        )
+        .join(NppTable, NppTable.plant_id == NppUnitTable.plant_id)
+        .outerjoin(
+            ReactorVesselTable, ReactorVesselTable.unit_id == NppUnitTable.unit_id
+        )
+        .outerjoin(history, history.c.vessel_id == ReactorVesselTable.vessel_id)
+        .outerjoin(
+            container_systems,
+            container_systems.c.vessel_id == ReactorVesselTable.vessel_id,
+        )
+        .where(*criteria)
+        .order_by(NppTable.num, NppUnitTable.num)
+    ).all()
+
+    return {
+        name_eng: UnitVersion(
+            unit_id=unit_id,
+            vessel_id=vessel_id,
+            token="|".join(str(part) for part in (unit_id, vessel_id, *parts)),
+        )
+        for unit_id, name_eng, vessel_id, *parts in rows
+    }
+
+
+def unit_version(db: Session, name_eng: str) -> UnitVersion | None:
+    """
+    Get the change token of the unit, see `units_versions`.
+    Returns None if the unit does not exist.
+    """
+    return units_versions(db, NppUnitTable.name_eng == name_eng).get(name_eng)
+
+
 class PlacementWithHistory:
     """
     Helper class to track the history of loads and extracts for a placement.
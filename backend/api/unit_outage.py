@@ -0,0 +1,253 @@
+from datetime import date
+
+from pydantic import BaseModel
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from backend.api.unit_helpers import UnitVersion, units_versions
+from backend.api.unit_timeline import VesselTimeline, timeline_cache
+from backend.changes import Change, record_changes
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    ReactorVesselTable,
+)
+
+
+class OutageExtractModel(BaseModel):
+    cpn_load_id: int  # load in a placement of the vessel, not extracted yet
+    extract_date: date
+
+
+class OutageLoadModel(BaseModel):
+    irrad_container_sys_id: int  # container system never loaded before
+    irrad_placement_id: int  # placement of the vessel
+    load_date: date
+
+
+class OutageModel(BaseModel):
+    """Extracts & loads of a refueling outage of a single vessel."""
+
+    extracts: list[OutageExtractModel] = []
+    loads: list[OutageLoadModel] = []
+
+
+class OutageResultModel(BaseModel):
+    extracts: dict[int, int]  # load id -> id of its new extract
+    loads: list[int]  # ids of the new loads, in the order of the batch
+
+
+class OutageConflict(ValueError):
+    """The batch conflicts with the vessel state (or with itself)."""
+
+    def __init__(self, messages: list[str]):
+        super().__init__("; ".join(messages))
+        self.messages = messages
+
+
+def check_outage(
+    timeline: VesselTimeline,
+    owners: dict[int, int],
+    loaded: set[int],
+    outage: OutageModel,
+) -> list[str]:
+    """
+    Check the batch against the vessel state held in memory (see
+    `VesselTimeline`), with the batch's extracts applied before its loads:
+
+    - an extracted load is in a placement of the vessel, not extracted yet
+      & loaded before the extract date;
+    - a loaded container system exists & was never loaded (nor twice in the batch);
+    - a placement is loaded once in the batch, & only after every stay in it
+      ended (by the extract date, if extracted in the batch).
+
+    ``owners`` maps the loaded container systems to their vessels, ``loaded``
+    holds those with a load already, dated or not (the timelines leave out the
+    loads without a date). Returns the conflicts found.
+    """
+    vessel_id = timeline.vessel_id
+    conflicts = []
+
+    ends: dict[int, str] = {}  # load id -> extract date in the batch
+    for extract in outage.extracts:
+        day = extract.extract_date.isoformat()
+        interval = timeline.loads.get(extract.cpn_load_id)
+        if interval is None or interval.host_vessel_id != vessel_id:
+            conflicts.append(
+                f"Load {extract.cpn_load_id} is not in a placement of the vessel"
+            )
+        elif interval.end is not None or extract.cpn_load_id in ends:
+            conflicts.append(f"Load {extract.cpn_load_id} is already extracted")
+        elif day < interval.start:
+            conflicts.append(
+                f"Load {extract.cpn_load_id} is extracted on {day} "
+                f"before being loaded on {interval.start}"
+            )
+        else:
+            ends[extract.cpn_load_id] = day
+
+    loaded_placements: set[int] = set()
+    loaded_container_systems: set[int] = set()
+    for load in outage.loads:
+        day = load.load_date.isoformat()
+        placement_id = load.irrad_placement_id
+        container_sys_id = load.irrad_container_sys_id
+
+        placement = timeline.placements.get(placement_id)
+        if placement is None:
+            conflicts.append(f"Placement {placement_id} is not in the vessel")
+        elif placement_id in loaded_placements:
+            conflicts.append(f"Placement {placement_id} is loaded twice")
+        else:
+            loaded_placements.add(placement_id)
+            for interval in placement.intervals:
+                end = interval.end or ends.get(interval.cpn_load_id)
+                if end is None or end > day:
+                    conflicts.append(
+                        f"Placement {placement_id} is occupied by load "
+                        f"{interval.cpn_load_id} on {day}"
+                    )
+                    break
+
+        owner_vessel_id = owners.get(container_sys_id)
+        if owner_vessel_id is None:
+            conflicts.append(f"Container system {container_sys_id} does not exist")
+        elif container_sys_id in loaded_container_systems:
+            conflicts.append(f"Container system {container_sys_id} is loaded twice")
+        else:
+            loaded_container_systems.add(container_sys_id)
+            if container_sys_id in loaded:
+                conflicts.append(
+                    f"Container system {container_sys_id} is already loaded"
+                )
+
+    return conflicts
+
+
+def write_outage(
+    db: Session, version: UnitVersion, outage: OutageModel
+) -> OutageResultModel:
+    """
+    Check & write the outage batch of the unit's vessel in a single transaction:
+    extracts & loads are inserted with one array DML statement each, & the
+    changes recorded once per affected vessel (caches are invalidated & clients
+    notified once, after the commit).
+
+    The vessel row is locked first, so concurrent batches of the same vessel
+    are checked one after the other. Raises `OutageConflict` if the batch
+    conflicts with the vessel state.
+    """
+    vessel_id = version.vessel_id
+
+    db.execute(
+        select(ReactorVesselTable.vessel_id)
+        .where(ReactorVesselTable.vessel_id == vessel_id)
+        .with_for_update()
+    )
+
+    container_sys_ids = {load.irrad_container_sys_id for load in outage.loads}
+    owners = (
+        dict(
+            db.execute(
+                select(
+                    ContainerSysTable.container_sys_id, CouponComplectTable.vessel_id
+                )
+                .join(
+                    CouponComplectTable,
+                    CouponComplectTable.coupon_complect_id
+                    == ContainerSysTable.coupon_complect_id,
+                )
+                .where(ContainerSysTable.container_sys_id.in_(container_sys_ids))
+            ).all()
+        )
+        if container_sys_ids
+        else {}
+    )
+
+    loaded = (
+        set(
+            db.scalars(
+                select(CouponLoadTable.irrad_container_sys_id)
+                .where(CouponLoadTable.irrad_container_sys_id.in_(container_sys_ids))
+                .distinct()
+            )
+        )
+        if container_sys_ids
+        else set()
+    )
+
+    # Version read after the lock: the timeline reflects the committed state
+    versions = units_versions(db, ReactorVesselTable.vessel_id == vessel_id)
+    timeline = timeline_cache.get(db, versions.values())[vessel_id]
+
+    conflicts = check_outage(timeline, owners, loaded, outage)
+    if conflicts:
+        db.rollback()
+        raise OutageConflict(conflicts)
+
+    changes = []
+
+    extract_ids = []
+    if outage.extracts:
+        extract_ids = db.scalars(
+            insert(CouponExtractTable).returning(
+                CouponExtractTable.cpn_extract_id, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "cpn_load_id": extract.cpn_load_id,
+                    "extract_date": extract.extract_date.isoformat(),
+                    "irrad_container_sys_id": timeline.loads[
+                        extract.cpn_load_id
+                    ].container_sys_id,
+                }
+                for extract in outage.extracts
+            ],
+        ).all()
+
+        for extract_id, extract in zip(extract_ids, outage.extracts):
+            interval = timeline.loads[extract.cpn_load_id]
+            for changed_vessel_id in (
+                interval.host_vessel_id,
+                interval.owner_vessel_id,
+            ):
+                changes.append(
+                    Change(
+                        changed_vessel_id, CouponExtractTable.__tablename__, extract_id
+                    )
+                )
+
+    load_ids = []
+    if outage.loads:
+        load_ids = db.scalars(
+            insert(CouponLoadTable).returning(
+                CouponLoadTable.cpn_load_id, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "load_date": load.load_date.isoformat(),
+                    "irrad_container_sys_id": load.irrad_container_sys_id,
+                    "irrad_placement_id": load.irrad_placement_id,
+                }
+                for load in outage.loads
+            ],
+        ).all()
+
+        for load_id, load in zip(load_ids, outage.loads):
+            for changed_vessel_id in (vessel_id, owners[load.irrad_container_sys_id]):
+                changes.append(
+                    Change(changed_vessel_id, CouponLoadTable.__tablename__, load_id)
+                )
+
+    record_changes(db, changes)
+    db.commit()
+
+    return OutageResultModel(
+        extracts={
+            extract.cpn_load_id: extract_id
+            for extract, extract_id in zip(outage.extracts, extract_ids)
+        },
+        loads=list(load_ids),
+    )
@@ -0,0 +1,292 @@
+import threading
+from bisect import bisect_right
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from pydantic import BaseModel
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from backend.api.unit_helpers import UnitVersion
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+)
+
+
+class Interval(NamedTuple):
+    """A stay of a container system in a placement, from load until extract."""
+
+    start: str  # load date
+    end: str | None  # extract date, None while still loaded
+    cpn_load_id: int
+    container_sys_id: int
+    placement_id: int
+    host_vessel_id: int  # vessel of the placement
+    owner_vessel_id: int  # vessel of the container system's complect
+
+
+class Timeline:
+    """
+    Intervals of a single placement (or container system) sorted by start.
+
+    Only one container system sits in a placement at a time (and a container
+    system sits in one placement), so the interval covering a day is the last
+    one started on or before it, unless it already ended by then.
+    """
+
+    def __init__(self, intervals: Iterable[Interval]):
+        self.intervals = sorted(intervals, key=lambda i: (i.start, i.cpn_load_id))
+        self.starts = [interval.start for interval in self.intervals]
+
+    def at(self, day: str) -> Interval | None:
+        """Get the interval covering the day (ISO date; load day inclusive, extract day exclusive)."""
+        i = bisect_right(self.starts, day) - 1
+        if i < 0:
+            return None
+
+        interval = self.intervals[i]
+        if interval.end is not None and interval.end <= day:
+            return None
+        return interval
+
+
+class VesselTimeline:
+    """
+    Occupancy history of a vessel: a timeline per placement of the vessel &
+    per container system of its complects (including stays in other vessels).
+    """
+
+    def __init__(
+        self,
+        vessel_id: int,
+        placement_ids: Iterable[int],
+        container_sys_ids: Iterable[int],
+        intervals: Iterable[Interval],
+    ):
+        self.vessel_id = vessel_id
+
+        by_placement: dict[int, list[Interval]] = {pid: [] for pid in placement_ids}
+        by_container_sys: dict[int, list[Interval]] = {
+            cs_id: [] for cs_id in container_sys_ids
+        }
+        self.loads: dict[int, Interval] = {}
+
+        for interval in intervals:
+            self.loads[interval.cpn_load_id] = interval
+            if interval.host_vessel_id == vessel_id:
+                by_placement[interval.placement_id].append(interval)
+            if interval.owner_vessel_id == vessel_id:
+                by_container_sys[interval.container_sys_id].append(interval)
+
+        self.placements = {
+            pid: Timeline(intervals) for pid, intervals in by_placement.items()
+        }
+        self.container_systems = {
+            cs_id: Timeline(intervals) for cs_id, intervals in by_container_sys.items()
+        }
+
+    def state(self, day: str) -> tuple[dict, dict]:
+        """
+        Get the vessel state on the day: the interval occupying each placement
+        & the interval irradiating each container system (None if none).
+        """
+        return (
+            {pid: timeline.at(day) for pid, timeline in self.placements.items()},
+            {
+                cs_id: timeline.at(day)
+                for cs_id, timeline in self.container_systems.items()
+            },
+        )
+
+
+def load_vessel_timelines(
+    db: Session, vessel_ids: list[int]
+) -> dict[int, VesselTimeline]:
+    """
+    Build the timelines of the vessels with one query per level
+    (placements, container systems, loads & extracts).
+    Loads without a load date are left out, as their position in time is unknown.
+    """
+    placements = db.execute(
+        select(ReactorVesselSectorTable.vessel_id, PlacementTable.placement_id)
+        .join(
+            PlacementTable,
+            PlacementTable.sector_id == ReactorVesselSectorTable.rpv_sector_id,
+        )
+        .where(ReactorVesselSectorTable.vessel_id.in_(vessel_ids))
+    ).all()
+
+    container_systems = db.execute(
+        select(CouponComplectTable.vessel_id, ContainerSysTable.container_sys_id)
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.coupon_complect_id
+            == CouponComplectTable.coupon_complect_id,
+        )
+        .where(CouponComplectTable.vessel_id.in_(vessel_ids))
+    ).all()
+
+    loads = db.execute(
+        select(
+            CouponLoadTable.load_date,
+            CouponExtractTable.extract_date,
+            CouponLoadTable.cpn_load_id,
+            CouponLoadTable.irrad_container_sys_id,
+            CouponLoadTable.irrad_placement_id,
+            ReactorVesselSectorTable.vessel_id.label("host_vessel_id"),
+            CouponComplectTable.vessel_id.label("owner_vessel_id"),
+        )
+        .join(
+            PlacementTable,
+            PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+        )
+        .join(
+            ReactorVesselSectorTable,
+            ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+        .outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        )
+        .where(
+            CouponLoadTable.load_date.is_not(None),
+            or_(
+                ReactorVesselSectorTable.vessel_id.in_(vessel_ids),
+                CouponComplectTable.vessel_id.in_(vessel_ids),
+            ),
+        )
+    ).all()
+
+    placement_ids = {vessel_id: [] for vessel_id in vessel_ids}
+    for vessel_id, placement_id in placements:
+        placement_ids[vessel_id].append(placement_id)
+
+    container_sys_ids = {vessel_id: [] for vessel_id in vessel_ids}
+    for vessel_id, container_sys_id in container_systems:
+        container_sys_ids[vessel_id].append(container_sys_id)
+
+    intervals = {vessel_id: [] for vessel_id in vessel_ids}
+    for load in loads:
+        interval = Interval(*load)
+        for vessel_id in {interval.host_vessel_id, interval.owner_vessel_id}:
+            if vessel_id in intervals:
+                intervals[vessel_id].append(interval)
+
+    return {
+        vessel_id: VesselTimeline(
+            vessel_id,
+            placement_ids[vessel_id],
+            container_sys_ids[vessel_id],
+            intervals[vessel_id],
+        )
+        for vessel_id in vessel_ids
+    }
+
+
+class TimelineCache:
+    """
+    Vessel timelines kept in memory while the unit's version token stays
+    the same; stale vessels are rebuilt together (see `load_vessel_timelines`).
+    """
+
+    def __init__(self):
+        self._timelines: dict[int, tuple[str, VesselTimeline]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, db: Session, versions: Iterable[UnitVersion]
+    ) -> dict[int, VesselTimeline]:
+        """Get the timelines of the units' vessels by vessel id."""
+        tokens = {
+            version.vessel_id: version.token
+            for version in versions
+            if version.vessel_id is not None
+        }
+
+        with self._lock:
+            cached = {
+                vessel_id: entry[1]
+                for vessel_id, entry in self._timelines.items()
+                if tokens.get(vessel_id) == entry[0]
+            }
+
+        stale = [vessel_id for vessel_id in tokens if vessel_id not in cached]
+        if stale:
+            built = load_vessel_timelines(db, stale)
+            with self._lock:
+                for vessel_id, timeline in built.items():
+                    self._timelines[vessel_id] = (tokens[vessel_id], timeline)
+            cached.update(built)
+
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._timelines.clear()
+
+
+timeline_cache = TimelineCache()
+
+
+class LoadStateModel(BaseModel):
+    cpn_load_id: int
+    load_date: str
+    extract_date: str | None
+    irrad_container_sys_id: int
+    irrad_placement_id: int
+    native: bool  # container system of the vessel's own complects
+
+
+class UnitStateModel(BaseModel):
+    as_of: str
+    placements: dict[int, int | None]  # placement id -> id of the load occupying it
+    container_systems: dict[int, int | None]  # container system id -> id of its load
+    loads: dict[int, LoadStateModel]  # loads referenced above
+
+
+def unit_state(timeline: VesselTimeline | None, day: str) -> UnitStateModel:
+    """Build the as-of state of the unit from its vessel timeline."""
+    if timeline is None:
+        return UnitStateModel(as_of=day, placements={}, container_systems={}, loads={})
+
+    placements, container_systems = timeline.state(day)
+
+    loads = {}
+    for interval in (*placements.values(), *container_systems.values()):
+        if interval is not None and interval.cpn_load_id not in loads:
+            loads[interval.cpn_load_id] = LoadStateModel(
+                cpn_load_id=interval.cpn_load_id,
+                load_date=interval.start,
+                extract_date=interval.end,
+                irrad_container_sys_id=interval.container_sys_id,
+                irrad_placement_id=interval.placement_id,
+                native=interval.host_vessel_id == interval.owner_vessel_id,
+            )
+
+    return UnitStateModel(
+        as_of=day,
+        placements={
+            pid: interval.cpn_load_id if interval else None
+            for pid, interval in placements.items()
+        },
+        container_systems={
+            cs_id: interval.cpn_load_id if interval else None
+            for cs_id, interval in container_systems.items()
+        },
+        loads=loads,
+    )
@@ -1,13 +1,19 @@
 import logging
 import pathlib
+import secrets
 from contextlib import asynccontextmanager
+from typing import Annotated
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from backend.api import api_router
+from .compression import CompressionMiddleware
+from .config import config
 from .db import Db
+from .metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from .profiler import ProfilerMiddleware, profile_ring
+from .static import IMMUTABLE, PrecompressedStaticFiles, SpaIndex
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +29,13 @@ async def lifespan(_app: FastAPI):
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware, minimum_size=config.compression_min_size)
+app.add_middleware(
+    ProfilerMiddleware,
+    ring=profile_ring,
+    interval=config.profile_interval_ms / 1000,
+)
+app.add_middleware(MetricsMiddleware)  # Outermost: times the whole request
 
 app.include_router(api_router)
 
@@ -30,14 +43,43 @@ app.include_router(api_router)
 frontend_dist = pathlib.Path(__file__).parent.parent / "frontend" / "dist"
 app.mount(
     "/assets",
-    StaticFiles(directory=frontend_dist / "assets", html=False),
+    PrecompressedStaticFiles(
+        directory=frontend_dist / "assets", html=False, cache_control=IMMUTABLE
+    ),
     name="assets",
 )
 
 
+def metrics_access(authorization: Annotated[str | None, Header()] = None) -> None:
+    """
+    Dependency checking the ``metrics_token`` bearer token of a scrape.
+    Without a configured token the metrics are not served at all.
+    """
+    token = config.metrics_token
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {token.get_secret_value()}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(metrics_access)])
+async def metrics_endpoint():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
 # Serve SPA
+spa_index = SpaIndex(frontend_dist / "index.html")
+
+
 @app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
+async def serve_spa(full_path: str, request: Request):
     if full_path.startswith(("api/", "assets/")):
         return JSONResponse(content={"detail": "Not Found"}, status_code=404)
-    return FileResponse(frontend_dist / "index.html")
+    return spa_index.response(request)
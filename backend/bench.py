@@ -0,0 +1,245 @@
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+
+from backend.api.unit import (
+    ContainerSysDetailsModel,
+    PlacementDetailsModel,
+    UnitDetailsModel,
+)
+from backend.api.unit_details import UnitRows, encode_unit_details
+from backend.api.unit_helpers import placement_text_coords, placements_coords
+from backend.models import CouponLoadModel, UnitModel
+
+# Synthetic rows mimic the Core rows returned by `load_unit_rows`
+UnitRow = namedtuple(
+    "UnitRow",
+    "unit_id plant_id num name name_eng design stage power start_date vessel_id",
+)
+PlacementRow = namedtuple(
+    "PlacementRow",
+    "rpv_sector_id vessel_id sector_number placement_id sector_id num_in_sector name",
+)
+ContainerSysRow = namedtuple(
+    "ContainerSysRow",
+    "coupon_complect_id vessel_id complect_name complect_number is_additional container_sys_id name",
+)
+LoadRow = namedtuple(
+    "LoadRow",
+    "cpn_load_id load_date irrad_container_sys_id irrad_placement_id container_sys_name cpn_extract_id extract_date extract_container_sys_id",
+)
+
+
+def synthetic_unit_rows(loads: int) -> UnitRows:
+    """
+    Build rows of a single unit with the given number of loads: 6 sectors of
+    5 placements, one container system per load (6 per complect) & all loads
+    extracted except for the last one in every placement.
+    """
+    unit = UnitRow(
+        1,
+        1,
+        Decimal(1),
+        "Блок 1",
+        "unit1",
+        "В-320",
+        None,
+        Decimal("1000.00"),
+        date(1985, 1, 1),
+        1,
+    )
+
+    placements = [
+        PlacementRow(
+            sector,
+            1,
+            sector,
+            (sector - 1) * 5 + num,
+            sector,
+            Decimal(num),
+            f"{sector}-{num}",
+        )
+        for sector in range(1, 7)
+        for num in range(1, 6)
+    ]
+
+    container_systems = [
+        ContainerSysRow(
+            i // 6 + 1, 1, f"{i // 6 + 1:03}", i // 6 + 1, False, i + 1, f"{i % 6 + 1}"
+        )
+        for i in range(loads)
+    ]
+
+    load_rows = []
+    start = date(1985, 1, 1)
+    for i in range(loads):
+        placement_id = i % len(placements) + 1
+        cycle = i // len(placements)
+        load_date = start + timedelta(days=365 * cycle)
+        extracted = i + len(placements) < loads
+        load_rows.append(
+            LoadRow(
+                i + 1,
+                load_date.isoformat(),
+                i + 1,
+                placement_id,
+                container_systems[i].name,
+                i + 1 if extracted else None,
+                (load_date + timedelta(days=360)).isoformat() if extracted else None,
+                i + 1 if extracted else None,
+            )
+        )
+
+    return UnitRows(
+        unit=unit,
+        placements=placements,
+        container_systems=container_systems,
+        loads=load_rows,
+    )
+
+
+def encode_unit_details_validated(rows: UnitRows) -> bytes:
+    """
+    Reference (previous) path: validate the unit & each load into the Pydantic
+    models, build the nested models, then re-validate & serialize the result
+    the way FastAPI does for a declared response model.
+    """
+    loads = {}
+    for load in rows.loads:
+        loads[load.cpn_load_id] = CouponLoadModel.model_validate(
+            {
+                "cpn_load_id": load.cpn_load_id,
+                "load_date": load.load_date,
+                "irrad_container_sys_id": load.irrad_container_sys_id,
+                "irrad_placement_id": load.irrad_placement_id,
+                "coupon_extract": {
+                    "cpn_extract_id": load.cpn_extract_id,
+                    "cpn_load_id": load.cpn_load_id,
+                    "extract_date": load.extract_date,
+                    "irrad_container_sys_id": load.extract_container_sys_id,
+                }
+                if load.cpn_extract_id is not None
+                else None,
+            }
+        )
+
+    sys_names = {load.cpn_load_id: load.container_sys_name for load in rows.loads}
+    p_load_ids = {p.placement_id: [] for p in rows.placements}
+    cs_load_ids = {cs.container_sys_id: [] for cs in rows.container_systems}
+    for load in rows.loads:
+        if load.irrad_placement_id in p_load_ids:
+            p_load_ids[load.irrad_placement_id].append(load.cpn_load_id)
+        if load.irrad_container_sys_id in cs_load_ids:
+            cs_load_ids[load.irrad_container_sys_id].append(load.cpn_load_id)
+
+    sectors: dict[int, dict] = {}
+    for p in rows.placements:
+        sectors.setdefault(
+            p.rpv_sector_id,
+            {
+                "rpv_sector_id": p.rpv_sector_id,
+                "vessel_id": p.vessel_id,
+                "sector_number": p.sector_number,
+                "placements": [],
+            },
+        )["placements"].append(
+            {
+                "placement_id": p.placement_id,
+                "sector_id": p.sector_id,
+                "num_in_sector": p.num_in_sector,
+                "name": p.name,
+            }
+        )
+
+    complects: dict[int, dict] = {}
+    for cs in rows.container_systems:
+        complects.setdefault(
+            cs.coupon_complect_id,
+            {
+                "coupon_complect_id": cs.coupon_complect_id,
+                "vessel_id": cs.vessel_id,
+                "name": cs.complect_name,
+                "complect_number": cs.complect_number,
+                "is_additional": cs.is_additional,
+                "container_systems": [],
+            },
+        )["container_systems"].append(
+            {
+                "container_sys_id": cs.container_sys_id,
+                "coupon_complect_id": cs.coupon_complect_id,
+                "name": cs.name,
+            }
+        )
+
+    unit = UnitModel.model_validate(
+        {
+            **rows.unit._asdict(),
+            "reactor_vessel": {
+                "vessel_id": rows.unit.vessel_id,
+                "unit_id": rows.unit.unit_id,
+                "sectors": list(sectors.values()),
+                "coupon_complects": list(complects.values()),
+            },
+        }
+    )
+
+    unit_details = UnitDetailsModel(
+        unit=unit,
+        loads=loads,
+        placements_details={
+            p.placement_id: PlacementDetailsModel(
+                occupied=bool(p_load_ids[p.placement_id])
+                and loads[p_load_ids[p.placement_id][-1]].coupon_extract is None,
+                last_sys_name=sys_names[p_load_ids[p.placement_id][-1]]
+                if p_load_ids[p.placement_id]
+                else None,
+                load_ids=p_load_ids[p.placement_id],
+                coords=placements_coords.get(p.sector_number, {}).get(
+                    int(p.num_in_sector)
+                ),
+                text_coords=placement_text_coords.get(p.sector_number, {}).get(
+                    int(p.num_in_sector)
+                ),
+            )
+            for p in rows.placements
+        },
+        container_systems_details={
+            cs_id: ContainerSysDetailsModel(load_ids=load_ids)
+            for cs_id, load_ids in cs_load_ids.items()
+        },
+    )
+
+    # FastAPI: dump the returned model, validate against the response model, serialize
+    revalidated = UnitDetailsModel.model_validate(unit_details.model_dump())
+    return revalidated.model_dump_json().encode()
+
+
+def bench_unit_serialization(loads: int = 1000, repeat: int = 20) -> dict:
+    """
+    Measure the cost of encoding `UnitDetailsModel` for the given number of
+    loads with the fast (rows -> JSON) & the validated (Pydantic models) paths.
+
+    Returns the best time per run & the cost per 1,000 loads (in ms) of each path.
+    """
+    rows = synthetic_unit_rows(loads)
+
+    results = {"loads": loads, "repeat": repeat}
+    for name, encode in (
+        ("fast", encode_unit_details),
+        ("validated", encode_unit_details_validated),
+    ):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = encode(rows)
+            timings.append(time.perf_counter() - start)
+
+        best_ms = min(timings) * 1000
+        results[name] = {
+            "best_ms": round(best_ms, 3),
+            "per_1000_loads_ms": round(best_ms * 1000 / max(loads, 1), 3),
+            "bytes": len(body),
+        }
+
+    return results
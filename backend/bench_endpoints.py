@@ -0,0 +1,356 @@
+import asyncio
+import json
+import logging
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+from sqlalchemy import delete, event, func, select
+
+from backend.api import api_router
+from backend.api.auth import auth_service
+from backend.api.unit_exposure import exposure_cache
+from backend.api.unit_timeline import timeline_cache
+from backend.cache import response_cache
+from backend.config import config
+from backend.db import Db, DbSessionContext
+from backend.tables import (
+    CouponLoadTable,
+    DocumentTable,
+    NppUnitTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+    ReactorVesselTable,
+    UserTable,
+)
+from backend.tables.user import UserSessionTable
+
+logger = logging.getLogger(__name__)
+
+BENCH_USERNAME = "bench"
+
+# Server-Sent Events streams never end
+STREAMING_OPERATIONS = {"get_unit2_events", "get_documents_events"}
+
+# Values of the path parameters, by parameter name (see `route_params`)
+DEFAULT_PARAMS = {"table": "loads"}
+
+
+class BenchRoute(NamedTuple):
+    key: str  # "GET /api/unit2/{name_eng}", as in the budgets
+    url: str  # with the path parameters filled in
+
+
+class SkippedRoute(NamedTuple):
+    key: str
+    reason: str
+
+
+def route_params() -> dict[str, str]:
+    """
+    Path parameters to request the routes with: the unit with the most loads
+    (the largest payloads) & the first document.
+    """
+    params = dict(DEFAULT_PARAMS)
+    with DbSessionContext() as db:
+        name_eng = db.execute(
+            select(NppUnitTable.name_eng)
+            .join(
+                ReactorVesselTable, ReactorVesselTable.unit_id == NppUnitTable.unit_id
+            )
+            .join(
+                ReactorVesselSectorTable,
+                ReactorVesselSectorTable.vessel_id == ReactorVesselTable.vessel_id,
+            )
+            .join(
+                PlacementTable,
+                PlacementTable.sector_id == ReactorVesselSectorTable.rpv_sector_id,
+            )
+            .join(
+                CouponLoadTable,
+                CouponLoadTable.irrad_placement_id == PlacementTable.placement_id,
+            )
+            .group_by(NppUnitTable.name_eng)
+            .order_by(func.count().desc(), NppUnitTable.name_eng)
+            .limit(1)
+        ).scalar()
+        if name_eng is not None:
+            params["name_eng"] = name_eng
+
+        document_id = db.execute(select(func.min(DocumentTable.doc_id))).scalar()
+        if document_id is not None:
+            params["document_id"] = str(document_id)
+    return params
+
+
+def bench_routes(
+    openapi: dict, params: dict[str, str], only: str | None = None
+) -> tuple[list[BenchRoute], list[SkippedRoute]]:
+    """
+    Routes of `api_router` to benchmark (from the OpenAPI schema), & those
+    skipped with the reason: only GET routes are requested, as the others
+    write to the database.
+    """
+    routes, skipped = [], []
+    for path, operations in openapi["paths"].items():
+        if not path.startswith(api_router.prefix + "/"):
+            continue
+        for method, operation in operations.items():
+            key = f"{method.upper()} {path}"
+            if only is not None and only not in key:
+                continue
+
+            if method != "get":
+                skipped.append(SkippedRoute(key, "writes to the database"))
+                continue
+            if operation.get("operationId") in STREAMING_OPERATIONS:
+                skipped.append(SkippedRoute(key, "endless event stream"))
+                continue
+
+            path_params = [
+                parameter["name"]
+                for parameter in operation.get("parameters", [])
+                if parameter["in"] == "path"
+            ]
+            missing = [name for name in path_params if name not in params]
+            if missing:
+                skipped.append(SkippedRoute(key, f"no value for {', '.join(missing)}"))
+                continue
+
+            routes.append(
+                BenchRoute(
+                    key, path.format(**{name: params[name] for name in path_params})
+                )
+            )
+    return routes, skipped
+
+
+def bench_session_cookie() -> dict[str, str]:
+    """
+    Log the benchmark user in (created if missing, made an administrator for
+    the run), so requests go through the real authentication.
+    """
+    with DbSessionContext() as db:
+        user = db.execute(
+            select(UserTable).where(UserTable.username == BENCH_USERNAME)
+        ).scalar_one_or_none()
+        if user is None:
+            user = UserTable(
+                username=BENCH_USERNAME,
+                full_name="Benchmark",
+                email="bench@localhost",
+                enabled=True,
+            )
+            db.add(user)
+            db.commit()
+
+        session = auth_service.create_session(user, db)
+        token = auth_service.create_jwt_token(session, user)
+
+    if BENCH_USERNAME not in config.auth_admin_usernames:
+        config.auth_admin_usernames = [*config.auth_admin_usernames, BENCH_USERNAME]
+    return {"access_token": token}
+
+
+def delete_bench_sessions() -> None:
+    """Log the benchmark user out of the sessions of the runs."""
+    with DbSessionContext() as db:
+        user_ids = select(UserTable.user_id).where(UserTable.username == BENCH_USERNAME)
+        db.execute(
+            delete(UserSessionTable).where(UserSessionTable.user_id.in_(user_ids))
+        )
+        db.commit()
+
+
+def _percentile(timings: list[float], percent: float) -> float:
+    """Nearest-rank percentile of the sorted timings."""
+    index = max(0, min(len(timings) - 1, round(percent / 100 * len(timings)) - 1))
+    return timings[index]
+
+
+class _StatementCounter:
+    """Counts the SQL statements executed by the engine."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *_args, **_kwargs):
+        self.count += 1
+
+
+def clear_caches() -> None:
+    """Empty the caches of the responses & of the data they are built from."""
+    response_cache.clear()
+    timeline_cache.clear()
+    exposure_cache.clear()
+
+
+async def _request(client: httpx.AsyncClient, url: str) -> tuple[int, int]:
+    """Request the route, reading the whole body: returns the status & size."""
+    async with client.stream("GET", url) as response:
+        size = 0
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+        return response.status_code, size
+
+
+async def bench_route(
+    client: httpx.AsyncClient,
+    route: BenchRoute,
+    counter: _StatementCounter,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """
+    Benchmark a route: a first request, then ``requests`` timed ones from
+    ``concurrency`` concurrent clients (served from the warm caches), then
+    ``requests`` cold ones one at a time, the caches being emptied before each
+    (``cold_*`` results), then one more under tracemalloc for the peak memory
+    (tracing slows the requests down, so it is not timed).
+    """
+    clear_caches()
+    start = time.perf_counter()
+    status, size = await _request(client, route.url)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    timings: list[float] = []
+    errors = 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            start = time.perf_counter()
+            status, _ = await _request(client, route.url)
+            timings.append((time.perf_counter() - start) * 1000)
+            if status >= 400:
+                errors += 1
+
+    statements = counter.count
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    statements = counter.count - statements
+
+    cold_timings: list[float] = []
+    cold_statements = counter.count
+    for _ in range(requests):
+        clear_caches()
+        start = time.perf_counter()
+        status, _ = await _request(client, route.url)
+        cold_timings.append((time.perf_counter() - start) * 1000)
+        if status >= 400:
+            errors += 1
+    cold_statements = counter.count - cold_statements
+
+    tracemalloc.start()
+    try:
+        await _request(client, route.url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    cold_timings.sort()
+    return {
+        "route": route.key,
+        "url": route.url,
+        "status": status,
+        "bytes": size,
+        "errors": errors,
+        "requests": requests,
+        "concurrency": concurrency,
+        "first_ms": round(first_ms, 3),
+        "p50_ms": round(_percentile(timings, 50), 3),
+        "p90_ms": round(_percentile(timings, 90), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+        "p99_ms": round(_percentile(timings, 99), 3),
+        "max_ms": round(timings[-1], 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "statements": round(statements / requests, 2),
+        "cold_p50_ms": round(_percentile(cold_timings, 50), 3),
+        "cold_p95_ms": round(_percentile(cold_timings, 95), 3),
+        "cold_statements": round(cold_statements / requests, 2),
+        "peak_mb": round(peak / 1024 / 1024, 3),
+    }
+
+
+def check_budget(result: dict, budget: dict) -> list[str]:
+    """Budget limits (same keys as the results, e.g. ``p95_ms``) the route exceeds."""
+    exceeded = []
+    if result["status"] >= 400 or result["errors"]:
+        exceeded.append(f"status {result['status']}, {result['errors']} errors")
+    for name, limit in budget.items():
+        if result.get(name) is not None and result[name] > limit:
+            exceeded.append(f"{name} {result[name]} > {limit}")
+    return exceeded
+
+
+async def _bench(
+    routes: list[BenchRoute], cookies: dict, requests: int, concurrency: int
+) -> list[dict]:
+    from backend.app import app
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # A line per request
+
+    counter = _StatementCounter()
+    event.listen(Db.engine, "before_cursor_execute", counter)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", cookies=cookies, timeout=None
+        ) as client:
+            results = []
+            for route in routes:
+                logger.info("Benchmarking %s", route.key)
+                results.append(
+                    await bench_route(client, route, counter, requests, concurrency)
+                )
+            return results
+    finally:
+        event.remove(Db.engine, "before_cursor_execute", counter)
+
+
+def bench_endpoints(
+    requests: int = 20,
+    concurrency: int = 1,
+    budgets: dict[str, dict] | None = None,
+    only: str | None = None,
+) -> dict:
+    """
+    Benchmark every GET route of `api_router` by driving the app in-process
+    through httpx (no server, no network), logged in as the benchmark user,
+    against the connected database (see `Db.connect`). Routes are requested
+    with the parameters of `route_params`, one after the other.
+
+    Returns the results of every route, with the budget limits it exceeds
+    (``budgets`` maps route keys to limits, see `check_budget`), & the
+    skipped routes.
+    """
+    from backend.app import app
+
+    budgets = budgets or {}
+    routes, skipped = bench_routes(app.openapi(), route_params(), only)
+    cookies = bench_session_cookie()
+    try:
+        results = asyncio.run(_bench(routes, cookies, requests, concurrency))
+    finally:
+        delete_bench_sessions()
+
+    for result in results:
+        result["over_budget"] = check_budget(result, budgets.get(result["route"], {}))
+
+    return {
+        "started": datetime.now(UTC).isoformat(),
+        "database": Db.engine.url.render_as_string(hide_password=True),
+        "routes": results,
+        "skipped": [route._asdict() for route in skipped],
+    }
+
+
+def load_budgets(path: Path) -> dict[str, dict]:
+    """Budgets of the routes, from a JSON file mapping route keys to limits."""
+    return json.loads(path.read_text()) if path.exists() else {}
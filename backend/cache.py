@@ -0,0 +1,225 @@
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from fastapi import Request, Response
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A pre-encoded response body stored in the cache."""
+
+    body: bytes
+    tags: frozenset[str]
+    etag: str | None = None
+    media_type: str = "application/json"
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def to_response(self, headers: dict[str, str] | None = None) -> Response:
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+
+class ResponseCache:
+    """
+    In-process cache of encoded responses for read endpoints.
+
+    - Keys are built from the request path & query (see `key_for`)
+    - Entries are tagged (e.g. ``unit:<id>``, ``vessel:<id>``, ``documents``)
+      & writers drop everything related to their data via `invalidate`
+    - Total size of the bodies is bounded, least recently used entries are evicted
+    - Entries may carry the ETag they were built for, a lookup with a different
+      (current) ETag treats the entry as stale
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        """Build the cache key from the request path & (sorted) query parameters."""
+        query = sorted(request.query_params.multi_items())
+        if not query:
+            return request.url.path
+        return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in query)
+
+    def get(self, key: str, etag: str | None = None) -> CacheEntry | None:
+        """Get a fresh entry by key (and current ETag, if given)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and etag is not None and entry.etag != etag:
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        key: str,
+        body: bytes,
+        tags: list[str],
+        etag: str | None = None,
+        media_type: str = "application/json",
+    ) -> CacheEntry:
+        """Store an encoded body, evicting least recently used entries if needed."""
+        entry = CacheEntry(
+            body=body, tags=frozenset(tags), etag=etag, media_type=media_type
+        )
+        if entry.size > self.max_bytes:
+            return entry
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._size += entry.size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while self._size > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+        return entry
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop all entries having any of the given tags. Returns the number dropped."""
+        with self._lock:
+            keys = set().union(*(self._tags.get(tag, ()) for tag in tags))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+        if keys:
+            logger.debug("Invalidated %d cached responses for %s", len(keys), tags)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        """Get the cache usage counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry & its tag references. Must be called under the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        self._size -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+@dataclass
+class _Call:
+    """A computation in flight, shared by all callers with the same key."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical computations: the first caller for a key
+    computes, callers arriving while it runs wait for & share its result
+    (or exception). Nothing is kept once the computation finishes.
+
+    Endpoints are synchronous (run in the threadpool), so waiting blocks the thread.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run ``fn`` unless a call with the same key is in flight, then share its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        """Get the coalescing counters."""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+            }
+
+
+# Global response cache shared by the read endpoints
+response_cache = ResponseCache(config.cache_max_bytes)
+
+# Global coalescing of expensive response builds
+single_flight = SingleFlight()
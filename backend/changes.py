@@ -0,0 +1,135 @@
+import logging
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from sqlalchemy import Connection, event, insert, select
+from sqlalchemy.orm import Session
+
+from .cache import response_cache
+from .events import broker
+from .tables import DataChangeTable, NppTable, NppUnitTable, ReactorVesselTable
+
+logger = logging.getLogger(__name__)
+
+# Key of the changed vessels in `Session.info`, notified once the transaction commits
+PENDING_VESSELS_KEY = "changed_vessel_ids"
+
+# Key of the units whose own rows changed in `Session.info`, see `_after_flush`
+PENDING_UNITS_KEY = "changed_unit_ids"
+
+
+class Change(NamedTuple):
+    """
+    A single change of a row of the vessel's data: a load, extract, complect
+    or container system (served by delta sync), or any other row the unit's
+    responses depend on (sector, placement, findings...).
+    """
+
+    vessel_id: int
+    table_name: str
+    row_id: int
+    deleted: bool = False
+
+
+def record_changes(db: Session, changes: Iterable[Change]) -> None:
+    """
+    Append changes to the change log (``T_DATA_CHANGES``) within the current
+    transaction, so they become visible together with the data itself.
+
+    Every write of the vessel's data must record its changes, once per
+    affected vessel (a load of a non-native container system touches both
+    the host & the owner vessels): the last change is the version of the
+    vessel (see `units_versions`) & delta sync (``/unit2/{name_eng}/changes``)
+    relies on this log. Rows of the unit & plant are part of the version, so
+    their writes need not be recorded.
+
+    Once the transaction commits, cached responses of the changed vessels are
+    invalidated & their subscribers are notified (see `notify_vessels`).
+    """
+    rows = [change._asdict() for change in dict.fromkeys(changes)]
+    if not rows:
+        return
+
+    db.execute(insert(DataChangeTable), rows)
+    db.info.setdefault(PENDING_VESSELS_KEY, set()).update(
+        row["vessel_id"] for row in rows
+    )
+    logger.debug("Recorded %d data changes", len(rows))
+
+
+def record_rewritten_vessels(
+    connection: Connection, vessel_ids: Iterable[int], after: int = 0
+) -> None:
+    """
+    Record a change of each vessel whose data was rewritten in bulk without
+    a `Session` (restored dumps), so its version moves past the tokens held
+    by clients. Delta sync asks them to refetch the unit.
+
+    The changes are numbered from ``after + 1``: the last change number the
+    clients may hold, when the change log itself was rewritten (the identity
+    must be synced afterwards, see `backend.dump.sync_identities`).
+    """
+    rows = [
+        {
+            "change_seq": after + i,
+            **Change(vessel_id, ReactorVesselTable.__tablename__, vessel_id)._asdict(),
+        }
+        for i, vessel_id in enumerate(sorted(set(vessel_ids)), start=1)
+    ]
+    if rows:
+        connection.execute(insert(DataChangeTable), rows)
+
+
+def notify_vessels(vessel_ids: Iterable[int]) -> None:
+    """Invalidate cached responses of the vessels & publish ``changes`` events."""
+    vessel_ids = sorted(set(vessel_ids))
+    if not vessel_ids:
+        return
+
+    response_cache.invalidate(*(f"vessel:{vessel_id}" for vessel_id in vessel_ids))
+    for vessel_id in vessel_ids:
+        broker.publish(f"vessel:{vessel_id}", "changes", {"vessel_id": vessel_id})
+
+
+def notify_units(unit_ids: Iterable[int]) -> None:
+    """Invalidate cached responses of the units."""
+    response_cache.invalidate(*(f"unit:{unit_id}" for unit_id in set(unit_ids)))
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, _flush_context) -> None:
+    """
+    Collect the units whose unit, plant or vessel rows the flush wrote, to
+    invalidate their cached responses once the transaction commits. These
+    rows are part of the unit's version, so no change needs to be recorded.
+    """
+    unit_ids = set()
+    plant_ids = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, (NppUnitTable, ReactorVesselTable)):
+            unit_ids.add(instance.unit_id)
+        elif isinstance(instance, NppTable):
+            plant_ids.add(instance.plant_id)
+
+    if plant_ids:
+        unit_ids.update(
+            session.connection()
+            .execute(
+                select(NppUnitTable.unit_id).where(NppUnitTable.plant_id.in_(plant_ids))
+            )
+            .scalars()
+        )
+    if unit_ids:
+        session.info.setdefault(PENDING_UNITS_KEY, set()).update(unit_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    notify_units(session.info.pop(PENDING_UNITS_KEY, ()))
+    notify_vessels(session.info.pop(PENDING_VESSELS_KEY, ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(PENDING_UNITS_KEY, None)
+    session.info.pop(PENDING_VESSELS_KEY, None)
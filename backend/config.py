@@ -22,11 +22,37 @@ class Config(BaseSettings):
     db_service_name: str = "KSAR_PDB"  # Database/service name
     db_user: str = "ksar"
     db_pass: SecretStr = SecretStr("ksar")
+    db_url: SecretStr | None = (
+        None  # Full SQLAlchemy URL overriding the above (e.g. sqlite:///ksar.db)
+    )
 
     auth_jwt_secret_key: SecretStr = Field(
         default_factory=lambda: SecretStr(secrets.token_hex(32))
     )
     auth_session_expire_seconds: int = 2592000  # 30 days
+    auth_admin_usernames: list[str] = []  # Users allowed to run maintenance (JSON list)
+
+    # Response cache configuration
+    cache_max_bytes: int = 64 * 1024 * 1024  # Max total size of cached responses
+
+    # Response compression configuration
+    compression_min_size: int = 1024  # Min body size (bytes) to compress responses
+
+    # Reports configuration
+    report_workers: int = 2  # Worker processes building the fleet report
+
+    # Profiling configuration
+    profile_dir: str = "profiles"  # Directory of the request profile reports
+    profile_max_reports: int = 50  # Reports kept, the oldest are deleted
+    profile_interval_ms: float = 2.0  # Sampling interval of the profiler
+
+    # Metrics configuration
+    metrics_token: SecretStr | None = (
+        None  # Bearer token of the /metrics scrapes (not served if unset)
+    )
+
+    # Push notifications configuration
+    events_queue_size: int = 100  # Max events queued per subscriber before resync
 
     # Logging configuration
     log_level: str = "INFO"
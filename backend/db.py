@@ -7,10 +7,33 @@ from fastapi import Depends
 from sqlalchemy import orm
 
 from .config import config
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 
+def create_engine(url: str | None = None) -> sqlalchemy.Engine:
+    """
+    Create an engine for the URL, or for the configured database: ``db_url``
+    if set, else the Oracle instance of the ``db_*`` settings.
+    """
+    if url is None and config.db_url is not None:
+        url = config.db_url.get_secret_value()
+    if url is None:
+        url = sqlalchemy.URL.create(
+            "oracle+oracledb",
+            username=config.db_user,
+            password=config.db_pass.get_secret_value(),
+            host=config.db_host,
+            port=config.db_port,
+            query={"service_name": config.db_service_name},
+        )
+    url = sqlalchemy.make_url(url)
+
+    logger.debug("Connecting to %s", url.render_as_string(hide_password=True))
+    return sqlalchemy.create_engine(url, echo=False)  # echo is handled in logger.py
+
+
 class Db:
     """Manages the database connection and session lifecycle."""
 
@@ -18,20 +41,20 @@ class Db:
     session_maker: orm.sessionmaker[orm.Session] | None = None
 
     @classmethod
-    def connect(cls):
+    def connect(cls, url: str | None = None):
         """
         Initializes the database driver & establishes connection & creates a session factory
 
+        Args:
+            url: SQLAlchemy URL of the database, overriding the configured one.
+
         Raises:
             oracledb.exceptions.DatabaseError: in case initialization fails.
             sqlalchemy.exc.DatabaseError: in case connection to the database fails.
         """
 
-        url_template = f"oracle+oracledb://{config.db_user}:%s@{config.db_host}:{config.db_port}/?service_name={config.db_service_name}"
-        logger.debug("Connecting to %s", url_template % "****")
-        cls.engine = sqlalchemy.create_engine(
-            url_template % config.db_pass.get_secret_value(), echo=False
-        )  # echo is handled in logger.py
+        cls.engine = create_engine(url)
+        metrics.instrument_pool(cls.engine.pool)
         cls.session_maker = orm.sessionmaker(bind=cls.engine, expire_on_commit=False)
 
         # Ensuring the connection is working by executing a simple query
@@ -0,0 +1,340 @@
+import base64
+import gzip
+import json
+import logging
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import sqlalchemy
+from sqlalchemy import Table, delete, func, select
+
+import backend.tables  # noqa: F401 (registers every table in the metadata)
+from backend.changes import record_rewritten_vessels
+from backend.tables import DataChangeTable, ReactorVesselTable
+from backend.tables.base import BaseTable
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+YIELD_PER = 5000  # Rows fetched at once
+BLOB_YIELD_PER = 20  # Rows fetched at once from tables with BLOBs
+BATCH_SIZE = 5000  # Rows inserted with one array DML statement
+COMPRESS_LEVEL = 1  # Fast: BLOBs (PDF) are mostly compressed already
+
+
+class DumpError(ValueError):
+    """The dump cannot be restored (unknown tables, target not empty...)."""
+
+
+class TableDump(NamedTuple):
+    name: str
+    columns: list[str]
+    rows: int
+
+
+def _dump_path(directory: Path, table_name: str) -> Path:
+    return directory / f"{table_name}.ndjson.gz"
+
+
+def _encoder(type_: sqlalchemy.types.TypeEngine) -> Callable[[Any], Any] | None:
+    """JSON encoding of the column's values (None if they are JSON already)."""
+    if isinstance(type_, sqlalchemy.LargeBinary):
+        return lambda value: base64.b64encode(value).decode("ascii")
+    if isinstance(type_, (sqlalchemy.Date, sqlalchemy.DateTime)):
+        return lambda value: value.isoformat()
+    if isinstance(type_, sqlalchemy.Numeric):
+        # Integral numbers (NUMBER columns) stay exact, others are kept as text
+        return lambda value: int(value) if value == int(value) else str(value)
+    return None
+
+
+def _decoder(type_: sqlalchemy.types.TypeEngine) -> Callable[[Any], Any] | None:
+    """Decoding of the values written by `_encoder` (None if used as is)."""
+    if isinstance(type_, sqlalchemy.LargeBinary):
+        return base64.b64decode
+    if isinstance(type_, sqlalchemy.DateTime):
+        return datetime.fromisoformat
+    if isinstance(type_, sqlalchemy.Date):
+        # Oracle DATEs may come back with a (midnight) time
+        return lambda value: date.fromisoformat(value[:10])
+    if isinstance(type_, sqlalchemy.Numeric):
+        return lambda value: Decimal(value) if isinstance(value, str) else value
+    return None
+
+
+def _coders(table: Table, columns: Iterable[str], coder) -> list[tuple[int, Callable]]:
+    """Positions of the columns whose values need coding, with their coder."""
+    coders = []
+    for i, name in enumerate(columns):
+        function = coder(table.columns[name].type)
+        if function is not None:
+            coders.append((i, function))
+    return coders
+
+
+def dump_table(engine: sqlalchemy.Engine, table: Table, directory: Path) -> TableDump:
+    """
+    Stream the table into a gzipped newline-delimited JSON file, a row (as an
+    array of the column values) per line, ordered by primary key. Rows are
+    fetched with a server-side cursor (``yield_per``), so memory stays flat
+    whatever the table (BLOBs included) size.
+    """
+    columns = [column.name for column in table.columns]
+    encoders = _coders(table, columns, _encoder)
+    has_blobs = any(
+        isinstance(column.type, sqlalchemy.LargeBinary) for column in table.columns
+    )
+
+    stmt = (
+        select(table)
+        .order_by(*table.primary_key.columns)
+        .execution_options(yield_per=BLOB_YIELD_PER if has_blobs else YIELD_PER)
+    )
+
+    path = _dump_path(directory, table.name)
+    part_path = path.with_name(path.name + ".part")
+    rows = 0
+    with (
+        engine.connect() as connection,
+        gzip.open(
+            part_path, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL
+        ) as file,
+    ):
+        for partition in connection.execute(stmt).partitions():
+            lines = []
+            for row in partition:
+                values = list(row)
+                for i, encode in encoders:
+                    if values[i] is not None:
+                        values[i] = encode(values[i])
+                lines.append(
+                    json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+                )
+            lines.append("")
+            file.write("\n".join(lines))
+            rows += len(partition)
+
+    os.replace(part_path, path)
+    logger.info("Dumped %s rows of %s", rows, table.name)
+    return TableDump(table.name, columns, rows)
+
+
+def dump(
+    engine: sqlalchemy.Engine, directory: Path, workers: int = 4
+) -> list[TableDump]:
+    """
+    Dump every table of the metadata into the directory, tables being streamed
+    in parallel (a connection per worker thread). The manifest, listing the
+    tables in FK order with their columns & row counts, is written last.
+
+    The tables are read in separate transactions: the database should not be
+    written to while it is dumped.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    tables = BaseTable.metadata.sorted_tables
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        dumps = list(
+            pool.map(lambda table: dump_table(engine, table, directory), tables)
+        )
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "dialect": engine.dialect.name,
+        "created": datetime.now(UTC).isoformat(),
+        "tables": [table_dump._asdict() for table_dump in dumps],
+    }
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return dumps
+
+
+def read_manifest(directory: Path) -> list[TableDump]:
+    """Tables of the dump in the directory, in FK order."""
+    try:
+        manifest = json.loads((directory / MANIFEST).read_text())
+    except FileNotFoundError:
+        raise DumpError(f"No {MANIFEST} in {directory}: not a (complete) dump")
+    if manifest.get("version") != FORMAT_VERSION:
+        raise DumpError(f"Unsupported dump version: {manifest.get('version')}")
+
+    dumps = [TableDump(**table_dump) for table_dump in manifest["tables"]]
+    for table_dump in dumps:
+        table = BaseTable.metadata.tables.get(table_dump.name)
+        if table is None:
+            raise DumpError(f"Unknown table: {table_dump.name}")
+        unknown = set(table_dump.columns) - set(table.columns.keys())
+        if unknown:
+            raise DumpError(
+                f"Unknown columns of {table_dump.name}: {', '.join(sorted(unknown))}"
+            )
+    return dumps
+
+
+def restore_table(
+    engine: sqlalchemy.Engine,
+    table_dump: TableDump,
+    directory: Path,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Insert the rows of the table's dump file in a single transaction,
+    ``batch_size`` rows at once with array DML (``executemany``), keeping
+    their primary keys. Returns the number of inserted rows.
+    """
+    table = BaseTable.metadata.tables[table_dump.name]
+    columns = table_dump.columns
+    decoders = _coders(table, columns, _decoder)
+    insert = table.insert()
+
+    rows = 0
+    with (
+        engine.begin() as connection,
+        gzip.open(_dump_path(directory, table.name), "rt", encoding="utf-8") as file,
+    ):
+        batch = []
+        for line in file:
+            values = json.loads(line)
+            for i, decode in decoders:
+                if values[i] is not None:
+                    values[i] = decode(values[i])
+            batch.append(dict(zip(columns, values)))
+
+            if len(batch) >= batch_size:
+                connection.execute(insert, batch)
+                rows += len(batch)
+                batch.clear()
+
+        if batch:
+            connection.execute(insert, batch)
+            rows += len(batch)
+
+    logger.info("Restored %s rows of %s", rows, table.name)
+    return rows
+
+
+def _levels(tables: list[Table]) -> list[list[Table]]:
+    """
+    Group the tables (in FK order) into levels: the tables of a level only
+    reference tables of the previous levels, so they can be loaded in parallel.
+    """
+    level_of: dict[str, int] = {}
+    levels: list[list[Table]] = []
+    for table in tables:
+        level = max(
+            (
+                level_of[fk.column.table.name] + 1
+                for fk in table.foreign_keys
+                if fk.column.table.name in level_of
+            ),
+            default=0,
+        )
+        level_of[table.name] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(table)
+    return levels
+
+
+def sync_identities(connection: sqlalchemy.Connection, tables: Iterable[Table]) -> None:
+    """
+    Move the identity generators past the restored primary keys. Done once,
+    after every row is inserted: Oracle restarts the generator from the
+    column's max value. SQLite's ``INTEGER PRIMARY KEY`` already continues
+    after the max rowid, so there is nothing to do.
+    """
+    if connection.dialect.name != "oracle":
+        return
+
+    preparer = connection.dialect.identifier_preparer
+    for table in tables:
+        for column in table.columns:
+            if column.identity is None:
+                continue
+            connection.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"MODIFY ({preparer.format_column(column)} "
+                "GENERATED BY DEFAULT AS IDENTITY (START WITH LIMIT VALUE))"
+            )
+
+
+def restore(
+    engine: sqlalchemy.Engine,
+    directory: Path,
+    workers: int = 4,
+    batch_size: int = BATCH_SIZE,
+    replace: bool = False,
+) -> list[TableDump]:
+    """
+    Restore the dump in the directory into the database, creating the missing
+    tables. The tables must be empty, unless ``replace`` is set: their rows are
+    deleted first (in reverse FK order).
+
+    Tables are loaded in FK order, those of a same level (see `_levels`) in
+    parallel, then the identity generators are synced. SQLite allows a single
+    writer, so its tables are loaded one at a time.
+
+    The change log (``T_DATA_CHANGES``) is not restored: its numbers are the
+    versions & delta sync cursors held by the clients of this database, so
+    they must never go back. Instead a change of every vessel is recorded,
+    numbered after the last change the database had, the restored data
+    replacing any served before.
+    """
+    change_log = DataChangeTable.__table__
+    dumps = [
+        table_dump
+        for table_dump in read_manifest(directory)
+        if table_dump.name != change_log.name
+    ]
+    tables = [BaseTable.metadata.tables[table_dump.name] for table_dump in dumps]
+    by_name = {table_dump.name: table_dump for table_dump in dumps}
+
+    BaseTable.metadata.create_all(engine, tables=[*tables, change_log])
+
+    with engine.begin() as connection:
+        last_seq = connection.execute(
+            select(func.max(change_log.c.change_seq))
+        ).scalar()
+        if replace:
+            for table in reversed(BaseTable.metadata.sorted_tables):
+                # The change log references the vessels being replaced
+                if table.name in by_name or table is change_log:
+                    connection.execute(delete(table))
+        else:
+            for table in tables:
+                if connection.execute(select(func.count()).select_from(table)).scalar():
+                    raise DumpError(
+                        f"Table {table.name} is not empty (restore with replace)"
+                    )
+
+    if engine.dialect.name == "sqlite":
+        workers = 1
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for level in _levels(BaseTable.metadata.sorted_tables):
+            list(
+                pool.map(
+                    lambda table: restore_table(
+                        engine, by_name[table.name], directory, batch_size
+                    ),
+                    [table for table in level if table.name in by_name],
+                )
+            )
+
+    with engine.begin() as connection:
+        record_rewritten_vessels(
+            connection,
+            connection.execute(select(ReactorVesselTable.vessel_id)).scalars(),
+            after=last_seq or 0,
+        )
+
+    with engine.begin() as connection:
+        sync_identities(connection, [*tables, change_log])
+
+    return dumps
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+import threading
+from collections.abc import AsyncIterator
+from typing import NamedTuple
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+class Event(NamedTuple):
+    topic: str
+    name: str
+    data: dict
+
+    def encode(self) -> bytes:
+        """Encode as a Server-Sent Events message."""
+        return f"event: {self.name}\ndata: {json.dumps(self.data)}\n\n".encode()
+
+
+class Subscription:
+    """
+    Bounded queue of events for a single subscriber, bound to its event loop.
+
+    A subscriber which does not keep up does not slow down the publishers:
+    once its queue is full, the queued events are dropped & replaced with a
+    single ``resync`` event, telling the client to refetch its state.
+    """
+
+    def __init__(self, topics: frozenset[str], maxsize: int):
+        self.topics = topics
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def _put(self, event: Event) -> None:
+        # Runs in the subscriber's event loop
+        if self.queue.full():
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = Event(event.topic, "resync", {})
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Event:
+        return await self.queue.get()
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe of change notifications.
+
+    Publishing is thread-safe (sync routes run in the threadpool), events are
+    handed over to the subscribers' event loop & never block the publisher.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+        self.published = 0
+        self.dropped = 0  # by the closed subscriptions
+
+    def publish(self, topic: str, name: str, data: dict | None = None) -> None:
+        event = Event(topic, name, data or {})
+        with self._lock:
+            subscribers = [sub for sub in self._subscribers if topic in sub.topics]
+            self.published += 1
+
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, event)
+            except RuntimeError:  # the loop is closed
+                self._unsubscribe(sub)
+
+        logger.debug("Published %s to %d subscribers", event, len(subscribers))
+
+    async def subscribe(
+        self, *topics: str, heartbeat: float = 15.0
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the events of the topics as SSE messages, with a comment line
+        every `heartbeat` seconds to keep the connection (& proxies) alive.
+        """
+        sub = Subscription(frozenset(topics), self.queue_size)
+        with self._lock:
+            self._subscribers.add(sub)
+
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.get(), heartbeat)
+                except TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield event.encode()
+        finally:
+            self._unsubscribe(sub)
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+                self.dropped += sub.dropped
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped": self.dropped + sum(sub.dropped for sub in self._subscribers),
+            }
+
+
+broker = EventBroker(config.events_queue_size)
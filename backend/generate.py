@@ -0,0 +1,406 @@
+import base64
+import logging
+import random
+from collections import deque
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import NamedTuple
+
+import sqlalchemy
+from sqlalchemy import Table, func, select
+
+from backend.dump import sync_identities
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    DocumentTable,
+    NppTable,
+    NppUnitTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+    ReactorVesselTable,
+    UserTable,
+)
+from backend.tables.base import BaseTable
+from backend.tables.user import UserSessionTable
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000  # Rows inserted with one array DML statement
+DOCUMENT_BATCH_SIZE = 20  # Documents inserted at once (their BLOBs are in memory)
+
+DESIGNS = (("В-320", Decimal("1000.00")), ("В-213", Decimal("440.00")))
+
+
+class FleetSpec(NamedTuple):
+    """Size of the generated fleet (counts of children are per parent)."""
+
+    plants: int = 4
+    units: int = 4  # per plant
+    sectors: int = 6  # per vessel
+    placements: int = 5  # per sector
+    complects: int = 50  # per vessel
+    container_systems: int = 6  # per complect
+    years: int = 40  # of load/extract history, up to today
+    cycle_years: float = 4.0  # mean stay of a container system in a placement
+    foreign_loads: float = 0.02  # share of loads of another vessel's container systems
+    documents: int = 100
+    document_kb: int = 512  # median size of the documents (log-normal)
+    document_sigma: float = 1.0  # spread of the sizes (sigma of their logarithm)
+    users: int = 20
+    sessions: int = 2  # per user, a quarter of them expired
+    password: str | None = None  # of every user (none: they cannot log in)
+    seed: int = 0
+
+    def check(self) -> None:
+        """Raise ValueError if the counts do not fit the schema."""
+        # NUMBER(1) numbers, placement names of 3 characters ("9-9")
+        for name in ("plants", "units", "sectors", "placements"):
+            if not 1 <= getattr(self, name) <= 9:
+                raise ValueError(f"{name} must be between 1 and 9")
+        # Names of 3 characters
+        for name in ("complects", "container_systems"):
+            if not 1 <= getattr(self, name) <= 999:
+                raise ValueError(f"{name} must be between 1 and 999")
+        if self.cycle_years <= 0:
+            raise ValueError("cycle_years must be positive")
+        if not 0 <= self.foreign_loads <= 1:
+            raise ValueError("foreign_loads must be between 0 and 1")
+
+
+class _Ids:
+    """Explicit ids of the generated rows, following those already stored."""
+
+    def __init__(self, connection: sqlalchemy.Connection, tables: Iterable[Table]):
+        self._next = {}
+        for table in tables:
+            (column,) = table.primary_key.columns
+            self._next[table.name] = (
+                connection.execute(select(func.max(column))).scalar() or 0
+            ) + 1
+
+    def __call__(self, table: Table) -> int:
+        id_ = self._next[table.name]
+        self._next[table.name] += 1
+        return id_
+
+
+def _insert(
+    connection: sqlalchemy.Connection,
+    table: Table,
+    rows: Iterable[dict],
+    batch_size: int,
+) -> int:
+    """Insert the rows (possibly generated lazily) by batches with array DML."""
+    count = 0
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        connection.execute(table.insert(), batch)
+        count += len(batch)
+    return count
+
+
+class FleetGenerator:
+    """
+    Generates a synthetic fleet respecting the invariants of the load/extract
+    history (see `backend.validation`): a placement holds one container system
+    at a time, a container system is loaded once & extracted after its load.
+    """
+
+    def __init__(self, spec: FleetSpec, ids: _Ids, today: date):
+        self.spec = spec
+        self.ids = ids
+        self.today = today
+        self.rng = random.Random(spec.seed)
+
+        self.plants: list[dict] = []
+        self.units: list[dict] = []
+        self.vessels: list[dict] = []
+        self.sectors: list[dict] = []
+        self.placements: dict[int, list[dict]] = {}  # vessel id -> placements
+        self.complects: list[dict] = []
+        self.container_systems: list[dict] = []
+        self.pools: dict[
+            int, deque[int]
+        ] = {}  # vessel id -> unloaded container systems
+
+    def build_structure(self) -> None:
+        """Plants down to placements & container systems (small, kept in memory)."""
+        spec, rng, ids = self.spec, self.rng, self.ids
+        history_start = self.today - timedelta(days=round(spec.years * 365.25))
+
+        for plant_num in range(1, spec.plants + 1):
+            plant_id = ids(NppTable.__table__)
+            self.plants.append(
+                {
+                    "plant_id": plant_id,
+                    "num": plant_num,
+                    "sh_name": f"ГЕН{plant_id}",
+                    "name": f"Генерована АЕС {plant_id}",
+                    "descr": "Згенеровані дані",
+                    "sh_name_eng": f"GEN{plant_id}",
+                    "name_eng": f"Generated NPP {plant_id}",
+                }
+            )
+
+            for unit_num in range(1, spec.units + 1):
+                unit_id = ids(NppUnitTable.__table__)
+                design, power = rng.choice(DESIGNS)
+                start_date = history_start - timedelta(days=rng.randrange(365))
+                self.units.append(
+                    {
+                        "unit_id": unit_id,
+                        "plant_id": plant_id,
+                        "num": unit_num,
+                        "name": f"ГЕН{plant_id}-{unit_num}",
+                        "name_eng": f"gen{unit_id}",
+                        "design": design,
+                        "stage": None,
+                        "power": power,
+                        "start_date": start_date,
+                    }
+                )
+
+                vessel_id = ids(ReactorVesselTable.__table__)
+                self.vessels.append(
+                    {"vessel_id": vessel_id, "unit_id": unit_id, "start": start_date}
+                )
+
+                placements = self.placements[vessel_id] = []
+                for sector_number in range(1, spec.sectors + 1):
+                    sector_id = ids(ReactorVesselSectorTable.__table__)
+                    self.sectors.append(
+                        {
+                            "rpv_sector_id": sector_id,
+                            "vessel_id": vessel_id,
+                            "sector_number": sector_number,
+                        }
+                    )
+                    for num in range(1, spec.placements + 1):
+                        placements.append(
+                            {
+                                "placement_id": ids(PlacementTable.__table__),
+                                "sector_id": sector_id,
+                                "num_in_sector": num,
+                                "name": f"{sector_number}-{num}",
+                            }
+                        )
+
+                pool = self.pools[vessel_id] = deque()
+                for complect_number in range(1, spec.complects + 1):
+                    complect_id = ids(CouponComplectTable.__table__)
+                    self.complects.append(
+                        {
+                            "coupon_complect_id": complect_id,
+                            "vessel_id": vessel_id,
+                            "name": f"{complect_number:03}",
+                            "complect_number": complect_number,
+                            "is_additional": complect_number > spec.complects * 0.9,
+                        }
+                    )
+                    for num in range(1, spec.container_systems + 1):
+                        container_sys_id = ids(ContainerSysTable.__table__)
+                        self.container_systems.append(
+                            {
+                                "container_sys_id": container_sys_id,
+                                "coupon_complect_id": complect_id,
+                                "name": str(num),
+                            }
+                        )
+                        pool.append(container_sys_id)
+
+    def _take_container_sys(self, vessel_id: int) -> int | None:
+        """Next unloaded container system for the vessel: its own, or rarely another's."""
+        pool = self.pools[vessel_id]
+        if len(self.pools) > 1 and self.rng.random() < self.spec.foreign_loads:
+            other = self.rng.choice(self.vessels)["vessel_id"]
+            if other != vessel_id and self.pools[other]:
+                pool = self.pools[other]
+        return pool.popleft() if pool else None
+
+    def history(self, vessel: dict) -> tuple[list[dict], list[dict]]:
+        """
+        Loads & extracts of the vessel's placements: each placement is loaded
+        from the unit start, its container system extracted after a cycle &
+        the next one loaded a few weeks later; the last stays may last until
+        today (not extracted yet). Stops when the container systems run out.
+        """
+        rng, ids = self.rng, self.ids
+        cycle_days = self.spec.cycle_years * 365.25
+        loads, extracts = [], []
+
+        for placement in self.placements[vessel["vessel_id"]]:
+            day = vessel["start"] + timedelta(days=rng.randrange(365))
+            while day <= self.today:
+                container_sys_id = self._take_container_sys(vessel["vessel_id"])
+                if container_sys_id is None:
+                    break
+
+                load_id = ids(CouponLoadTable.__table__)
+                loads.append(
+                    {
+                        "cpn_load_id": load_id,
+                        "load_date": day.isoformat(),
+                        "irrad_container_sys_id": container_sys_id,
+                        "irrad_placement_id": placement["placement_id"],
+                    }
+                )
+
+                stay = max(30, round(rng.gauss(cycle_days, cycle_days * 0.15)))
+                end = day + timedelta(days=stay)
+                if end > self.today:
+                    break
+
+                extracts.append(
+                    {
+                        "cpn_extract_id": ids(CouponExtractTable.__table__),
+                        "cpn_load_id": load_id,
+                        "extract_date": end.isoformat(),
+                        "irrad_container_sys_id": container_sys_id,
+                    }
+                )
+                day = end + timedelta(days=rng.randrange(60))
+
+        return loads, extracts
+
+    def documents(self) -> Iterator[dict]:
+        """Documents of random (incompressible, like PDF) content, log-normal sizes."""
+        rng, spec = self.rng, self.spec
+        for _ in range(spec.documents):
+            doc_id = self.ids(DocumentTable.__table__)
+            size = round(rng.lognormvariate(0, spec.document_sigma) * spec.document_kb)
+            issue_date = self.today - timedelta(days=rng.randrange(365 * 30))
+            yield {
+                "doc_id": doc_id,
+                "full_name": f"Згенерований документ {doc_id}",
+                "code_name": f"GEN-{doc_id}",
+                "issue_date": issue_date,
+                "valid_until_date": (
+                    issue_date + timedelta(days=365 * rng.randint(5, 30))
+                    if rng.random() < 0.5
+                    else None
+                ),
+                "filename": f"gen_{doc_id}.pdf",
+                "binary_content": rng.randbytes(size * 1024),
+            }
+
+    def users(self, password_hash: str | None) -> tuple[list[dict], list[dict]]:
+        """Users with their sessions, some of them expired."""
+        rng, spec = self.rng, self.spec
+        now = datetime.now().replace(microsecond=0)
+        users, sessions = [], []
+        for _ in range(spec.users):
+            user_id = self.ids(UserTable.__table__)
+            users.append(
+                {
+                    "user_id": user_id,
+                    "username": f"gen{user_id}",
+                    "full_name": f"Згенерований користувач {user_id}",
+                    "email": f"gen{user_id}@example.com",
+                    "enabled": True,
+                    "password_hash": password_hash,
+                }
+            )
+            for _ in range(spec.sessions):
+                expired = rng.random() < 0.25
+                sessions.append(
+                    {
+                        "session_id": base64.urlsafe_b64encode(rng.randbytes(32))
+                        .rstrip(b"=")
+                        .decode(),
+                        "user_id": user_id,
+                        "expire_date": now
+                        + timedelta(days=rng.randint(1, 30) * (-1 if expired else 1)),
+                    }
+                )
+        return users, sessions
+
+
+def generate_fleet(
+    engine: sqlalchemy.Engine,
+    spec: FleetSpec,
+    batch_size: int = BATCH_SIZE,
+    today: date | None = None,
+) -> dict[str, int]:
+    """
+    Add a synthetic fleet to the database (creating the missing tables) in a
+    single transaction. Rows get explicit ids following the stored ones & are
+    inserted by batches with array DML, the identity generators being synced
+    once at the end. Returns the number of inserted rows per table.
+    """
+    from pwdlib import PasswordHash
+
+    spec.check()
+    tables = BaseTable.metadata.sorted_tables
+    BaseTable.metadata.create_all(engine)
+
+    # One hash for all users, hashing is deliberately slow
+    password_hash = (
+        PasswordHash.recommended().hash(spec.password) if spec.password else None
+    )
+
+    counts: dict[str, int] = {}
+
+    def insert(connection, table: Table, rows: Iterable[dict], size=batch_size):
+        counts[table.name] = counts.get(table.name, 0) + _insert(
+            connection, table, rows, size
+        )
+
+    with engine.begin() as connection:
+        ids = _Ids(
+            connection,
+            [table for table in tables if table is not UserSessionTable.__table__],
+        )
+        generator = FleetGenerator(spec, ids, today or date.today())
+        generator.build_structure()
+
+        insert(connection, NppTable.__table__, generator.plants)
+        insert(connection, NppUnitTable.__table__, generator.units)
+        insert(
+            connection,
+            ReactorVesselTable.__table__,
+            (
+                {"vessel_id": vessel["vessel_id"], "unit_id": vessel["unit_id"]}
+                for vessel in generator.vessels
+            ),
+        )
+        insert(connection, ReactorVesselSectorTable.__table__, generator.sectors)
+        insert(
+            connection,
+            PlacementTable.__table__,
+            (
+                placement
+                for placements in generator.placements.values()
+                for placement in placements
+            ),
+        )
+        insert(connection, CouponComplectTable.__table__, generator.complects)
+        insert(connection, ContainerSysTable.__table__, generator.container_systems)
+        logger.info("Generated %s units", len(generator.units))
+
+        # History vessel by vessel, so memory stays bounded
+        for vessel in generator.vessels:
+            loads, extracts = generator.history(vessel)
+            insert(connection, CouponLoadTable.__table__, loads)
+            insert(connection, CouponExtractTable.__table__, extracts)
+        logger.info("Generated %s loads", counts.get(CouponLoadTable.__tablename__, 0))
+
+        insert(
+            connection,
+            DocumentTable.__table__,
+            generator.documents(),
+            min(batch_size, DOCUMENT_BATCH_SIZE),
+        )
+
+        users, sessions = generator.users(password_hash)
+        insert(connection, UserTable.__table__, users)
+        insert(connection, UserSessionTable.__table__, sessions)
+
+    with engine.begin() as connection:
+        sync_identities(connection, tables)
+
+    return counts
@@ -0,0 +1,505 @@
+import logging
+import zipfile
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from typing import IO, NamedTuple
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+from .changes import Change, record_changes
+from .tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    NppUnitTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+    ReactorVesselTable,
+)
+
+logger = logging.getLogger(__name__)
+
+LOADS = CouponLoadTable.__tablename__
+EXTRACTS = CouponExtractTable.__tablename__
+
+# Columns of the imported sheet, named in its header row (in any order).
+# ``unit`` owns the complect; the placement is in ``placement_unit``
+# (the same unit by default).
+COLUMNS = (
+    "unit",
+    "complect",
+    "container_sys",
+    "placement",
+    "placement_unit",
+    "load_date",
+    "extract_date",
+)
+REQUIRED_COLUMNS = ("unit", "complect", "container_sys", "placement", "load_date")
+
+
+class HistoryImportError(ValueError):
+    """The workbook cannot be imported at all (e.g. missing columns)."""
+
+
+class ImportIssue(NamedTuple):
+    """A row which cannot be imported."""
+
+    row: int  # row number in the sheet
+    message: str
+
+
+class PlannedLoad(NamedTuple):
+    """A new load (with its extract, if extracted)."""
+
+    row: int
+    container_sys_id: int
+    placement_id: int
+    load_date: str
+    extract_date: str | None
+    owner_vessel_id: int
+    host_vessel_id: int
+
+
+class PlannedExtract(NamedTuple):
+    """A new extract of an already stored load."""
+
+    row: int
+    cpn_load_id: int
+    container_sys_id: int
+    extract_date: str
+    owner_vessel_id: int
+    host_vessel_id: int
+
+
+class ImportPlan(NamedTuple):
+    """What an import would write: the diff against the stored history."""
+
+    rows: int
+    loads: list[PlannedLoad]
+    extracts: list[PlannedExtract]
+    unchanged: int
+    issues: list[ImportIssue]
+
+
+def _name(value) -> str | None:
+    """Normalize a name cell (names like ``11`` may be typed as numbers)."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def _date(value) -> str | None:
+    """Normalize a date cell to an ISO date. Raises ValueError if invalid."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return date.fromisoformat(str(value).strip()).isoformat()
+
+
+def read_history_rows(file: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    """
+    Read the rows of the workbook's first sheet as dicts by column, with their
+    row numbers. The workbook is read in read-only mode, row by row.
+    """
+    try:
+        wb = load_workbook(file, read_only=True, data_only=True)
+    except (OSError, ValueError, zipfile.BadZipFile, InvalidFileException) as e:
+        raise HistoryImportError(f"Cannot read the workbook: {e}") from e
+
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+
+        header = [
+            str(name).strip().lower() if name is not None else None
+            for name in next(rows, ())
+        ]
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise HistoryImportError(f"Missing columns: {', '.join(missing)}")
+
+        columns = [(i, name) for i, name in enumerate(header) if name in COLUMNS]
+        for row_number, values in enumerate(rows, 2):
+            if all(value is None for value in values):
+                continue
+            yield (
+                row_number,
+                {name: values[i] if i < len(values) else None for i, name in columns},
+            )
+    finally:
+        wb.close()
+
+
+class HistoryLookups:
+    """Ids of units' vessels, complects, container systems & placements by name."""
+
+    def __init__(self, db: Session):
+        self.vessels: dict[str, int] = dict(
+            db.execute(
+                select(NppUnitTable.name_eng, ReactorVesselTable.vessel_id).join(
+                    ReactorVesselTable,
+                    ReactorVesselTable.unit_id == NppUnitTable.unit_id,
+                )
+            ).all()
+        )
+
+        self.complects: dict[tuple[int, str], int] = {
+            (vessel_id, name): complect_id
+            for complect_id, vessel_id, name in db.execute(
+                select(
+                    CouponComplectTable.coupon_complect_id,
+                    CouponComplectTable.vessel_id,
+                    CouponComplectTable.name,
+                )
+            )
+        }
+
+        self.container_systems: dict[tuple[int, str], int] = {
+            (complect_id, name): container_sys_id
+            for container_sys_id, complect_id, name in db.execute(
+                select(
+                    ContainerSysTable.container_sys_id,
+                    ContainerSysTable.coupon_complect_id,
+                    ContainerSysTable.name,
+                )
+            )
+        }
+
+        self.placements: dict[tuple[int, str], int] = {
+            (vessel_id, name): placement_id
+            for placement_id, vessel_id, name in db.execute(
+                select(
+                    PlacementTable.placement_id,
+                    ReactorVesselSectorTable.vessel_id,
+                    PlacementTable.name,
+                ).join(
+                    ReactorVesselSectorTable,
+                    ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+                )
+            )
+        }
+
+
+def _resolve(
+    lookups: HistoryLookups, row: dict
+) -> tuple[PlannedLoad | None, str | None]:
+    """Resolve the names of a row into a load (not yet diffed), or an issue."""
+    unit = _name(row.get("unit"))
+    placement_unit = _name(row.get("placement_unit")) or unit
+
+    owner_vessel_id = lookups.vessels.get(unit)
+    if owner_vessel_id is None:
+        return None, f"Unknown unit {unit!r}"
+    host_vessel_id = lookups.vessels.get(placement_unit)
+    if host_vessel_id is None:
+        return None, f"Unknown unit {placement_unit!r}"
+
+    complect = _name(row.get("complect"))
+    complect_id = lookups.complects.get((owner_vessel_id, complect))
+    if complect_id is None:
+        return None, f"Unknown complect {complect!r} of unit {unit!r}"
+
+    container_sys = _name(row.get("container_sys"))
+    container_sys_id = lookups.container_systems.get((complect_id, container_sys))
+    if container_sys_id is None:
+        return (
+            None,
+            f"Unknown container system {container_sys!r} of complect {complect!r}",
+        )
+
+    placement = _name(row.get("placement"))
+    placement_id = lookups.placements.get((host_vessel_id, placement))
+    if placement_id is None:
+        return None, f"Unknown placement {placement!r} of unit {placement_unit!r}"
+
+    try:
+        load_date = _date(row.get("load_date"))
+        extract_date = _date(row.get("extract_date"))
+    except ValueError as e:
+        return None, f"Invalid date: {e}"
+
+    if load_date is None:
+        return None, "Load date is missing"
+    if extract_date is not None and extract_date < load_date:
+        return None, f"Extracted on {extract_date} before being loaded on {load_date}"
+
+    return (
+        PlannedLoad(
+            0,
+            container_sys_id,
+            placement_id,
+            load_date,
+            extract_date,
+            owner_vessel_id,
+            host_vessel_id,
+        ),
+        None,
+    )
+
+
+def _stored_loads(db: Session, vessel_ids: Iterable[int]) -> list:
+    """Stored loads (with their extracts) touching the vessels."""
+    vessel_ids = list(vessel_ids)
+    if not vessel_ids:
+        return []
+
+    return db.execute(
+        select(
+            CouponLoadTable.cpn_load_id,
+            CouponLoadTable.irrad_container_sys_id,
+            CouponLoadTable.irrad_placement_id,
+            CouponLoadTable.load_date,
+            CouponExtractTable.cpn_extract_id,
+            CouponExtractTable.extract_date,
+        )
+        .join(
+            PlacementTable,
+            PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+        )
+        .join(
+            ReactorVesselSectorTable,
+            ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+        .outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        )
+        .where(
+            or_(
+                ReactorVesselSectorTable.vessel_id.in_(vessel_ids),
+                CouponComplectTable.vessel_id.in_(vessel_ids),
+            )
+        )
+    ).all()
+
+
+def plan_import(db: Session, rows: Iterable[tuple[int, dict]]) -> ImportPlan:
+    """
+    Diff the rows against the stored history: new loads, new extracts of
+    stored loads & unchanged rows. Names are resolved through lookup maps
+    built once, the rows are read in a single pass.
+
+    The history with the rows applied is checked for the invariants of
+    `backend.validation` (a container system is loaded once, a placement
+    holds one container system at a time, extracts follow loads); only
+    violations involving the imported rows are reported.
+    """
+    lookups = HistoryLookups(db)
+    issues: list[ImportIssue] = []
+
+    resolved: list[PlannedLoad] = []
+    rows_count = 0
+    for row_number, row in rows:
+        rows_count += 1
+        load, issue = _resolve(lookups, row)
+        if issue is not None:
+            issues.append(ImportIssue(row_number, issue))
+        else:
+            resolved.append(load._replace(row=row_number))
+
+    vessel_ids = {load.owner_vessel_id for load in resolved} | {
+        load.host_vessel_id for load in resolved
+    }
+    stored = {
+        (load.irrad_container_sys_id, load.irrad_placement_id, load.load_date): load
+        for load in _stored_loads(db, vessel_ids)
+    }
+
+    # Stays after the import: (start, end, row of the import or None if stored)
+    by_placement: dict[int, list[tuple[str, str | None, int | None]]] = defaultdict(
+        list
+    )
+    by_container_sys: dict[int, list[tuple[str, int | None]]] = defaultdict(list)
+
+    loads: list[PlannedLoad] = []
+    extracts: list[PlannedExtract] = []
+    unchanged = 0
+    seen: dict[tuple, int] = {}
+    planned_end: dict[int, str] = {}  # stored load id -> planned extract date
+
+    for load in resolved:
+        key = (load.container_sys_id, load.placement_id, load.load_date)
+        if key in seen:
+            issues.append(ImportIssue(load.row, f"Duplicate of row {seen[key]}"))
+            continue
+        seen[key] = load.row
+
+        stored_load = stored.get(key)
+        if stored_load is None:
+            loads.append(load)
+            by_placement[load.placement_id].append(
+                (load.load_date, load.extract_date, load.row)
+            )
+            by_container_sys[load.container_sys_id].append((load.load_date, load.row))
+        elif load.extract_date is None or (
+            stored_load.cpn_extract_id is not None
+            and stored_load.extract_date == load.extract_date
+        ):
+            unchanged += 1
+        elif stored_load.cpn_extract_id is None:
+            extracts.append(
+                PlannedExtract(
+                    load.row,
+                    stored_load.cpn_load_id,
+                    load.container_sys_id,
+                    load.extract_date,
+                    load.owner_vessel_id,
+                    load.host_vessel_id,
+                )
+            )
+            planned_end[stored_load.cpn_load_id] = load.extract_date
+        else:
+            issues.append(
+                ImportIssue(
+                    load.row,
+                    f"Load is already extracted on {stored_load.extract_date}",
+                )
+            )
+
+    for stored_load in stored.values():
+        end = planned_end.get(stored_load.cpn_load_id, stored_load.extract_date)
+        if stored_load.cpn_extract_id is not None and end is None:
+            end = stored_load.load_date  # extracted on an unknown date
+        by_placement[stored_load.irrad_placement_id].append(
+            (stored_load.load_date, end, None)
+        )
+        by_container_sys[stored_load.irrad_container_sys_id].append(
+            (stored_load.load_date, None)
+        )
+
+    # A container system is loaded once
+    for stays in by_container_sys.values():
+        if len(stays) > 1:
+            dates = ", ".join(sorted(start for start, _ in stays))
+            for _, row in stays:
+                if row is not None:
+                    issues.append(
+                        ImportIssue(row, f"Container system is loaded on {dates}")
+                    )
+
+    # A placement holds one container system at a time: each stay is checked
+    # against the earlier stay ending last (None: still there), not only the
+    # previous one, which may end sooner
+    for stays in by_placement.values():
+        stays.sort(key=lambda stay: stay[0] or "")
+        holder_end, holder_row = stays[0][1], stays[0][2]
+        for start, end, row in stays[1:]:
+            if (holder_end is None or holder_end > start) and (
+                row is not None or holder_row is not None
+            ):
+                issues.append(
+                    ImportIssue(
+                        row if row is not None else holder_row,
+                        f"Placement is occupied on {start}",
+                    )
+                )
+            if holder_end is not None and (end is None or end > holder_end):
+                holder_end, holder_row = end, row
+
+    issues.sort()
+    return ImportPlan(rows_count, loads, extracts, unchanged, issues)
+
+
+def apply_import(db: Session, plan: ImportPlan) -> None:
+    """
+    Insert the planned loads & extracts with batched array DML & record the
+    changes, within the current transaction (committed by the caller).
+    """
+    changes: list[Change] = []
+
+    def touch(table_name: str, row_id: int, owner: int, host: int) -> None:
+        changes.append(Change(owner, table_name, row_id))
+        if host != owner:
+            changes.append(Change(host, table_name, row_id))
+
+    new_extracts = list(plan.extracts)
+    if plan.loads:
+        load_ids = db.scalars(
+            insert(CouponLoadTable).returning(
+                CouponLoadTable.cpn_load_id, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "load_date": load.load_date,
+                    "irrad_container_sys_id": load.container_sys_id,
+                    "irrad_placement_id": load.placement_id,
+                }
+                for load in plan.loads
+            ],
+        ).all()
+
+        for load_id, load in zip(load_ids, plan.loads):
+            touch(LOADS, load_id, load.owner_vessel_id, load.host_vessel_id)
+            if load.extract_date is not None:
+                new_extracts.append(
+                    PlannedExtract(
+                        load.row,
+                        load_id,
+                        load.container_sys_id,
+                        load.extract_date,
+                        load.owner_vessel_id,
+                        load.host_vessel_id,
+                    )
+                )
+
+    if new_extracts:
+        extract_ids = db.scalars(
+            insert(CouponExtractTable).returning(
+                CouponExtractTable.cpn_extract_id, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "cpn_load_id": extract.cpn_load_id,
+                    "extract_date": extract.extract_date,
+                    "irrad_container_sys_id": extract.container_sys_id,
+                }
+                for extract in new_extracts
+            ],
+        ).all()
+
+        for extract_id, extract in zip(extract_ids, new_extracts):
+            touch(EXTRACTS, extract_id, extract.owner_vessel_id, extract.host_vessel_id)
+
+    record_changes(db, changes)
+
+
+def import_history(db: Session, file: IO[bytes], dry_run: bool = False) -> ImportPlan:
+    """
+    Import the load/extract history from a workbook (see `COLUMNS`).
+    Nothing is written if any row has an issue, or in ``dry_run`` mode;
+    otherwise all the rows are written in a single transaction.
+    """
+    plan = plan_import(db, read_history_rows(file))
+
+    if dry_run or plan.issues:
+        db.rollback()
+        return plan
+
+    apply_import(db, plan)
+    db.commit()
+    logger.info(
+        "History imported: %d loads, %d extracts of stored loads, %d unchanged rows",
+        len(plan.loads),
+        len(plan.extracts),
+        plan.unchanged,
+    )
+    return plan
@@ -0,0 +1,276 @@
+import gc
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+
+from sqlalchemy.pool import Pool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, per label values (updated under an uncontended lock)."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, labels: tuple[str, ...] = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets, per label values. An observation only
+    increments a bucket & the sum under an uncontended lock; buckets are
+    made cumulative when collected.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Label values -> counts of the buckets (the last one is +Inf), sum
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), values):
+                cumulative += count
+                le = bound if isinstance(bound, str) else _number(float(bound))
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le=le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(values[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+def _gauge(name: str, help: str, samples: Iterable[tuple[str, float]]) -> Iterable[str]:
+    """A gauge computed when collected: ``samples`` are (labels, value) pairs."""
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} gauge"
+    for labels, value in samples:
+        yield f"{name}{labels} {_number(value)}"
+
+
+class Metrics:
+    """In-process metrics of the app, in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.requests_in_flight = 0  # Only updated from the event loop thread
+        self.request_duration = Histogram(
+            "ksar_http_request_duration_seconds",
+            "Duration of the HTTP requests, until their body is sent.",
+            ("method", "route", "status"),
+        )
+        self.pool_checkout = Histogram(
+            "ksar_db_pool_checkout_seconds",
+            "Time to check a connection out of the pool (waits & new connections).",
+            buckets=CHECKOUT_BUCKETS,
+        )
+        self.pool_connections = Counter(
+            "ksar_db_pool_connections_total",
+            "Database connections opened by the pool.",
+        )
+        self.auth_validations = Counter(
+            "ksar_auth_validations_total",
+            "Validations of the session token of authenticated requests.",
+            ("result",),
+        )
+        self.document_bytes = Counter(
+            "ksar_document_bytes_streamed_total",
+            "Bytes of document contents streamed to clients.",
+        )
+        self._pools: list[Pool] = []
+
+    def instrument_pool(self, pool: Pool) -> None:
+        """Time the checkouts of the pool & count the connections it opens."""
+        from sqlalchemy import event
+
+        connect = pool.connect
+
+        def timed_connect():
+            start = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                self.pool_checkout.observe(time.perf_counter() - start)
+
+        pool.connect = timed_connect
+        event.listen(pool, "connect", lambda *_args: self.pool_connections.inc())
+        self._pools = [pool]
+
+    def _pool_gauges(self) -> Iterable[str]:
+        pools = [pool for pool in self._pools if isinstance(pool, QueuePool)]
+        for name, help, value in (
+            ("size", "Connections kept in the pool.", QueuePool.size),
+            (
+                "checked_out",
+                "Connections checked out of the pool.",
+                QueuePool.checkedout,
+            ),
+            ("checked_in", "Idle connections in the pool.", QueuePool.checkedin),
+            (
+                "overflow",
+                "Connections open beyond the pool size.",
+                lambda pool: max(pool.overflow(), 0),  # Negative while below the size
+            ),
+        ):
+            yield from _gauge(
+                f"ksar_db_pool_{name}", help, [("", value(pool)) for pool in pools]
+            )
+
+    @staticmethod
+    def _process_gauges() -> Iterable[str]:
+        yield "# HELP process_cpu_seconds_total CPU time of the process."
+        yield "# TYPE process_cpu_seconds_total counter"
+        yield f"process_cpu_seconds_total {_number(time.process_time())}"
+
+        try:
+            with open("/proc/self/statm") as file:
+                rss = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            fds = len(os.listdir("/proc/self/fd"))
+        except OSError:  # Not Linux
+            pass
+        else:
+            yield from _gauge(
+                "process_resident_memory_bytes", "Resident memory size.", [("", rss)]
+            )
+            yield from _gauge("process_open_fds", "Open file descriptors.", [("", fds)])
+
+        yield from _gauge(
+            "python_threads", "Running threads.", [("", threading.active_count())]
+        )
+
+        stats = gc.get_stats()
+        for name, key, help in (
+            ("collections", "collections", "Collections of the generation."),
+            ("objects_collected", "collected", "Objects collected in the generation."),
+            (
+                "objects_uncollectable",
+                "uncollectable",
+                "Uncollectable objects found in the generation.",
+            ),
+        ):
+            yield f"# HELP python_gc_{name}_total {help}"
+            yield f"# TYPE python_gc_{name}_total counter"
+            for generation, generation_stats in enumerate(stats):
+                yield (
+                    f'python_gc_{name}_total{{generation="{generation}"}} '
+                    f"{generation_stats[key]}"
+                )
+
+    def render(self) -> str:
+        lines = [
+            *self.request_duration.collect(),
+            *_gauge(
+                "ksar_http_requests_in_flight",
+                "Requests being handled (open event streams included).",
+                [("", self.requests_in_flight)],
+            ),
+            *self.pool_checkout.collect(),
+            *self.pool_connections.collect(),
+            *self._pool_gauges(),
+            *self.auth_validations.collect(),
+            *self.document_bytes.collect(),
+            *self._process_gauges(),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """
+    Count the requests in flight & time them by method, route (its path
+    template, e.g. ``/api/unit2/{name_eng}``) & status.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def _route_label(scope: Scope) -> str:
+        route = scope.get("route")
+        if route is None:
+            return "other"  # Static files, unmatched requests
+        # Included routes are copied with the router's prefix: full paths
+        return route.path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.requests_in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.requests_in_flight -= 1
+            metrics.request_duration.observe(
+                time.perf_counter() - start,
+                (scope["method"], self._route_label(scope), str(status)),
+            )
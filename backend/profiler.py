@@ -0,0 +1,237 @@
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import UTC, datetime
+from pathlib import Path
+from types import CodeType, FrameType
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_VALUES = {b"1", b"true"}
+PROFILE_QUERY = re.compile(rb"(?:^|&)profile=(?:1|true)(?:&|$)")
+PROFILE_ID = re.compile(r"\d{8}T\d{12}-[0-9a-f]{6}")
+
+# Innermost frames of threads waiting for work (idle pool workers, event loop)
+IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "thread.py")
+
+HOT_FUNCTIONS = 40  # Functions listed in the reports
+
+
+def _code_label(code: CodeType) -> str:
+    filename = code.co_filename
+    for prefix in (os.getcwd() + os.sep, *(path + os.sep for path in sys.path if path)):
+        if filename.startswith(prefix):
+            filename = filename[len(prefix) :]
+            break
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all busy threads every ``interval`` seconds from a
+    background thread. Sync routes run in worker threads, so profiling the
+    thread of the request only (as cProfile does) would miss their work; in
+    turn, the stacks of concurrent requests are sampled too.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter[tuple[CodeType, ...]] = Counter()
+        self.threads: set[int] = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or frame.f_code.co_filename.endswith(IDLE_FILES):
+                    continue
+                self.stacks[self._stack(frame)] += 1
+                self.threads.add(thread_id)
+            self.samples += 1
+
+    @staticmethod
+    def _stack(frame: FrameType | None) -> tuple[CodeType, ...]:
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        return tuple(reversed(codes))  # Outermost first
+
+    def report(self) -> str:
+        """Hot functions (by own & total samples), then the folded stacks."""
+        own: Counter[CodeType] = Counter()
+        total: Counter[CodeType] = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for code in set(stack):
+                total[code] += count
+
+        stack_samples = sum(self.stacks.values()) or 1
+        lines = ["Hot functions (% of the stack samples)", "   own%  total%  function"]
+        for code, count in own.most_common(HOT_FUNCTIONS):
+            lines.append(
+                f"{count * 100 / stack_samples:7.1f} {total[code] * 100 / stack_samples:7.1f}"
+                f"  {_code_label(code)}"
+            )
+
+        lines += ["", "Folded stacks (flamegraph.pl, speedscope)"]
+        for stack, count in self.stacks.most_common():
+            lines.append(f"{';'.join(_code_label(code) for code in stack)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class ProfileRing:
+    """Profile reports on disk, the oldest deleted beyond ``max_reports``."""
+
+    def __init__(self, directory: str | Path, max_reports: int):
+        self.directory = Path(directory)
+        self.max_reports = max_reports
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        now = datetime.now(UTC)
+        return f"{now:%Y%m%dT%H%M%S%f}-{secrets.token_hex(3)}"
+
+    def path(self, profile_id: str) -> Path | None:
+        """Path of the report, None if there is no such report."""
+        if not PROFILE_ID.fullmatch(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.txt"
+        return path if path.is_file() else None
+
+    def save(self, profile_id: str, header: dict, report: str) -> None:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            text = "".join(f"{key}: {value}\n" for key, value in header.items())
+            (self.directory / f"{profile_id}.txt").write_text(
+                f"{text}\n{report}", encoding="utf-8"
+            )
+
+            paths = sorted(self.directory.glob("*.txt"))  # Ids start with the time
+            for path in paths[: max(len(paths) - self.max_reports, 0)]:
+                path.unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        """Headers of the reports, latest first."""
+        reports = []
+        for path in sorted(self.directory.glob("*.txt"), reverse=True):
+            header = {"id": path.stem}
+            try:
+                with path.open(encoding="utf-8") as file:
+                    for line in file:
+                        key, separator, value = line.rstrip("\n").partition(": ")
+                        if not separator:
+                            break
+                        header[key] = value
+            except FileNotFoundError:  # Deleted from the ring meanwhile
+                continue
+            reports.append(header)
+        return reports
+
+
+profile_ring = ProfileRing(config.profile_dir, config.profile_max_reports)
+
+
+def _is_admin(scope: Scope) -> bool:
+    from backend.api.auth import auth_service
+    from backend.db import DbSessionContext
+
+    with DbSessionContext() as db:
+        user = auth_service.validate_token_and_get_user(Request(scope), db)
+    return user is not None and user.username in config.auth_admin_usernames
+
+
+def profile_requested(scope: Scope) -> bool:
+    """Whether the request asks to be profiled (``X-Profile: 1`` header or ``?profile=1``)."""
+    if PROFILE_QUERY.search(scope.get("query_string", b"")):
+        return True
+    return any(
+        name == PROFILE_HEADER and value.strip() in PROFILE_VALUES
+        for name, value in scope["headers"]
+    )
+
+
+class ProfilerMiddleware:
+    """
+    Profile the requests of administrators asking for it (see
+    `profile_requested`) with a `SamplingProfiler`, & store the report in
+    the `ProfileRing`. Its id is returned in the ``X-Profile-Id`` header.
+
+    Other requests only pay for the check of the flag; a flag from a user
+    who is not an administrator is ignored.
+    """
+
+    def __init__(self, app: ASGIApp, ring: ProfileRing, interval: float = 0.002):
+        self.app = app
+        self.ring = ring
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not await run_in_threadpool(_is_admin, scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.ring.new_id()
+        status = None
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            header = {
+                "created": datetime.now(UTC).isoformat(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status,
+                "duration_ms": round(duration_ms, 3),
+                "samples": profiler.samples,
+                "interval_ms": self.interval * 1000,
+                "threads": len(profiler.threads),
+            }
+            await run_in_threadpool(
+                self.ring.save, profile_id, header, profiler.report()
+            )
+            logger.info(
+                "Profiled %s %s: %s", scope["method"], scope["path"], profile_id
+            )
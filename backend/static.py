@@ -0,0 +1,103 @@
+import hashlib
+import mimetypes
+import pathlib
+import stat
+
+import anyio
+from fastapi import Request
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, HTMLResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from .api.etag import etag_matches
+from .compression import accepted_encodings
+
+# Precompressed variants written next to the assets by the frontend build,
+# in order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+# Built assets have content hashes in their names, so never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Static files served from their ``.br``/``.gz`` variants (generated at
+    build time, see ``vite.config.js``) when accepted by the client,
+    falling back to the file itself.
+    """
+
+    def __init__(self, *args, cache_control: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await self._get_response(path, scope)
+        if self.cache_control and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = self.cache_control
+        return response
+
+    async def _get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            accepted = accepted_encodings(
+                Headers(scope=scope).get("accept-encoding", "")
+            )
+            for encoding, suffix in PRECOMPRESSED:
+                if encoding not in accepted:
+                    continue
+                try:
+                    full_path, stat_result = await anyio.to_thread.run_sync(
+                        self.lookup_path, path + suffix
+                    )
+                except (OSError, ValueError):
+                    break  # let the file lookup below report the error
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    return self.encoded_response(
+                        full_path, stat_result, scope, path, encoding
+                    )
+
+        response = await super().get_response(path, scope)
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    def encoded_response(
+        self, full_path, stat_result, scope: Scope, path: str, encoding: str
+    ) -> Response:
+        response = FileResponse(
+            full_path,
+            stat_result=stat_result,
+            media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class SpaIndex:
+    """
+    The SPA's ``index.html``, read once & kept in memory with its ETag.
+    It references the current (hashed) assets, so browsers revalidate it
+    on every use & get a ``304`` until a rebuilt frontend is deployed
+    (the server is restarted).
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._page: tuple[bytes, str] | None = None
+
+    def load(self) -> tuple[bytes, str]:
+        if self._page is None:
+            content = self.path.read_bytes()
+            etag = f'"{hashlib.sha1(content).hexdigest()}"'
+            self._page = content, etag
+        return self._page
+
+    def response(self, request: Request) -> Response:
+        content, etag = self.load()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return HTMLResponse(content, headers=headers)
@@ -9,6 +9,8 @@ from .container_sys import ContainerSysTable
 from .coupon_load import CouponLoadTable
 from .coupon_extract import CouponExtractTable
 from .document import DocumentTable
+from .data_change import DataChangeTable
+from .data_finding import DataFindingTable
 
 
 __all__ = [
@@ -23,4 +25,6 @@ __all__ = [
     "CouponLoadTable",
     "CouponExtractTable",
     "DocumentTable",
+    "DataChangeTable",
+    "DataFindingTable",
 ]
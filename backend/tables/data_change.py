@@ -0,0 +1,43 @@
+from typing import ClassVar
+
+from sqlalchemy import ForeignKey, Identity, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.tables.base import BaseTable, OracleBoolean
+
+
+class DataChangeTable(BaseTable):
+    __tablename__ = "T_DATA_CHANGES"
+    __table_args__: ClassVar[dict] = {
+        "comment": "Журнал змін історії ЗС",
+    }
+
+    change_seq: Mapped[int] = mapped_column(
+        Integer,
+        Identity(),
+        primary_key=True,
+        comment="Порядковий номер зміни",
+    )
+    vessel_id: Mapped[int] = mapped_column(
+        ForeignKey("T_NPU_RCT_VESSELS.vessel_id"),
+        index=True,
+        comment="ID корпусу реактора, якого стосується зміна",
+    )
+    table_name: Mapped[str] = mapped_column(
+        String(30),
+        comment="Таблиця зміненого запису",
+    )
+    row_id: Mapped[int] = mapped_column(
+        Integer,
+        comment="ID зміненого запису",
+    )
+    deleted: Mapped[bool] = mapped_column(
+        OracleBoolean(create_constraint=True),
+        default=False,
+        server_default=text("0"),
+        comment="Чи видалено запис",
+    )
+
+    def __repr__(self):
+        action = "Delete" if self.deleted else "Upsert"
+        return f"{action} {self.table_name} {self.row_id} (seq {self.change_seq})"
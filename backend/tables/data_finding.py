@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import ClassVar
+
+from sqlalchemy import DateTime, ForeignKey, Identity, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.tables.base import BaseTable
+
+
+class DataFindingTable(BaseTable):
+    __tablename__ = "T_DATA_FINDINGS"
+    __table_args__: ClassVar[dict] = {
+        "comment": "Порушення цілісності історії ЗС (останньої перевірки)",
+    }
+
+    finding_id: Mapped[int] = mapped_column(
+        Integer,
+        Identity(),
+        primary_key=True,
+        comment="ID порушення",
+    )
+    check_name: Mapped[str] = mapped_column(
+        String(50),
+        comment="Назва перевірки",
+    )
+    vessel_id: Mapped[int | None] = mapped_column(
+        ForeignKey("T_NPU_RCT_VESSELS.vessel_id"),
+        nullable=True,
+        index=True,
+        comment="ID корпусу реактора, якого стосується порушення",
+    )
+    table_name: Mapped[str] = mapped_column(
+        String(30),
+        comment="Таблиця запису з порушенням",
+    )
+    row_id: Mapped[int] = mapped_column(
+        Integer,
+        comment="ID запису з порушенням",
+    )
+    message: Mapped[str] = mapped_column(
+        String(500),
+        comment="Опис порушення",
+    )
+    found_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        comment="Час перевірки",
+    )
+
+    def __repr__(self):
+        return f"{self.check_name}: {self.table_name} {self.row_id} ({self.message})"
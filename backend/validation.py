@@ -0,0 +1,316 @@
+import logging
+from collections import Counter
+from datetime import date, datetime
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from .changes import Change, record_changes
+from .tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    DataFindingTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Finding(NamedTuple):
+    """A violated invariant of the load/extract history."""
+
+    check_name: str
+    vessel_id: int | None
+    table_name: str
+    row_id: int
+    message: str
+
+
+class ValidationSummary(NamedTuple):
+    found_at: datetime
+    findings: int
+    by_check: dict[str, int]
+    vessels: int  # number of vessels with findings
+
+
+LOADS = CouponLoadTable.__tablename__
+EXTRACTS = CouponExtractTable.__tablename__
+
+
+def _loads_stmt():
+    """All loads with their extracts, the vessel of the placement & of the container system."""
+    return (
+        select(
+            CouponLoadTable.cpn_load_id,
+            CouponLoadTable.load_date,
+            CouponLoadTable.irrad_container_sys_id,
+            CouponLoadTable.irrad_placement_id,
+            CouponExtractTable.cpn_extract_id,
+            CouponExtractTable.extract_date,
+            ReactorVesselSectorTable.vessel_id.label("host_vessel_id"),
+            CouponComplectTable.vessel_id.label("owner_vessel_id"),
+        )
+        .join(
+            PlacementTable,
+            PlacementTable.placement_id == CouponLoadTable.irrad_placement_id,
+        )
+        .join(
+            ReactorVesselSectorTable,
+            ReactorVesselSectorTable.rpv_sector_id == PlacementTable.sector_id,
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+        .outerjoin(
+            CouponExtractTable,
+            CouponExtractTable.cpn_load_id == CouponLoadTable.cpn_load_id,
+        )
+    )
+
+
+def check_sql(db: Session) -> list[Finding]:
+    """Invariants checked by set-based queries."""
+    findings = []
+
+    # Extract & load must refer to the same container system
+    LoadContainerSys = aliased(ContainerSysTable)
+    LoadComplect = aliased(CouponComplectTable)
+    for extract_id, load_id, vessel_id in db.execute(
+        select(
+            CouponExtractTable.cpn_extract_id,
+            CouponLoadTable.cpn_load_id,
+            LoadComplect.vessel_id,
+        )
+        .join(
+            CouponLoadTable,
+            CouponLoadTable.cpn_load_id == CouponExtractTable.cpn_load_id,
+        )
+        .join(
+            LoadContainerSys,
+            LoadContainerSys.container_sys_id == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            LoadComplect,
+            LoadComplect.coupon_complect_id == LoadContainerSys.coupon_complect_id,
+        )
+        .where(
+            CouponExtractTable.irrad_container_sys_id
+            != CouponLoadTable.irrad_container_sys_id
+        )
+    ):
+        findings.append(
+            Finding(
+                "extract_container_sys",
+                vessel_id,
+                EXTRACTS,
+                extract_id,
+                f"Extract refers to another container system than load {load_id}",
+            )
+        )
+
+    # A load is extracted at most once
+    for load_id, vessel_id, extracts in db.execute(
+        select(
+            CouponLoadTable.cpn_load_id,
+            CouponComplectTable.vessel_id,
+            func.count(CouponExtractTable.cpn_extract_id),
+        )
+        .join(
+            CouponLoadTable,
+            CouponLoadTable.cpn_load_id == CouponExtractTable.cpn_load_id,
+        )
+        .join(
+            ContainerSysTable,
+            ContainerSysTable.container_sys_id
+            == CouponLoadTable.irrad_container_sys_id,
+        )
+        .join(
+            CouponComplectTable,
+            CouponComplectTable.coupon_complect_id
+            == ContainerSysTable.coupon_complect_id,
+        )
+        .group_by(CouponLoadTable.cpn_load_id, CouponComplectTable.vessel_id)
+        .having(func.count(CouponExtractTable.cpn_extract_id) > 1)
+    ):
+        findings.append(
+            Finding(
+                "load_extracted_twice",
+                vessel_id,
+                LOADS,
+                load_id,
+                f"Load is extracted {extracts} times",
+            )
+        )
+
+    return findings
+
+
+def _parse_date(value: str | None) -> date | None:
+    try:
+        return date.fromisoformat(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def check_sweeps(db: Session) -> list[Finding]:
+    """
+    Invariants checked by sweeping all loads in memory: dates, occupancy
+    of placements & (re)loads of container systems.
+    """
+    findings = []
+    loads = db.execute(_loads_stmt()).all()
+
+    # Duplicated by multiple extracts, reported by `check_sql`
+    seen: set[int] = set()
+    stays = []
+    for load in loads:
+        if load.cpn_load_id in seen:
+            continue
+        seen.add(load.cpn_load_id)
+
+        start = _parse_date(load.load_date)
+        end = _parse_date(load.extract_date)
+
+        if start is None:
+            findings.append(
+                Finding(
+                    "load_date",
+                    load.host_vessel_id,
+                    LOADS,
+                    load.cpn_load_id,
+                    f"Load date is missing or invalid: {load.load_date!r}",
+                )
+            )
+            continue
+
+        if load.cpn_extract_id is not None:
+            if end is None:
+                findings.append(
+                    Finding(
+                        "extract_date",
+                        load.host_vessel_id,
+                        EXTRACTS,
+                        load.cpn_extract_id,
+                        f"Extract date is missing or invalid: {load.extract_date!r}",
+                    )
+                )
+            elif end < start:
+                findings.append(
+                    Finding(
+                        "extract_before_load",
+                        load.host_vessel_id,
+                        EXTRACTS,
+                        load.cpn_extract_id,
+                        f"Extracted on {end} before being loaded on {start}",
+                    )
+                )
+
+        stays.append((load, start, end))
+
+    # Only one container system sits in a placement at a time: each stay is
+    # checked against the one reaching furthest among the earlier stays of
+    # its placement, not only the previous one (which may end sooner)
+    stays.sort(key=lambda s: (s[0].irrad_placement_id, s[1], s[0].cpn_load_id))
+    holder = None  # earlier stay of the placement ending last, with its end
+    for load, start, end in stays:
+        if (
+            holder is not None
+            and holder[0].irrad_placement_id != load.irrad_placement_id
+        ):
+            holder = None
+        if holder is not None and holder[1] > start:
+            findings.append(
+                Finding(
+                    "placement_occupied",
+                    load.host_vessel_id,
+                    LOADS,
+                    load.cpn_load_id,
+                    f"Placement is still occupied by load {holder[0].cpn_load_id} on {start}",
+                )
+            )
+
+        # Not extracted yet: occupied for good. An invalid extract date is
+        # reported above, the stay's end is unknown.
+        if load.cpn_extract_id is None:
+            end = date.max
+        if end is not None and (holder is None or end > holder[1]):
+            holder = (load, end)
+
+    # A container system is loaded once (a reloaded one is a separate entity)
+    loads_count = Counter(load.irrad_container_sys_id for load, _, _ in stays)
+    reported: set[int] = set()
+    for load, _, _ in stays:
+        container_sys_id = load.irrad_container_sys_id
+        if loads_count[container_sys_id] > 1 and container_sys_id not in reported:
+            reported.add(container_sys_id)
+            findings.append(
+                Finding(
+                    "container_sys_reloaded",
+                    load.owner_vessel_id,
+                    ContainerSysTable.__tablename__,
+                    container_sys_id,
+                    f"Container system is loaded {loads_count[container_sys_id]} times",
+                )
+            )
+
+    return findings
+
+
+def validate_history(db: Session) -> list[Finding]:
+    """Check all invariants of the load/extract history, fleet-wide."""
+    return check_sql(db) + check_sweeps(db)
+
+
+def run_validation(db: Session) -> ValidationSummary:
+    """
+    Validate the history & replace the findings of the previous run
+    (``T_DATA_FINDINGS``) in a single transaction. Vessels whose number of
+    findings changed get a change recorded, as units report it.
+    """
+    found_at = datetime.now()
+    findings = validate_history(db)
+
+    previous = dict(
+        db.execute(
+            select(DataFindingTable.vessel_id, func.count(DataFindingTable.finding_id))
+            .where(DataFindingTable.vessel_id.is_not(None))
+            .group_by(DataFindingTable.vessel_id)
+        ).all()
+    )
+    current = Counter(f.vessel_id for f in findings if f.vessel_id is not None)
+    record_changes(
+        db,
+        (
+            Change(vessel_id, DataFindingTable.__tablename__, vessel_id)
+            for vessel_id in sorted(previous.keys() | current.keys())
+            if previous.get(vessel_id, 0) != current[vessel_id]
+        ),
+    )
+
+    db.execute(delete(DataFindingTable))
+    if findings:
+        db.execute(
+            insert(DataFindingTable),
+            [{**finding._asdict(), "found_at": found_at} for finding in findings],
+        )
+    db.commit()
+
+    summary = ValidationSummary(
+        found_at=found_at,
+        findings=len(findings),
+        by_check=dict(Counter(finding.check_name for finding in findings)),
+        vessels=len({f.vessel_id for f in findings if f.vessel_id is not None}),
+    )
+    logger.info("History validated: %s", summary)
+    return summary
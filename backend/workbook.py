@@ -0,0 +1,87 @@
+from collections.abc import Iterable
+from io import BytesIO
+from typing import IO, NamedTuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+MAX_WIDTH = 50
+
+# Excel's limits for sheet titles
+MAX_TITLE_LENGTH = 31
+INVALID_TITLE_CHARS = str.maketrans(dict.fromkeys("[]:*?/\\", "_"))
+
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center")
+
+
+class SheetData(NamedTuple):
+    """A sheet to write: its rows may be a lazy iterator (e.g. over a query result)."""
+
+    title: str
+    header: list[str]
+    widths: list[int | None]  # longest value of each column, known upfront
+    rows: Iterable[list]
+
+
+def sheet_title(title: str, used: set[str]) -> str:
+    """
+    Make the title a valid sheet title, distinct from the ``used`` ones
+    (compared case-insensitively, as Excel does): invalid characters are
+    replaced & a title already used (once truncated) gets a numbered suffix.
+    """
+    title = title.translate(INVALID_TITLE_CHARS)
+    candidate = title[:MAX_TITLE_LENGTH]
+    number = 1
+    while candidate.lower() in used:
+        number += 1
+        suffix = f" ({number})"
+        candidate = title[: MAX_TITLE_LENGTH - len(suffix)] + suffix
+    used.add(candidate.lower())
+    return candidate
+
+
+def write_workbook(file: IO[bytes], sheets: Iterable[SheetData]) -> None:
+    """
+    Write the sheets into an ``.xlsx`` file in openpyxl's write-only mode:
+    rows go straight to temporary files, so memory stays flat whatever the
+    number of rows.
+
+    Column widths must be set before the first row is written, so they come
+    from the longest values (of the header or of the data) known upfront.
+    """
+    wb = Workbook(write_only=True)
+    titles: set[str] = set()
+
+    for sheet in sheets:
+        ws = wb.create_sheet(sheet_title(sheet.title, titles))
+        for i, (name, width) in enumerate(zip(sheet.header, sheet.widths), 1):
+            ws.column_dimensions[get_column_letter(i)].width = min(
+                max(len(name), width or 0) + 2, MAX_WIDTH
+            )
+
+        header = []
+        for name in sheet.header:
+            cell = WriteOnlyCell(ws, value=name)
+            cell.font = HEADER_FONT
+            cell.fill = HEADER_FILL
+            cell.alignment = HEADER_ALIGNMENT
+            header.append(cell)
+        ws.append(header)
+
+        for row in sheet.rows:
+            ws.append(row)
+
+    wb.save(file)
+
+
+def workbook_bytes(sheets: list[SheetData]) -> bytes:
+    """Write the sheets into an in-memory ``.xlsx`` (run in worker processes)."""
+    file = BytesIO()
+    write_workbook(file, sheets)
+    return file.getvalue()
@@ -21,7 +21,7 @@ export default function Navbar() {
   // Fetch unit name when on unit page
   useEffect(() => {
     if (params.name_eng && location.pathname.includes("/units/")) {
-      fetch(`/api/unit/${params.name_eng}`)
+      fetch(`/api/unit/${params.name_eng}?fields=name`)
         .then((response) => response.json())
         .then((data) => {
           if (data && data.name) {
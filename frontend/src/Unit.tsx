@@ -252,6 +252,7 @@ export default function Unit() {
                                 }}
                               >
                                 {load.container_sys_name}
+                                {load.unit_name && ` (${load.unit_name})`}
                               </td>
                               <td
                                 style={{
@@ -638,6 +639,9 @@ export default function Unit() {
                                         containerSys.load_status.irrad_placement
                                           .name
                                       }
+                                      {containerSys.load_status.irrad_placement
+                                        .unit_name &&
+                                        ` (${containerSys.load_status.irrad_placement.unit_name})`}
                                     </td>
                                     <td
                                       style={{
@@ -1,8 +1,19 @@
-import { useLoaderData, LoaderFunctionArgs } from "react-router";
-import { useEffect, useState } from "react";
+import {
+  useLoaderData,
+  useRevalidator,
+  LoaderFunctionArgs,
+} from "react-router";
+import { useEffect, useRef, useState } from "react";
 import { usePageTitle } from "./hooks/usePageTitle";
+import { useServerEvents } from "./hooks/useServerEvents";
 import { parseErrorResponse } from "./utils";
-import { UnitModel, CouponLoadModel } from "./types";
+import {
+  UnitModel,
+  CouponLoadModel,
+  CouponExtractModel,
+  CouponComplectModel,
+  ContainerSysModel,
+} from "./types";
 
 // @ts-ignore
 import crossSectionImage from "./assets/cross-section.png";
@@ -14,8 +25,9 @@ export interface PlacementDetailsModel {
   occupied: boolean;
   last_sys_name?: string | null;
   load_ids: number[];
-  coords: [number, number];
-  text_coords: [number, number];
+  // null for placements beyond the drawn layout
+  coords: [number, number] | null;
+  text_coords: [number, number] | null;
 }
 
 export interface ContainerSysDetailsModel {
@@ -27,6 +39,126 @@ export interface UnitDetailsModel {
   loads: Record<number, CouponLoadModel>;
   container_systems_details: Record<number, ContainerSysDetailsModel>;
   placements_details: Record<number, PlacementDetailsModel>;
+  change_seq: number;
+  data_issues: number;
+}
+
+// Response of /unit2/{name_eng}/changes?since=<change_seq>
+export interface UnitChangesModel {
+  since: number;
+  cursor: number;
+  loads: Record<number, CouponLoadModel>;
+  extracts: Record<number, CouponExtractModel>;
+  complects: Record<number, CouponComplectModel>;
+  container_systems: Record<number, ContainerSysModel>;
+  removed: {
+    loads: number[];
+    extracts: number[];
+    complects: number[];
+    container_systems: number[];
+  };
+  // Other rows of the unit changed (placements, findings...): refetch it
+  refetch: boolean;
+}
+
+// Apply the changes of loads & extracts to the unit details, recomputing the
+// details of placements & container systems (as the backend does).
+// Returns null if the changes cannot be applied and the unit must be refetched.
+export function applyUnitChanges(
+  data: UnitDetailsModel,
+  changes: UnitChangesModel
+): UnitDetailsModel | null {
+  const { removed } = changes;
+  if (
+    changes.refetch ||
+    Object.keys(changes.complects).length > 0 ||
+    Object.keys(changes.container_systems).length > 0 ||
+    removed.complects.length > 0 ||
+    removed.container_systems.length > 0
+  ) {
+    return null;
+  }
+
+  const sysNames: Record<number, string> = {};
+  for (const complect of data.unit.reactor_vessel?.coupon_complects ?? []) {
+    for (const containerSys of complect.container_systems ?? []) {
+      sysNames[containerSys.container_sys_id] = containerSys.name;
+    }
+  }
+
+  const loads = { ...data.loads };
+  for (const loadId of removed.loads) {
+    delete loads[loadId];
+  }
+  for (const load of Object.values(changes.loads)) {
+    if (
+      !(load.irrad_container_sys_id in sysNames) &&
+      !(load.irrad_placement_id in data.placements_details)
+    ) {
+      continue; // does not touch the vessel
+    }
+    if (!(load.irrad_container_sys_id in sysNames)) {
+      return null; // a foreign container system, its name is unknown
+    }
+    loads[load.cpn_load_id] = load;
+  }
+
+  const removedExtracts = new Set(removed.extracts);
+  for (const [loadId, load] of Object.entries(loads)) {
+    if (
+      load.coupon_extract &&
+      removedExtracts.has(load.coupon_extract.cpn_extract_id)
+    ) {
+      loads[Number(loadId)] = { ...load, coupon_extract: null };
+    }
+  }
+  for (const extract of Object.values(changes.extracts)) {
+    const load = loads[extract.cpn_load_id];
+    if (load) {
+      loads[extract.cpn_load_id] = { ...load, coupon_extract: extract };
+    }
+  }
+
+  // History order
+  const ordered = Object.values(loads).sort(
+    (a, b) =>
+      a.load_date.localeCompare(b.load_date) ||
+      a.irrad_container_sys_id - b.irrad_container_sys_id
+  );
+
+  const placementsDetails: Record<number, PlacementDetailsModel> = {};
+  for (const [placementId, details] of Object.entries(data.placements_details)) {
+    placementsDetails[Number(placementId)] = { ...details, load_ids: [] };
+  }
+  const containerSystemsDetails: Record<number, ContainerSysDetailsModel> = {};
+  for (const containerSysId of Object.keys(data.container_systems_details)) {
+    containerSystemsDetails[Number(containerSysId)] = { load_ids: [] };
+  }
+
+  for (const load of ordered) {
+    placementsDetails[load.irrad_placement_id]?.load_ids.push(load.cpn_load_id);
+    containerSystemsDetails[load.irrad_container_sys_id]?.load_ids.push(
+      load.cpn_load_id
+    );
+  }
+
+  for (const details of Object.values(placementsDetails)) {
+    const lastLoad = details.load_ids.length
+      ? loads[details.load_ids[details.load_ids.length - 1]]
+      : null;
+    details.occupied = lastLoad !== null && lastLoad.coupon_extract === null;
+    details.last_sys_name = lastLoad
+      ? sysNames[lastLoad.irrad_container_sys_id]
+      : null;
+  }
+
+  return {
+    ...data,
+    loads,
+    placements_details: placementsDetails,
+    container_systems_details: containerSystemsDetails,
+    change_seq: changes.cursor,
+  };
 }
 
 // Loader function for Unit2 page
@@ -50,13 +182,58 @@ export async function unitLoader2({ params }: LoaderFunctionArgs) {
 }
 
 export default function Unit2() {
-  const data = useLoaderData() as UnitDetailsModel;
+  const loaded = useLoaderData() as UnitDetailsModel;
+  const revalidator = useRevalidator();
+  const [data, setData] = useState(loaded);
+  const current = useRef(loaded);
+  const syncing = useRef(Promise.resolve());
   const [selectedPlacement, setSelectedPlacement] = useState<number | null>(
     null
   );
 
   usePageTitle();
 
+  // Start over from the (re)loaded unit
+  useEffect(() => {
+    current.current = loaded;
+    setData(loaded);
+  }, [loaded]);
+
+  // Fetch the changes after the cursor & apply them, or reload the unit
+  // (revalidated by ETag) when they cannot be applied
+  const syncChanges = () => {
+    // Chained, so that each fetch starts from the cursor of the previous one
+    syncing.current = syncing.current
+      .then(async () => {
+        const since = current.current.change_seq;
+        const response = await fetch(
+          `/api/unit2/${loaded.unit.name_eng}/changes?since=${since}`
+        );
+        if (!response.ok) {
+          revalidator.revalidate();
+          return;
+        }
+
+        const changes = (await response.json()) as UnitChangesModel;
+        if (changes.cursor === since) return;
+
+        const updated = applyUnitChanges(current.current, changes);
+        if (updated === null) {
+          revalidator.revalidate();
+          return;
+        }
+        current.current = updated;
+        setData(updated);
+      })
+      .catch(() => revalidator.revalidate());
+  };
+
+  useServerEvents(
+    `/api/unit2/${loaded.unit.name_eng}/events`,
+    ["changes"],
+    syncChanges
+  );
+
   // Set page title with unit name
   useEffect(() => {
     document.title = `${data.unit.name} - КСАР`;
@@ -134,6 +311,21 @@ export default function Unit2() {
                 ? new Date(data.unit.start_date).toLocaleDateString("uk-UA")
                 : "Не вказано"}
             </p>
+            {data.data_issues > 0 && (
+              <p id="unit-data-issues" style={{ color: "#dc3545" }}>
+                <strong>Порушення цілісності даних:</strong> {data.data_issues}{" "}
+                (за останньою перевіркою)
+              </p>
+            )}
+            <p>
+              <a
+                id="unit-export"
+                href={`/api/unit2/${data.unit.name_eng}/export`}
+                download
+              >
+                Експорт історії (Excel)
+              </a>
+            </p>
           </div>
 
           {/* Raw JSON Data Viewer */}
@@ -274,6 +466,7 @@ export default function Unit2() {
                     );
 
                     const coords = placementDetails.coords;
+                    if (!coords) return null;
                     const textCoords = placementDetails.text_coords || coords;
 
                     return (
@@ -10,6 +10,7 @@ import {
 import { useMemo, useCallback } from "react";
 import { useSearchParams, useNavigate, useLoaderData } from "react-router";
 import { Document } from "../types";
+import { useServerEvents } from "../hooks/useServerEvents";
 import { parseErrorResponse } from "../utils";
 
 // Loader function for DocumentsSearch page
@@ -33,8 +34,12 @@ export function documentsSearchShouldRevalidate({
   nextUrl: URL;
   defaultShouldRevalidate: boolean;
 }) {
-  // Don't revalidate if only search parameters changed (client-side filtering)
-  if (currentUrl.pathname === nextUrl.pathname) {
+  // Don't revalidate if only search parameters changed (client-side filtering),
+  // but do on explicit revalidation (same URL, e.g. on server events)
+  if (
+    currentUrl.pathname === nextUrl.pathname &&
+    currentUrl.href !== nextUrl.href
+  ) {
     return false;
   }
   // Use default behavior for navigation to/from different routes
@@ -46,6 +51,9 @@ const DocumentsSearch = () => {
   const navigate = useNavigate();
   const documents = useLoaderData() as Document[];
 
+  // Reload the list when documents are uploaded or deleted
+  useServerEvents("/api/documents/events", ["documents"]);
+
   // Extract filter values directly from URL search params
   const filterValues = useMemo(
     () => ({
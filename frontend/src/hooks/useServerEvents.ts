@@ -0,0 +1,31 @@
+import { useEffect, useRef } from "react";
+import { useRevalidator } from "react-router";
+
+// Custom hook to reload the route data whenever the server pushes one of the events
+// (Server-Sent Events, `resync` is sent when the page fell behind & missed events).
+// With `onEvent` the events are handled by it instead, `resync` still reloads.
+export const useServerEvents = (
+  url: string,
+  events: string[],
+  onEvent?: (event: MessageEvent) => void
+) => {
+  const revalidator = useRevalidator();
+  const eventNames = events.join(",");
+  const handler = useRef(onEvent);
+  handler.current = onEvent;
+
+  useEffect(() => {
+    const source = new EventSource(url);
+    const reload = () => revalidator.revalidate();
+    const handle = (event: MessageEvent) =>
+      handler.current ? handler.current(event) : reload();
+
+    for (const name of eventNames.split(",")) {
+      source.addEventListener(name, handle);
+    }
+    source.addEventListener("resync", reload);
+
+    return () => source.close();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [url, eventNames]);
+};
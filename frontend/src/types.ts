@@ -108,6 +108,8 @@ export interface PlacementLoad {
   container_sys_name: string;
   load_date: string;
   extract_date: string | null;
+  native: boolean;
+  unit_name: string | null; // owner unit of a non-native container system
 }
 
 export interface CouponComplect {
@@ -130,6 +132,8 @@ export interface ContainerSystemLoadStatus {
   irrad_placement: {
     placement_id: number;
     name: string;
+    native: boolean;
+    unit_name: string | null; // host unit of a non-native placement
   };
   extract?: {
     cpn_extract_id: number;
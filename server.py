@@ -6,6 +6,7 @@ import uvicorn
 from typing_extensions import Annotated
 from pwdlib import PasswordHash
 from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
 
 from backend.logger import setup_logging, get_uvicorn_log_config
 from backend.config import config
@@ -24,6 +25,14 @@ app = typer.Typer(
 )
 
 
+bench_app = typer.Typer(
+    name="bench",
+    help="Performance benchmarks",
+    no_args_is_help=True,
+)
+app.add_typer(bench_app)
+
+
 @app.callback(invoke_without_command=True)
 def main(
     ctx: typer.Context,
@@ -166,5 +175,395 @@ def reset_password(
         raise typer.Exit(code=1)
 
 
+@app.command()
+def validate():
+    """Check the load/extract history of the whole fleet & store the findings."""
+    from backend.validation import run_validation
+
+    typer.echo("Validating load/extract history...")
+
+    try:
+        Db.connect()
+
+        with DbSessionContext() as session:
+            summary = run_validation(session)
+
+    except SQLAlchemyError as e:
+        typer.echo(f"❌ Error validating history: {e}", err=True)
+        logger.error("Error validating history: %s", e)
+        raise typer.Exit(code=1)
+
+    if not summary.findings:
+        typer.echo("✅ No issues found")
+        return
+
+    typer.echo(f"⚠️  {summary.findings} issues found in {summary.vessels} vessels:")
+    for check_name, count in sorted(summary.by_check.items()):
+        typer.echo(f"  {check_name}: {count}")
+
+
+@app.command()
+def report(
+    output: Annotated[
+        str, typer.Argument(help="Path of the zip archive to write")
+    ] = "fleet_report.zip",
+    workers: Annotated[
+        int | None,
+        typer.Option(help="Worker processes writing the workbooks (config by default)"),
+    ] = None,
+):
+    """Write the fleet report: the history workbook of every unit in a zip archive."""
+    from backend.api.fleet_report import write_fleet_report
+
+    workers = workers if workers is not None else config.report_workers
+    typer.echo(f"Writing fleet report to {output} ({workers} workers)...")
+
+    try:
+        Db.connect()
+
+        with DbSessionContext() as session, open(output, "wb") as file:
+            units = write_fleet_report(session, file, workers)
+
+    except (SQLAlchemyError, OSError) as e:
+        typer.echo(f"❌ Error writing report: {e}", err=True)
+        logger.error("Error writing fleet report: %s", e)
+        raise typer.Exit(code=1)
+
+    typer.echo(f"✅ Report with {units} units written to {output}")
+
+
+@app.command()
+def export(
+    table: Annotated[
+        str, typer.Argument(help="complects, container_systems, loads or extracts")
+    ],
+    output: Annotated[
+        str | None, typer.Option(help="File to write (<table>.<format> by default)")
+    ] = None,
+    format: Annotated[
+        str, typer.Option("--format", "-f", help="csv, or parquet with pyarrow")
+    ] = "csv",
+    unit: Annotated[
+        str | None, typer.Option(help="Only rows of the unit (name_eng)")
+    ] = None,
+):
+    """Export a raw table with the plant, unit & vessel denormalized in."""
+    from backend.api.raw_export import (
+        RAW_FORMATS,
+        RAW_TABLES,
+        iter_raw_export,
+        raw_stmt,
+    )
+
+    if table not in RAW_TABLES:
+        typer.echo(f"❌ Unknown table: {table}", err=True)
+        raise typer.Exit(code=1)
+    if format not in RAW_FORMATS:
+        typer.echo(f"❌ Unsupported format: {format}", err=True)
+        raise typer.Exit(code=1)
+
+    output = output or f"{table}.{format}"
+    typer.echo(f"Exporting {table} to {output}...")
+
+    try:
+        Db.connect()
+
+        with open(output, "wb") as file:
+            file.writelines(iter_raw_export(Db.engine, raw_stmt(table, unit), format))
+
+    except (SQLAlchemyError, OSError) as e:
+        typer.echo(f"❌ Error exporting {table}: {e}", err=True)
+        logger.error("Error exporting %s: %s", table, e)
+        raise typer.Exit(code=1)
+
+    typer.echo(f"✅ {table} exported to {output}")
+
+
+@app.command()
+def import_history(
+    path: Annotated[str, typer.Argument(help="Workbook with the history to import")],
+    dry_run: Annotated[
+        bool, typer.Option(help="Only report what would be written")
+    ] = False,
+):
+    """Import load/extract history from an Excel workbook in a single transaction."""
+    from backend.history_import import HistoryImportError
+    from backend.history_import import import_history as run_import
+
+    typer.echo(f"Importing history from {path}...")
+
+    try:
+        Db.connect()
+
+        with DbSessionContext() as session, open(path, "rb") as file:
+            plan = run_import(session, file, dry_run=dry_run)
+
+    except HistoryImportError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+    except (SQLAlchemyError, OSError) as e:
+        typer.echo(f"❌ Error importing history: {e}", err=True)
+        logger.error("Error importing history from %s: %s", path, e)
+        raise typer.Exit(code=1)
+
+    typer.echo(
+        f"{plan.rows} rows: {len(plan.loads)} new loads, "
+        f"{len(plan.extracts)} new extracts of stored loads, {plan.unchanged} unchanged"
+    )
+    if plan.issues:
+        for issue in plan.issues:
+            typer.echo(f"  row {issue.row}: {issue.message}", err=True)
+        typer.echo(
+            f"❌ {len(plan.issues)} rows with issues, nothing imported", err=True
+        )
+        raise typer.Exit(code=1)
+
+    if dry_run:
+        typer.echo("Dry run, nothing imported")
+    else:
+        typer.echo("✅ History imported")
+
+
+@app.command()
+def dump(
+    directory: Annotated[str, typer.Argument(help="Directory to write the dump to")],
+    url: Annotated[
+        str | None,
+        typer.Option(help="SQLAlchemy URL of the database (config by default)"),
+    ] = None,
+    workers: Annotated[int, typer.Option(help="Tables dumped in parallel")] = 4,
+):
+    """Dump every table (documents included) into gzipped NDJSON files."""
+    from pathlib import Path
+
+    from backend.db import create_engine
+    from backend.dump import dump as run_dump
+
+    typer.echo(f"Dumping database to {directory}...")
+
+    try:
+        engine = create_engine(url)
+        dumps = run_dump(engine, Path(directory), workers)
+
+    except (SQLAlchemyError, OSError) as e:
+        typer.echo(f"❌ Error dumping database: {e}", err=True)
+        logger.error("Error dumping database to %s: %s", directory, e)
+        raise typer.Exit(code=1)
+
+    for table_dump in dumps:
+        typer.echo(f"  {table_dump.name}: {table_dump.rows} rows")
+    typer.echo(f"✅ {len(dumps)} tables dumped to {directory}")
+
+
+@app.command()
+def restore(
+    directory: Annotated[str, typer.Argument(help="Directory of the dump")],
+    url: Annotated[
+        str | None,
+        typer.Option(help="SQLAlchemy URL of the database (config by default)"),
+    ] = None,
+    workers: Annotated[int, typer.Option(help="Tables loaded in parallel")] = 4,
+    batch_size: Annotated[
+        int, typer.Option(help="Rows inserted with one array DML statement")
+    ] = 5000,
+    replace: Annotated[
+        bool, typer.Option(help="Delete the rows of the tables first")
+    ] = False,
+):
+    """Restore a dump into the database, creating the missing tables."""
+    from pathlib import Path
+
+    from backend.db import create_engine
+    from backend.dump import DumpError
+    from backend.dump import restore as run_restore
+
+    typer.echo(f"Restoring database from {directory}...")
+
+    try:
+        engine = create_engine(url)
+        dumps = run_restore(engine, Path(directory), workers, batch_size, replace)
+
+    except DumpError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+    except (SQLAlchemyError, OSError, ValueError) as e:
+        typer.echo(f"❌ Error restoring database: {e}", err=True)
+        logger.error("Error restoring database from %s: %s", directory, e)
+        raise typer.Exit(code=1)
+
+    typer.echo(f"✅ {len(dumps)} tables ({sum(d.rows for d in dumps)} rows) restored")
+
+
+@app.command()
+def generate_fleet(
+    url: Annotated[
+        str | None,
+        typer.Option(help="SQLAlchemy URL of the database (config by default)"),
+    ] = None,
+    plants: Annotated[int, typer.Option(help="Plants (up to 9)")] = 4,
+    units: Annotated[int, typer.Option(help="Units per plant (up to 9)")] = 4,
+    sectors: Annotated[int, typer.Option(help="Sectors per vessel (up to 9)")] = 6,
+    placements: Annotated[
+        int, typer.Option(help="Placements per sector (up to 9)")
+    ] = 5,
+    complects: Annotated[int, typer.Option(help="Complects per vessel")] = 50,
+    container_systems: Annotated[
+        int, typer.Option(help="Container systems per complect")
+    ] = 6,
+    years: Annotated[int, typer.Option(help="Years of load/extract history")] = 40,
+    cycle_years: Annotated[
+        float, typer.Option(help="Mean stay of a container system in a placement")
+    ] = 4.0,
+    foreign_loads: Annotated[
+        float, typer.Option(help="Share of loads into another unit's vessel")
+    ] = 0.02,
+    documents: Annotated[int, typer.Option(help="Documents")] = 100,
+    document_kb: Annotated[
+        int, typer.Option(help="Median size of the documents (KB, log-normal)")
+    ] = 512,
+    document_sigma: Annotated[
+        float, typer.Option(help="Spread of the document sizes")
+    ] = 1.0,
+    users: Annotated[int, typer.Option(help="Users")] = 20,
+    sessions: Annotated[int, typer.Option(help="Sessions per user")] = 2,
+    password: Annotated[
+        str | None, typer.Option(help="Password of every user (none by default)")
+    ] = None,
+    seed: Annotated[int, typer.Option(help="Seed of the random generator")] = 0,
+    batch_size: Annotated[
+        int, typer.Option(help="Rows inserted with one array DML statement")
+    ] = 5000,
+):
+    """Add a synthetic fleet with decades of load/extract history for scale testing."""
+    from backend.db import create_engine
+    from backend.generate import FleetSpec
+    from backend.generate import generate_fleet as run_generate
+
+    spec = FleetSpec(
+        plants=plants,
+        units=units,
+        sectors=sectors,
+        placements=placements,
+        complects=complects,
+        container_systems=container_systems,
+        years=years,
+        cycle_years=cycle_years,
+        foreign_loads=foreign_loads,
+        documents=documents,
+        document_kb=document_kb,
+        document_sigma=document_sigma,
+        users=users,
+        sessions=sessions,
+        password=password,
+        seed=seed,
+    )
+    try:
+        spec.check()
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+
+    typer.echo(f"Generating {plants * units} units...")
+
+    try:
+        engine = create_engine(url)
+        counts = run_generate(engine, spec, batch_size)
+
+    except SQLAlchemyError as e:
+        typer.echo(f"❌ Error generating fleet: {e}", err=True)
+        logger.error("Error generating fleet: %s", e)
+        raise typer.Exit(code=1)
+
+    for table_name, rows in counts.items():
+        typer.echo(f"  {table_name}: {rows} rows")
+    typer.echo(f"✅ {sum(counts.values())} rows generated")
+
+
+@bench_app.command("serialization")
+def bench_serialization(
+    loads: Annotated[int, typer.Option(help="Number of loads in the unit")] = 1000,
+    repeat: Annotated[int, typer.Option(help="Number of runs per path")] = 20,
+):
+    """Measure UnitDetailsModel serialization cost per 1,000 loads (no database needed)."""
+    from backend.bench import bench_unit_serialization
+
+    results = bench_unit_serialization(loads, repeat)
+
+    typer.echo(f"Unit with {results['loads']} loads, best of {results['repeat']} runs:")
+    for path in ("fast", "validated"):
+        typer.echo(
+            f"  {path:>9}: {results[path]['best_ms']:8.3f} ms/run, "
+            f"{results[path]['per_1000_loads_ms']:8.3f} ms per 1,000 loads, "
+            f"{results[path]['bytes']} bytes"
+        )
+
+
+@bench_app.command("endpoints")
+def bench_endpoints(
+    url: Annotated[
+        str | None,
+        typer.Option(help="SQLAlchemy URL of the database (config by default)"),
+    ] = None,
+    generate: Annotated[
+        bool, typer.Option(help="Generate a fleet (see generate-fleet) first")
+    ] = False,
+    requests: Annotated[int, typer.Option(help="Timed requests per route")] = 20,
+    concurrency: Annotated[int, typer.Option(help="Concurrent clients")] = 1,
+    route: Annotated[
+        str | None, typer.Option(help="Only the routes containing this text")
+    ] = None,
+    output: Annotated[
+        str, typer.Option(help="JSON file to write the results to")
+    ] = "bench_results.json",
+    budgets: Annotated[
+        str, typer.Option(help="JSON file with the budgets of the routes")
+    ] = "bench_budgets.json",
+):
+    """Benchmark the API routes in-process & fail if a route exceeds its budget."""
+    import json
+    from pathlib import Path
+
+    from backend.bench_endpoints import bench_endpoints as run_bench
+    from backend.bench_endpoints import load_budgets
+    from backend.db import create_engine
+
+    try:
+        if generate:
+            from backend.generate import FleetSpec, generate_fleet
+
+            typer.echo("Generating fleet...")
+            generate_fleet(create_engine(url), FleetSpec())
+
+        Db.connect(url)
+        results = run_bench(requests, concurrency, load_budgets(Path(budgets)), route)
+
+    except (SQLAlchemyError, OSError, ValueError) as e:
+        typer.echo(f"❌ Error benchmarking endpoints: {e}", err=True)
+        logger.error("Error benchmarking endpoints: %s", e)
+        raise typer.Exit(code=1)
+
+    Path(output).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    over_budget = 0
+    for result in results["routes"]:
+        typer.echo(
+            f"  {result['route']:<42} p50 {result['p50_ms']:8.2f} ms  "
+            f"p95 {result['p95_ms']:8.2f} ms  cold p95 {result['cold_p95_ms']:8.2f} ms  "
+            f"{result['throughput_rps']:7.1f} req/s  "
+            f"{result['statements']:6.1f} SQL  {result['peak_mb']:7.2f} MB"
+        )
+        for exceeded in result["over_budget"]:
+            typer.echo(f"    ❌ {exceeded}", err=True)
+        over_budget += bool(result["over_budget"])
+    for skipped in results["skipped"]:
+        typer.echo(f"  {skipped['key']:<42} skipped: {skipped['reason']}")
+
+    typer.echo(f"Results written to {output}")
+    if over_budget:
+        typer.echo(f"❌ {over_budget} routes over budget", err=True)
+        raise typer.Exit(code=1)
+    typer.echo("✅ All routes within budget")
+
+
 if __name__ == "__main__":
     app()
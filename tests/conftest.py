@@ -0,0 +1,181 @@
+from datetime import date
+from typing import NamedTuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.api.auth import get_current_user
+from backend.api.unit_exposure import exposure_cache
+from backend.api.unit_timeline import timeline_cache
+from backend.app import app
+from backend.cache import response_cache
+from backend.config import config
+from backend.db import Db
+from backend.tables import (
+    ContainerSysTable,
+    CouponComplectTable,
+    CouponExtractTable,
+    CouponLoadTable,
+    NppTable,
+    NppUnitTable,
+    PlacementTable,
+    ReactorVesselSectorTable,
+    ReactorVesselTable,
+    UserTable,
+)
+from backend.tables.base import BaseTable
+
+ADMIN_USERNAME = "admin"
+
+
+class Unit(NamedTuple):
+    unit_id: int
+    name_eng: str
+    vessel_id: int
+    placement_ids: dict[tuple[int, int], int]  # by (sector number, number in sector)
+    container_sys_ids: list[int]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A fresh SQLite database with every table, connected as `Db`."""
+    Db.connect(f"sqlite:///{tmp_path / 'ksar.db'}")
+    BaseTable.metadata.create_all(Db.engine)
+    response_cache.clear()
+    timeline_cache.clear()
+    exposure_cache.clear()
+    yield Db.engine
+    Db.engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Db.session_maker() as session:
+        yield session
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements executed by the engine."""
+    executed: list[str] = []
+
+    def count(_conn, _cursor, statement, *_args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def add_unit(
+    db: Session,
+    name_eng: str = "unit1",
+    sectors: int = 6,
+    placements: int = 5,
+    container_systems: int = 6,
+) -> Unit:
+    """Add a plant with a unit, its vessel, placements & a complect (no history)."""
+    plant = NppTable(
+        num=1, sh_name="PL", name="Plant", sh_name_eng="PL", name_eng="plant"
+    )
+    db.add(plant)
+    db.flush()
+    unit = NppUnitTable(
+        plant_id=plant.plant_id,
+        num=1,
+        name=name_eng,
+        name_eng=name_eng,
+        design="V-1000",
+        power=1000,
+        start_date=date(1985, 1, 1),
+    )
+    db.add(unit)
+    db.flush()
+    vessel = ReactorVesselTable(unit_id=unit.unit_id)
+    db.add(vessel)
+    db.flush()
+
+    placement_ids = {}
+    for sector_number in range(1, sectors + 1):
+        sector = ReactorVesselSectorTable(
+            vessel_id=vessel.vessel_id, sector_number=sector_number
+        )
+        db.add(sector)
+        db.flush()
+        for num_in_sector in range(1, placements + 1):
+            placement = PlacementTable(
+                sector_id=sector.rpv_sector_id,
+                num_in_sector=num_in_sector,
+                name=f"{sector_number}{num_in_sector}",
+            )
+            db.add(placement)
+            db.flush()
+            placement_ids[sector_number, num_in_sector] = placement.placement_id
+
+    complect = CouponComplectTable(
+        vessel_id=vessel.vessel_id, name="1", complect_number=1, is_additional=False
+    )
+    db.add(complect)
+    db.flush()
+    container_sys_ids = []
+    for i in range(1, container_systems + 1):
+        container_sys = ContainerSysTable(
+            coupon_complect_id=complect.coupon_complect_id, name=f"1{i}"
+        )
+        db.add(container_sys)
+        db.flush()
+        container_sys_ids.append(container_sys.container_sys_id)
+
+    db.commit()
+    return Unit(
+        unit.unit_id, name_eng, vessel.vessel_id, placement_ids, container_sys_ids
+    )
+
+
+def add_stay(
+    db: Session,
+    container_sys_id: int,
+    placement_id: int,
+    load_date: str | None,
+    extract_date: str | None = None,
+) -> int:
+    """Add a load (& its extract, if the date is given), returns the load id."""
+    load = CouponLoadTable(
+        load_date=load_date,
+        irrad_container_sys_id=container_sys_id,
+        irrad_placement_id=placement_id,
+    )
+    db.add(load)
+    db.flush()
+    if extract_date is not None:
+        db.add(
+            CouponExtractTable(
+                cpn_load_id=load.cpn_load_id,
+                extract_date=extract_date,
+                irrad_container_sys_id=container_sys_id,
+            )
+        )
+    db.commit()
+    return load.cpn_load_id
+
+
+@pytest.fixture
+def unit(db) -> Unit:
+    return add_unit(db)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    """A client authenticated as an administrator."""
+    user = UserTable(
+        username=ADMIN_USERNAME, full_name="Admin", email="admin@localhost"
+    )
+    db.add(user)
+    db.commit()
+    monkeypatch.setattr(config, "auth_admin_usernames", [ADMIN_USERNAME])
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,61 @@
+from sqlalchemy import func, select
+
+from backend.changes import Change, record_changes
+from backend.dump import dump, restore
+from backend.tables import CouponLoadTable, DataChangeTable, PlacementTable
+
+from .conftest import add_stay
+
+
+def max_change_seq(db):
+    return db.scalar(select(func.max(DataChangeTable.change_seq)))
+
+
+def record_load_changes(db, unit, load_id, count):
+    change = Change(unit.vessel_id, CouponLoadTable.__tablename__, load_id)
+    record_changes(db, [change] * count)
+    db.commit()
+
+
+def test_round_trip_restores_rows(engine, db, unit, tmp_path):
+    load_id = add_stay(
+        db, unit.container_sys_ids[0], unit.placement_ids[1, 1], "2000-01-01"
+    )
+    db.commit()
+    placements = db.scalars(select(PlacementTable.placement_id)).all()
+
+    dumps = dump(engine, tmp_path / "dump")
+    restore(engine, tmp_path / "dump", replace=True)
+
+    assert DataChangeTable.__tablename__ in {table_dump.name for table_dump in dumps}
+    db.expire_all()
+    assert db.scalars(select(PlacementTable.placement_id)).all() == placements
+    load = db.get(CouponLoadTable, load_id)
+    assert str(load.load_date) == "2000-01-01"
+
+
+def test_replace_keeps_change_seq_increasing(client, engine, db, unit, tmp_path):
+    load_id = add_stay(
+        db, unit.container_sys_ids[0], unit.placement_ids[1, 1], "2000-01-01"
+    )
+    record_load_changes(db, unit, load_id, 2)
+    dump(engine, tmp_path / "dump")
+    record_load_changes(db, unit, load_id, 4)
+    last_seq = max_change_seq(db)
+    etag = client.get(f"/api/unit2/{unit.name_eng}").headers["ETag"]
+
+    restore(engine, tmp_path / "dump", replace=True)
+
+    db.expire_all()
+    changes = db.scalars(select(DataChangeTable)).all()
+    assert [(change.change_seq, change.vessel_id) for change in changes] == [
+        (last_seq + 1, unit.vessel_id)
+    ]
+    response = client.get(
+        f"/api/unit2/{unit.name_eng}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["change_seq"] == last_seq + 1
+
+    record_load_changes(db, unit, load_id, 1)
+    assert max_change_seq(db) == last_seq + 2
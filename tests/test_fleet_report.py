@@ -0,0 +1,19 @@
+import zipfile
+
+from backend.api.fleet_report import FleetReport
+
+
+def test_superseded_report_is_kept_until_superseded_again(db, unit, tmp_path):
+    report = FleetReport(workers=1, directory=tmp_path)
+
+    first = report._build(db, "1")
+    with zipfile.ZipFile(first) as archive:
+        assert archive.namelist() == [f"{unit.name_eng}.xlsx"]
+
+    # May still be downloaded
+    second = report._build(db, "2")
+    assert first.exists() and second.exists()
+
+    third = report._build(db, "3")
+    assert not first.exists()
+    assert second.exists() and third.exists()
@@ -0,0 +1,50 @@
+from backend.history_import import ImportIssue, plan_import
+
+from .conftest import add_stay
+
+
+def row(container_sys: str, load_date: str, extract_date: str | None = None) -> dict:
+    return {
+        "unit": "unit1",
+        "complect": "1",
+        "container_sys": container_sys,
+        "placement": "11",
+        "load_date": load_date,
+        "extract_date": extract_date,
+    }
+
+
+def test_overlap_with_a_longer_earlier_stay(db, unit):
+    add_stay(
+        db,
+        unit.container_sys_ids[0],
+        unit.placement_ids[1, 1],
+        "2000-01-01",
+        "2010-01-01",
+    )
+
+    plan = plan_import(
+        db, [(2, row("12", "2001-01-01", "2002-01-01")), (3, row("13", "2003-01-01"))]
+    )
+
+    assert len(plan.loads) == 2
+    assert plan.issues == [
+        ImportIssue(2, "Placement is occupied on 2001-01-01"),
+        ImportIssue(3, "Placement is occupied on 2003-01-01"),
+    ]
+
+
+def test_consecutive_stays(db, unit):
+    add_stay(
+        db,
+        unit.container_sys_ids[0],
+        unit.placement_ids[1, 1],
+        "2000-01-01",
+        "2010-01-01",
+    )
+
+    plan = plan_import(
+        db, [(2, row("12", "2010-01-01", "2011-01-01")), (3, row("13", "2011-01-01"))]
+    )
+
+    assert plan.issues == []
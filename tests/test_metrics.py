@@ -0,0 +1,26 @@
+from pydantic import SecretStr
+
+from backend.config import config
+
+
+def test_metrics_need_the_configured_token(client, monkeypatch):
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(config, "metrics_token", SecretStr("secret"))
+    assert client.get("/metrics").status_code == 401
+    assert (
+        client.get("/metrics", headers={"Authorization": "Bearer other"}).status_code
+        == 401
+    )
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+
+
+def test_requests_are_labelled_by_route_path(client, unit, monkeypatch):
+    monkeypatch.setattr(config, "metrics_token", SecretStr("secret"))
+    client.get(f"/api/unit2/{unit.name_eng}")
+
+    text = client.get("/metrics", headers={"Authorization": "Bearer secret"}).text
+    # Path templates, not the requested paths
+    assert '/unit2/{name_eng}",' in text
+    assert unit.name_eng not in text
@@ -0,0 +1,21 @@
+import pytest
+
+from backend.profiler import profile_requested
+
+
+@pytest.mark.parametrize(
+    ("query_string", "headers", "requested"),
+    [
+        (b"", [], False),
+        (b"profile=1", [], True),
+        (b"a=1&profile=true", [], True),
+        (b"profile=0", [], False),
+        (b"", [(b"x-profile", b"1")], True),
+        (b"", [(b"x-profile", b"true")], True),
+        (b"", [(b"x-profile", b"0")], False),
+        (b"", [(b"x-profile", b"")], False),
+    ],
+)
+def test_profile_requested(query_string, headers, requested):
+    scope = {"type": "http", "query_string": query_string, "headers": headers}
+    assert profile_requested(scope) is requested
@@ -0,0 +1,34 @@
+import csv
+import io
+
+import pytest
+
+from backend.api.raw_export import RAW_FORMATS, iter_raw_export, raw_stmt
+
+from .conftest import add_stay
+
+
+def test_stream_has_its_own_connection(engine, unit):
+    stream = iter_raw_export(engine, raw_stmt("container_systems"), "csv")
+    assert engine.pool.checkedout() == 0
+
+    next(stream)
+    assert engine.pool.checkedout() == 1
+
+    stream.close()  # aborted by the client
+    assert engine.pool.checkedout() == 0
+
+
+@pytest.mark.parametrize("format", RAW_FORMATS)
+def test_streamed_exports_return_their_connections(client, db, engine, unit, format):
+    add_stay(db, unit.container_sys_ids[0], unit.placement_ids[1, 1], "2000-01-01")
+    db.close()
+
+    for _ in range(10):
+        response = client.get("/api/export/loads", params={"format": format})
+        assert response.status_code == 200
+        assert engine.pool.checkedout() == 0
+
+    if format == "csv":
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["unit_name_eng"] for row in rows] == [unit.name_eng]
@@ -0,0 +1,56 @@
+from backend.cache import response_cache
+from backend.changes import Change, record_changes
+from backend.tables import CouponLoadTable, NppTable, NppUnitTable
+
+from .conftest import add_stay
+
+
+def test_cache_hit_costs_one_statement(client, unit, statements):
+    client.get(f"/api/unit2/{unit.name_eng}")
+    hits = response_cache.stats()["hits"]
+
+    statements.clear()
+    response = client.get(f"/api/unit2/{unit.name_eng}")
+
+    assert response.status_code == 200
+    assert response_cache.stats()["hits"] == hits + 1
+    assert len(statements) == 1
+
+
+def test_recorded_changes_invalidate(client, db, unit):
+    client.get(f"/api/unit2/{unit.name_eng}")
+    assert response_cache.stats()["entries"] == 1
+
+    load_id = add_stay(
+        db, unit.container_sys_ids[0], unit.placement_ids[1, 1], "2000-01-01"
+    )
+    record_changes(db, [Change(unit.vessel_id, CouponLoadTable.__tablename__, load_id)])
+    assert response_cache.stats()["entries"] == 1  # Not committed yet
+    db.commit()
+
+    assert response_cache.stats()["entries"] == 0
+
+
+def test_unit_edits_invalidate(client, db, unit):
+    client.get(f"/api/unit2/{unit.name_eng}")
+    client.get(f"/api/unit/{unit.name_eng}")
+    assert response_cache.stats()["entries"] == 2
+
+    db.get(NppUnitTable, unit.unit_id).stage = "Operation"
+    db.commit()
+    assert response_cache.stats()["entries"] == 0
+
+    client.get(f"/api/unit2/{unit.name_eng}")
+    db.query(NppTable).one().name = "Renamed"
+    db.commit()
+    assert response_cache.stats()["entries"] == 0
+
+
+def test_rolled_back_edits_keep_entries(client, db, unit):
+    client.get(f"/api/unit2/{unit.name_eng}")
+
+    db.get(NppUnitTable, unit.unit_id).stage = "Operation"
+    db.flush()
+    db.rollback()
+
+    assert response_cache.stats()["entries"] == 1
@@ -0,0 +1,35 @@
+from .conftest import add_stay, add_unit
+
+
+def test_placements_beyond_the_layout(client, db):
+    unit = add_unit(db, sectors=9, placements=9)
+    inside = unit.placement_ids[1, 1]
+    outside = unit.placement_ids[9, 9]
+    add_stay(db, unit.container_sys_ids[0], outside, "2000-01-01")
+
+    response = client.get(f"/api/unit2/{unit.name_eng}")
+    assert response.status_code == 200
+    details = response.json()["placements_details"]
+    assert len(details) == 81
+    assert details[str(outside)]["coords"] is None
+    assert details[str(outside)]["text_coords"] is None
+    assert details[str(inside)]["coords"] is not None
+
+    response = client.get("/api/unit2", params={"name_eng": unit.name_eng})
+    assert response.status_code == 200
+
+
+def test_last_sys_name(client, db, unit):
+    placement_id = unit.placement_ids[1, 1]
+    first, second = unit.container_sys_ids[:2]
+    add_stay(db, first, placement_id, "1990-01-01", "1995-01-01")
+    add_stay(db, second, placement_id, "1995-01-01", "2000-01-01")
+
+    details = client.get(f"/api/unit2/{unit.name_eng}").json()["placements_details"]
+    assert details[str(placement_id)]["occupied"] is False
+    assert details[str(placement_id)]["last_sys_name"] == "12"
+    assert details[str(unit.placement_ids[1, 2])]["last_sys_name"] is None
+
+    legacy = client.get(f"/api/unit/{unit.name_eng}").json()
+    legacy_placement = legacy["reactor_vessel"]["sectors"][0]["placements"][0]
+    assert legacy_placement["last_sys_name"] == "12"
@@ -0,0 +1,21 @@
+from datetime import date
+
+from backend.tables import NppUnitTable
+
+
+def test_unit_without_vessel_has_no_events(client, db, unit):
+    db.add(
+        NppUnitTable(
+            plant_id=db.get(NppUnitTable, unit.unit_id).plant_id,
+            num=2,
+            name="unit2",
+            name_eng="unit2",
+            design="V-1000",
+            power=1000,
+            start_date=date(1990, 1, 1),
+        )
+    )
+    db.commit()
+
+    assert client.get("/api/unit2/unit2/events").status_code == 404
+    assert client.get("/api/unit2/missing/events").status_code == 404
@@ -0,0 +1,38 @@
+from .conftest import add_stay
+
+
+def test_stays_with_unparsable_dates_are_left_out(client, db, unit):
+    add_stay(
+        db,
+        unit.container_sys_ids[0],
+        unit.placement_ids[1, 1],
+        "2000-01-01",
+        "2000-01-11",
+    )
+    add_stay(db, unit.container_sys_ids[1], unit.placement_ids[1, 2], "01.02.1990")
+    add_stay(
+        db,
+        unit.container_sys_ids[2],
+        unit.placement_ids[1, 3],
+        "2001-01-01",
+        "not a date",
+    )
+    db.commit()
+
+    response = client.get(
+        f"/api/unit2/{unit.name_eng}/exposure", params={"as_of": "2002-01-01"}
+    )
+
+    assert response.status_code == 200
+    container_systems = response.json()["container_systems"]
+    assert container_systems[str(unit.container_sys_ids[0])] == {
+        "loads": 1,
+        "days": 10,
+        "power_days": 10000.0,
+    }
+    for container_sys_id in unit.container_sys_ids[1:3]:
+        assert container_systems[str(container_sys_id)]["loads"] == 0
+
+    response = client.get("/api/fleet/exposure", params={"as_of": "2002-01-01"})
+    assert response.status_code == 200
+    assert response.json()[unit.name_eng]["container_systems"] == container_systems
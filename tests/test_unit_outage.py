@@ -0,0 +1,110 @@
+from sqlalchemy import func, select
+
+from backend.tables import CouponExtractTable, CouponLoadTable, DataChangeTable
+
+from .conftest import add_stay
+
+
+def count_rows(db, table):
+    db.expire_all()
+    return db.scalar(select(func.count()).select_from(table))
+
+
+def post_outage(client, unit, outage):
+    return client.post(f"/api/unit2/{unit.name_eng}/outage", json=outage)
+
+
+def test_conflict_writes_nothing(client, db, unit):
+    load_id = add_stay(
+        db, unit.container_sys_ids[0], unit.placement_ids[1, 1], "2000-01-01"
+    )
+    # Loaded on an unknown date: left out of the timelines, loaded all the same
+    add_stay(db, unit.container_sys_ids[1], unit.placement_ids[1, 2], None)
+    etag = client.get(f"/api/unit2/{unit.name_eng}").headers["ETag"]
+    counts = [
+        count_rows(db, table)
+        for table in (CouponLoadTable, CouponExtractTable, DataChangeTable)
+    ]
+
+    response = post_outage(
+        client,
+        unit,
+        {
+            "loads": [
+                {
+                    "irrad_container_sys_id": unit.container_sys_ids[2],
+                    "irrad_placement_id": unit.placement_ids[1, 1],
+                    "load_date": "2001-01-01",
+                },
+                {
+                    "irrad_container_sys_id": unit.container_sys_ids[1],
+                    "irrad_placement_id": unit.placement_ids[1, 3],
+                    "load_date": "2001-01-01",
+                },
+            ]
+        },
+    )
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == [
+        (
+            f"Placement {unit.placement_ids[1, 1]} is occupied by load {load_id} "
+            "on 2001-01-01"
+        ),
+        f"Container system {unit.container_sys_ids[1]} is already loaded",
+    ]
+    assert [
+        count_rows(db, table)
+        for table in (CouponLoadTable, CouponExtractTable, DataChangeTable)
+    ] == counts
+    response = client.get(
+        f"/api/unit2/{unit.name_eng}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+def test_outage_records_changes_and_moves_etag(client, db, unit):
+    load_id = add_stay(
+        db, unit.container_sys_ids[0], unit.placement_ids[1, 1], "2000-01-01"
+    )
+    etag = client.get(f"/api/unit2/{unit.name_eng}").headers["ETag"]
+
+    response = post_outage(
+        client,
+        unit,
+        {
+            "extracts": [{"cpn_load_id": load_id, "extract_date": "2001-01-01"}],
+            "loads": [
+                {
+                    "irrad_container_sys_id": unit.container_sys_ids[1],
+                    "irrad_placement_id": unit.placement_ids[1, 1],
+                    "load_date": "2001-01-02",
+                }
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    extract_id = result["extracts"][str(load_id)]
+    (new_load_id,) = result["loads"]
+
+    db.expire_all()
+    changes = db.execute(
+        select(
+            DataChangeTable.vessel_id,
+            DataChangeTable.table_name,
+            DataChangeTable.row_id,
+        ).order_by(DataChangeTable.change_seq)
+    ).all()
+    # Host & owner are the same vessel: a single change per written row
+    assert changes == [
+        (unit.vessel_id, CouponExtractTable.__tablename__, extract_id),
+        (unit.vessel_id, CouponLoadTable.__tablename__, new_load_id),
+    ]
+
+    response = client.get(
+        f"/api/unit2/{unit.name_eng}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert str(new_load_id) in response.json()["loads"]
@@ -0,0 +1,125 @@
+from sqlalchemy import insert, update
+
+from backend.changes import Change, record_changes
+from backend.tables import CouponExtractTable, CouponLoadTable, NppTable, NppUnitTable
+from backend.validation import run_validation
+
+from .conftest import add_stay
+
+
+def get_unit(client, unit, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(f"/api/unit2/{unit.name_eng}", headers=headers)
+
+
+def test_not_modified_costs_one_statement(client, unit, statements):
+    etag = get_unit(client, unit).headers["ETag"]
+
+    statements.clear()
+    response = get_unit(client, unit, etag)
+
+    assert response.status_code == 304
+    assert len(statements) == 1
+
+
+def test_recorded_change_moves_etag(client, db, unit):
+    response = get_unit(client, unit)
+    etag = response.headers["ETag"]
+    assert response.json()["loads"] == {}
+
+    load_id = add_stay(
+        db, unit.container_sys_ids[0], unit.placement_ids[1, 1], "2000-01-01"
+    )
+    record_changes(db, [Change(unit.vessel_id, CouponLoadTable.__tablename__, load_id)])
+    db.commit()
+
+    response = get_unit(client, unit, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert list(response.json()["loads"]) == [str(load_id)]
+    assert response.json()["change_seq"] > 0
+
+
+def test_unit_and_plant_edits_move_etag(client, db, unit):
+    etag = get_unit(client, unit).headers["ETag"]
+
+    db.execute(
+        update(NppUnitTable)
+        .where(NppUnitTable.unit_id == unit.unit_id)
+        .values(stage="Operation")
+    )
+    db.commit()
+    response = get_unit(client, unit, etag)
+    assert response.status_code == 200
+    assert response.json()["unit"]["stage"] == "Operation"
+
+    etag = response.headers["ETag"]
+    db.execute(update(NppTable).values(name="Renamed"))
+    db.commit()
+    response = get_unit(client, unit, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_validation_findings_move_etag(client, db, unit):
+    # The placement is still occupied by the first load
+    placement_id = unit.placement_ids[1, 1]
+    add_stay(db, unit.container_sys_ids[0], placement_id, "2000-01-01")
+    add_stay(db, unit.container_sys_ids[1], placement_id, "2001-01-01")
+    etag = get_unit(client, unit).headers["ETag"]
+
+    run_validation(db)
+
+    response = get_unit(client, unit, etag)
+    assert response.status_code == 200
+    assert response.json()["data_issues"] == 1
+
+    # An unchanged number of findings keeps the version
+    etag = response.headers["ETag"]
+    run_validation(db)
+    assert get_unit(client, unit, etag).status_code == 304
+
+
+def test_changes_of_other_rows_ask_to_refetch(client, db, unit):
+    record_changes(db, [Change(unit.vessel_id, "T_CSS_PLACEMENTS", 1)])
+    db.commit()
+
+    changes = client.get(f"/api/unit2/{unit.name_eng}/changes").json()
+    assert changes["refetch"] is True
+    assert changes["cursor"] > 0
+
+
+def test_writes_without_recorded_changes_move_etag(client, db, unit):
+    etag = get_unit(client, unit).headers["ETag"]
+
+    # Written by hand in SQL: no change recorded
+    db.execute(
+        insert(CouponLoadTable).values(
+            load_date="2000-01-01",
+            irrad_container_sys_id=unit.container_sys_ids[0],
+            irrad_placement_id=unit.placement_ids[1, 1],
+        )
+    )
+    db.commit()
+
+    response = get_unit(client, unit, etag)
+    assert response.status_code == 200
+    assert len(response.json()["loads"]) == 1
+
+    etag = response.headers["ETag"]
+    load_id = int(next(iter(response.json()["loads"])))
+    db.execute(
+        insert(CouponExtractTable).values(
+            cpn_load_id=load_id,
+            extract_date="2001-01-01",
+            irrad_container_sys_id=unit.container_sys_ids[0],
+        )
+    )
+    db.commit()
+
+    response = get_unit(client, unit, etag)
+    assert response.status_code == 200
+    assert (
+        response.json()["placements_details"][str(unit.placement_ids[1, 1])]["occupied"]
+        is False
+    )
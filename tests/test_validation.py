@@ -0,0 +1,33 @@
+from backend.validation import check_sweeps
+
+from .conftest import add_stay
+
+
+def occupied(db) -> list[tuple[int, str]]:
+    return [
+        (finding.row_id, finding.message)
+        for finding in check_sweeps(db)
+        if finding.check_name == "placement_occupied"
+    ]
+
+
+def test_overlap_with_a_longer_earlier_stay(db, unit):
+    placement_id = unit.placement_ids[1, 1]
+    a, b, c = unit.container_sys_ids[:3]
+    load_a = add_stay(db, a, placement_id, "2000-01-01", "2010-01-01")
+    load_b = add_stay(db, b, placement_id, "2001-01-01", "2002-01-01")
+    load_c = add_stay(db, c, placement_id, "2003-01-01")
+
+    assert occupied(db) == [
+        (load_b, f"Placement is still occupied by load {load_a} on 2001-01-01"),
+        (load_c, f"Placement is still occupied by load {load_a} on 2003-01-01"),
+    ]
+
+
+def test_consecutive_stays_and_placements(db, unit):
+    a, b, c = unit.container_sys_ids[:3]
+    add_stay(db, a, unit.placement_ids[1, 1], "2000-01-01", "2010-01-01")
+    add_stay(db, b, unit.placement_ids[1, 1], "2010-01-01")
+    add_stay(db, c, unit.placement_ids[1, 2], "2001-01-01")
+
+    assert occupied(db) == []
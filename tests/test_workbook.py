@@ -0,0 +1,26 @@
+from io import BytesIO
+
+from openpyxl import load_workbook
+
+from backend.workbook import SheetData, workbook_bytes
+
+
+def test_sheet_titles_are_sanitized_and_distinct():
+    titles = [
+        "Комплект 1/2",
+        "Комплект [A]: *?\\",
+        "Комплект з дуже довгою назвою №1",
+        "Комплект з дуже довгою назвою №2",
+        "комплект 1_2",
+    ]
+    sheets = [SheetData(title, ["Місце"], [None], [["1"]]) for title in titles]
+
+    workbook = load_workbook(BytesIO(workbook_bytes(sheets)), read_only=True)
+
+    assert workbook.sheetnames == [
+        "Комплект 1_2",
+        "Комплект _A__ ___",
+        "Комплект з дуже довгою назвою №",
+        "Комплект з дуже довгою назв (2)",
+        "комплект 1_2 (2)",
+    ]
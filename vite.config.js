@@ -1,9 +1,48 @@
+import { readFileSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import { brotliCompressSync, constants, gzipSync } from "node:zlib";
 import { defineConfig } from "vite";
 import react from "@vitejs/plugin-react";
 
+// Write `.br` & `.gz` variants next to the built assets,
+// the backend serves them according to `Accept-Encoding`
+function precompress({ minSize = 1024 } = {}) {
+  const compressible = /\.(js|mjs|css|html|svg|json|txt|map)$/;
+
+  return {
+    name: "precompress",
+    apply: "build",
+    // `dir` is the resolved output directory (`build.outDir` is relative to `root`)
+    writeBundle({ dir }, bundle) {
+      for (const fileName of Object.keys(bundle)) {
+        if (!fileName.startsWith("assets/") || !compressible.test(fileName)) {
+          continue;
+        }
+
+        const path = join(dir, fileName);
+        const content = readFileSync(path);
+        if (content.length < minSize) {
+          continue;
+        }
+
+        writeFileSync(
+          `${path}.br`,
+          brotliCompressSync(content, {
+            params: {
+              [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+              [constants.BROTLI_PARAM_SIZE_HINT]: content.length,
+            },
+          }),
+        );
+        writeFileSync(`${path}.gz`, gzipSync(content, { level: 9 }));
+      }
+    },
+  };
+}
+
 export default defineConfig({
   root: "./frontend",
-  plugins: [react()],
+  plugins: [react(), precompress()],
   server: {
     proxy: {
       "^/(api|docs|openapi.json)": "http://localhost:8000",